@@ -0,0 +1 @@
+"""Benchmarks for Server Monitor (run as python -m benchmarks.<name>)."""
@@ -0,0 +1,119 @@
+"""Residents-per-second: synchronous loop vs asyncio engine.
+
+Both engines run one full pass over N residents against a local stand-in
+WebDAV/portal server. Run from the repository root:
+
+    python -m benchmarks.bench_async_engine --residents 200 --wait 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.standin_server import StandInServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _prepare_workdir() -> str:
+    """Copy the data templates into a scratch directory and chdir into it."""
+    workdir = tempfile.mkdtemp(prefix="bench_async_")
+    os.makedirs(os.path.join(workdir, "data"))
+    for name in ("upload.json", "download.json"):
+        shutil.copyfile(os.path.join(REPO_ROOT, "data", name), os.path.join(workdir, "data", name))
+    os.chdir(workdir)
+    return workdir
+
+
+def _configure_env(url: str) -> None:
+    os.environ.update({
+        "BASE_URL": url,
+        "HOSTNAME": url,
+        "USERNAME": "bench",
+        "PASSWORD": "bench",
+        "PORTAL_USERNAME": os.getenv("PORTAL_USERNAME", "bench"),
+        "PORTAL_PASSWORD": os.getenv("PORTAL_PASSWORD", "bench"),
+    })
+
+
+def bench_sync(residents: list, wait: float) -> float:
+    import requests
+    from webdav3.client import Client
+    from config.config import Config
+    from services.resident_monitor import ResidentMonitor
+
+    from core.transport import configure_webdav_client, create_session, get_transport_stats
+
+    client = Client(Config.get_webdav_options())
+    client.verify = False
+    configure_webdav_client(client)
+    session = create_session()
+    monitors = [ResidentMonitor(r["id"], r["interval"]) for r in residents]
+    for monitor in monitors:
+        monitor.propagation_mode = "fixed"
+        monitor.propagation_wait_sec = wait
+
+    start = time.perf_counter()
+    for monitor in monitors:
+        monitor.sync_once(client=client, session=session)
+    elapsed = time.perf_counter() - start
+    for host, pool in get_transport_stats().items():
+        print(f"sync pool {host}: {pool}")
+    return elapsed
+
+
+def bench_async(residents: list, wait: float, concurrency: int) -> float:
+    import requests
+    from config.config import Config
+    from core.async_clients import AsyncPortalClient, AsyncWebDAVClient, create_http_pool
+    from core.async_monitor import AsyncMonitorService
+
+    service = AsyncMonitorService(residents, max_concurrency=concurrency)
+    for monitor in service.monitors.values():
+        monitor.propagation_mode = "fixed"
+        monitor.propagation_wait_sec = wait
+
+    async def _run() -> float:
+        async with create_http_pool() as http:
+            webdav = AsyncWebDAVClient(http, Config.get_webdav_options())
+            portal = AsyncPortalClient(http, requests.Session())
+            start = time.perf_counter()
+            await service.run_cycle(webdav, portal)
+            return time.perf_counter() - start
+
+    return asyncio.run(_run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--residents", type=int, default=100)
+    parser.add_argument("--wait", type=float, default=0.2, help="propagation wait per resident (s)")
+    parser.add_argument("--latency", type=float, default=0.005, help="server latency per request (s)")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--skip-sync", action="store_true", help="only run the async engine")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    sys.path.insert(0, REPO_ROOT)
+
+    with StandInServer(latency=args.latency) as server:
+        _configure_env(server.url)
+        _prepare_workdir()
+        residents = [{"id": f"BM{i:05d}", "interval": 60} for i in range(args.residents)]
+
+        print(f"{args.residents} residents, wait={args.wait}s, server latency={args.latency}s")
+        if not args.skip_sync:
+            elapsed = bench_sync(residents, args.wait)
+            print(f"sync loop : {elapsed:8.2f}s  {args.residents / elapsed:10.1f} residents/s")
+        elapsed = bench_async(residents, args.wait, args.concurrency)
+        print(f"asyncio   : {elapsed:8.2f}s  {args.residents / elapsed:10.1f} residents/s")
+        print(f"requests served: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""JSON codec throughput on the payload shapes the monitor handles.
+
+Shapes: the upload.json payload, a state.json snapshot, a journal line and
+a portal feed whose entries carry the notification as an embedded JSON string.
+Run from the repository root:
+
+    python -m benchmarks.bench_json_codec --residents 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _shapes(residents: int) -> dict:
+    with open(os.path.join(REPO_ROOT, "data", "upload.json"), encoding="utf-8") as f:
+        upload = json.load(f)
+    with open(os.path.join(REPO_ROOT, "data", "download.json"), encoding="utf-8") as f:
+        notification = f.read()
+
+    timestamp = "2026-01-16T15:12:59.141Z"
+    state = {f"BM{i:06d}": {"status": "S_PRESENT_ROOM", "timestamp": timestamp} for i in range(residents)}
+    journal_line = {"id": "BM000001", "status": "S_ABSENT", "timestamp": timestamp}
+    feed = {f"BM{i:06d}": {"notification": notification} for i in range(residents)}
+    return {
+        "upload.json": upload,
+        "state.json": state,
+        "journal line": journal_line,
+        "portal feed": feed,
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-3 seconds per call."""
+    return min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+
+
+def bench(residents: int) -> None:
+    from utils.json_codec import available_codecs, get_codec
+
+    shapes = _shapes(residents)
+    codecs = [get_codec(name) for name in available_codecs()]
+    print(f"codecs: {', '.join(c.name for c in codecs)}   residents={residents}")
+    print(f"{'shape':14s} {'codec':7s} {'dumps':>10s} {'pretty':>10s} {'loads':>10s} {'size':>9s}")
+
+    for shape, obj in shapes.items():
+        repeat = 20 if shape in ("state.json", "portal feed") else 2000
+        for codec in codecs:
+            wire = codec.dumps(obj)
+            dumps = _time(lambda: codec.dumps(obj), repeat)
+            pretty = _time(lambda: codec.dumps(obj, pretty=True), repeat)
+            if shape == "portal feed":
+                # Feed parsing includes decoding every embedded notification
+                def parse():
+                    for entry in codec.loads(wire).values():
+                        codec.loads(entry["notification"])
+            else:
+                def parse():
+                    codec.loads(wire)
+            loads = _time(parse, repeat)
+            print(
+                f"{shape:14s} {codec.name:7s} {dumps * 1e6:8.1f}us {pretty * 1e6:8.1f}us "
+                f"{loads * 1e6:8.1f}us {len(wire):8d}B"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--residents", type=int, default=1000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    bench(args.residents)
+
+
+if __name__ == "__main__":
+    main()
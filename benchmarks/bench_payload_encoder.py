@@ -0,0 +1,124 @@
+"""Upload payload encoding: load/mutate/dump vs dict dump vs precompiled template.
+
+Paths compared, each producing one resident's upload:
+
+  file      manipulate_sensor_json() on a copy of upload.json (read, parse,
+            mutate, pretty-dump to disk, read back)
+  dict      fill a copy of the template dict and json_codec.dumps() it
+  template  CompiledPayload.render() with the same values
+
+All three use the same random status, vitals and timestamps, and the dict
+and template outputs are checked byte for byte. Run from the repository root:
+
+    python -m benchmarks.bench_payload_encoder --iterations 20000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time(fn, repeat: int) -> float:
+    """Best-of-3 seconds per call."""
+    return min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+
+
+def bench(iterations: int) -> None:
+    from utils import json_codec
+    from utils.json_utils import (
+        _fill_sensor_payload,
+        load_payload_template,
+        manipulate_sensor_json,
+        random_state,
+        random_vital_signs,
+    )
+    from utils.payload_encoder import compile_payload_template
+    from utils.time_utils import now_utc_iso
+
+    template_path = os.path.join(REPO_ROOT, "data", "upload.json")
+    template = load_payload_template(template_path)
+    compiled = compile_payload_template(template)
+
+    # Byte compatibility on the same random values
+    for seed in range(1000):
+        random.seed(seed)
+        data = dict(template)
+        data["ID"] = f"BM{seed:06d}"
+        _fill_sensor_payload(data)
+        resident = data["Resident"]
+        vitals = data["VitalSigns"] if resident["Status"] == "S_PRESENT_BED" else None
+        rendered = compiled.render(
+            data["ID"], resident["Status"], data["Timestamp"], vitals,
+            resident_timestamp=resident["Timestamp"],
+        )
+        if rendered != json_codec.dumps(data):
+            raise SystemExit(f"template output differs from json_codec.dumps for seed {seed}")
+
+    workdir = tempfile.mkdtemp(prefix="bench_payload_")
+    upload_copy = os.path.join(workdir, "upload.json")
+    shutil.copyfile(template_path, upload_copy)
+
+    def file_path():
+        manipulate_sensor_json(upload_copy)
+        with open(upload_copy, "rb") as f:
+            f.read()
+
+    def dict_path():
+        data = dict(template)
+        data["ID"] = "BM000001"
+        _fill_sensor_payload(data)
+        json_codec.dumps(data)
+
+    def template_path_():
+        status = random_state()
+        resident_timestamp = now_utc_iso()
+        vitals = random_vital_signs() if status == "S_PRESENT_BED" else None
+        compiled.render("BM000001", status, now_utc_iso(), vitals, resident_timestamp=resident_timestamp)
+
+    def encode_only_dict():
+        json_codec.dumps(filled)
+
+    def encode_only_template():
+        compiled.render("BM000001", status, timestamp, vitals, resident_timestamp=timestamp)
+
+    random.seed(0)
+    filled = dict(template)
+    filled["ID"] = "BM000001"
+    _fill_sensor_payload(filled)
+    status = filled["Resident"]["Status"]
+    timestamp = filled["Timestamp"]
+    vitals = filled["VitalSigns"] if status == "S_PRESENT_BED" else None
+
+    try:
+        print(f"codec: {json_codec.codec.name}   segments={len(compiled.segments) + 1}   output bytes match")
+        print(f"{'path':22s} {'per call':>10s}")
+        rows = [
+            ("file (load/dump)", file_path, max(1, iterations // 20)),
+            ("dict + dumps", dict_path, iterations),
+            ("template render", template_path_, iterations),
+            ("encode only: dumps", encode_only_dict, iterations),
+            ("encode only: template", encode_only_template, iterations),
+        ]
+        for name, fn, repeat in rows:
+            print(f"{name:22s} {_time(fn, repeat) * 1e6:8.2f}us")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    bench(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Memory per resident: the original per-object monitor vs the struct-of-arrays table.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_resident_memory --residents 10000 100000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _BaselineResident:
+    """Instance attributes of the original ResidentMonitor, before any tuning work."""
+
+    def __init__(self, resident_id: str, interval_sec: int, state_manager):
+        self.resident_id = resident_id
+        self.interval_sec = interval_sec
+        self.mismatch_count = 0
+        self.last_email_ts = None
+        self.state_manager = state_manager
+        self.alert_active = False
+        self.match_count = 0
+        self.a = 0
+        self.upload_path = "data/upload.json"
+        self.download_path = "data/download.json"
+        self.remote_path = f"json_notifications/{resident_id}.json"
+
+
+class _PropagationResident(_BaselineResident):
+    """Baseline plus the propagation fields as plain attributes, with an eager history deque."""
+
+    def __init__(self, resident_id: str, interval_sec: int, state_manager):
+        super().__init__(resident_id, interval_sec, state_manager)
+        self.uploaded_at = None
+        self.expected_status = None
+        self.expected_timestamp = None
+        self.last_propagation_sec = None
+        self.propagation_samples = deque(maxlen=100)
+        self.propagation_timeouts = 0
+
+
+@dataclass
+class _DictResidentState:
+    """ResidentState without __slots__."""
+    resident_id: str
+    status: str
+    timestamp: str
+
+
+def _measure(build) -> tuple:
+    """Return (bytes retained, seconds) for building a structure."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    keep = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return current, elapsed
+
+
+def _fill(resident, propagation: bool = True) -> None:
+    """Give every counter a realistic non-default value."""
+    resident.mismatch_count = 3
+    resident.match_count = 0
+    resident.alert_active = True
+    resident.last_email_ts = time.time()
+    if propagation:
+        resident.uploaded_at = time.monotonic()
+        resident.expected_status = "S_PRESENT_ROOM"
+        resident.last_propagation_sec = 1.25
+
+
+def bench(count: int) -> list:
+    from models import ResidentState, ResidentTable
+    from services.resident_monitor import ResidentMonitor
+
+    ids = [f"BM{i:06d}" for i in range(count)]
+    timestamp = "2026-01-16T15:12:59.141Z"
+
+    shared_state_manager = object()
+
+    def baseline():
+        residents = [_BaselineResident(resident_id, 60, shared_state_manager) for resident_id in ids]
+        for resident in residents:
+            _fill(resident, propagation=False)
+        return residents
+
+    def propagation_objects():
+        residents = [_PropagationResident(resident_id, 60, shared_state_manager) for resident_id in ids]
+        for resident in residents:
+            _fill(resident)
+        return residents
+
+    def table():
+        table = ResidentTable()
+        for resident_id in ids:
+            table.add(resident_id, 60)
+        for resident_id in ids:
+            _fill(table.view(resident_id))
+        return table
+
+    def monitors():
+        table = ResidentTable()
+        residents = [ResidentMonitor(resident_id, 60, table=table) for resident_id in ids]
+        for resident in residents:
+            _fill(resident)
+        return residents
+
+    def dict_states():
+        return [_DictResidentState(resident_id, "S_ABSENT", timestamp) for resident_id in ids]
+
+    def slotted_states():
+        return [ResidentState(resident_id, "S_ABSENT", timestamp) for resident_id in ids]
+
+    results = []
+    for name, build in (
+        ("original ResidentMonitor", baseline),
+        ("objects + eager deque", propagation_objects),
+        ("ResidentTable", table),
+        ("ResidentMonitor (table-backed)", monitors),
+        ("ResidentState (no slots)", dict_states),
+        ("ResidentState (slots)", slotted_states),
+    ):
+        size, elapsed = _measure(build)
+        results.append((name, size, elapsed))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--residents", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault("PORTAL_USERNAME", "bench")
+    os.environ.setdefault("PORTAL_PASSWORD", "bench")
+    os.chdir(REPO_ROOT)
+
+    for count in args.residents:
+        print(f"{count} residents")
+        for name, size, elapsed in bench(count):
+            print(
+                f"  {name:32s} {size / 1024 / 1024:9.2f} MB "
+                f"{size / count:8.1f} B/resident  {elapsed:6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Synthetic-load generation: per-resident random draws vs the NumPy batch generator.
+
+Each round produces a status and vitals for every resident, then encodes
+an upload for each through the precompiled payload template. Also checks
+that two generators with the same seed agree and prints how the simulated
+fleet spends its time. Run from the repository root:
+
+    python -m benchmarks.bench_synthetic_load --residents 10000 --rounds 5
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench(residents: int, rounds: int, interval: float, seed: int) -> None:
+    from utils.json_utils import load_payload_template, random_state, random_vital_signs
+    from utils.payload_encoder import compile_payload_template
+    from benchmarks.synthetic import SyntheticResidents
+    from utils.time_utils import now_utc_iso
+
+    compiled = compile_payload_template(load_payload_template(os.path.join(REPO_ROOT, "data", "upload.json")))
+    ids = [f"BM{i:06d}" for i in range(residents)]
+
+    first, second = SyntheticResidents(residents, seed), SyntheticResidents(residents, seed)
+    for _ in range(3):
+        first.step(interval)
+        second.step(interval)
+    if first.readings() != second.readings():
+        raise SystemExit("same seed produced different readings")
+
+    def per_resident():
+        timestamp = now_utc_iso()
+        for sensor_id in ids:
+            status = random_state()
+            vitals = random_vital_signs() if status == "S_PRESENT_BED" else None
+            compiled.render(sensor_id, status, timestamp, vitals)
+
+    def per_resident_generate_only():
+        for _ in ids:
+            if random_state() == "S_PRESENT_BED":
+                random_vital_signs()
+
+    fleet = SyntheticResidents(residents, seed)
+
+    def batch():
+        fleet.step(interval)
+        timestamp = now_utc_iso()
+        for sensor_id, (status, vitals) in zip(ids, fleet.readings()):
+            compiled.render(sensor_id, status, timestamp, vitals)
+
+    def generate_only():
+        fleet.step(interval)
+        fleet.readings()
+
+    print(f"residents={residents} rounds={rounds} interval={interval:g}s seed={seed}   seeded runs match")
+    paths = (
+        ("per-resident + encode", per_resident),
+        ("batch + encode", batch),
+        ("per-resident generate", per_resident_generate_only),
+        ("batch generate", generate_only),
+    )
+    for name, fn in paths:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name:22s} {residents * rounds / elapsed:12,.0f} residents/s")
+
+    counts = collections.Counter()
+    for _ in range(200):
+        fleet.step(interval)
+        counts.update(fleet.statuses())
+    total = sum(counts.values())
+    print("time in state: " + ", ".join(f"{name} {count / total:.0%}" for name, count in sorted(counts.items())))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--residents", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=60.0, help="Simulated seconds per round")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    bench(args.residents, args.rounds, args.interval, args.seed)
+
+
+if __name__ == "__main__":
+    main()
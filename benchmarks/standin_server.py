@@ -0,0 +1,164 @@
+"""Local stand-in for the WebDAV server and the portal notifications feed."""
+
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 stalls bursts of concurrent connects
+    request_queue_size = 1024
+
+
+FEED_PATH = "/ems/vmedd-monitor/fo/portal/vmeddNotifications.json"
+NOTIFICATIONS_DIR = "/json_notifications/"
+
+
+class StandInServer:
+    """Threaded HTTP server that accepts WebDAV PUTs and serves them as a portal feed.
+
+    Every uploaded notification file is echoed back in the feed, so a monitor
+    pointed at this server always sees its own status (no mismatches).
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize stand-in server.
+
+        Args:
+            latency: Artificial delay in seconds added to every request
+        """
+        self.latency = latency
+        self.files = {}
+        self.meta = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._server = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def feed(self) -> dict:
+        with self.lock:
+            files = dict(self.files)
+        feed = {}
+        for path, body in files.items():
+            if path.startswith(NOTIFICATIONS_DIR):
+                sensor_id = path[len(NOTIFICATIONS_DIR):].rsplit(".", 1)[0]
+                feed[sensor_id] = {"notification": body.decode("utf-8")}
+        return feed
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _begin(self):
+                with server.lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+            def _reply(self, code: int, body: bytes = b"", content_type: str = "application/json",
+                       headers: dict | None = None):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _file_headers(self, path: str) -> dict:
+                meta = server.meta.get(path)
+                if meta is None:
+                    return {}
+                return {"ETag": meta[0], "Last-Modified": meta[1]}
+
+            def do_HEAD(self):
+                self._begin()
+                with server.lock:
+                    body = server.files.get(self.path, b"")
+                    headers = self._file_headers(self.path)
+                self._reply(200, body, headers=headers)
+
+            def do_PUT(self):
+                self._begin()
+                body = self._read_body()
+                now = time.time()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                with server.lock:
+                    server.files[self.path] = body
+                    server.meta[self.path] = (etag, formatdate(now, usegmt=True), now)
+                self._reply(201)
+
+            def do_GET(self):
+                self._begin()
+                if self.path.split("?", 1)[0] == FEED_PATH:
+                    self._reply(200, json.dumps(server.feed()).encode("utf-8"))
+                    return
+                with server.lock:
+                    body = server.files.get(self.path)
+                    headers = self._file_headers(self.path)
+                if body is None:
+                    self._reply(404)
+                else:
+                    self._reply(200, body, headers=headers)
+
+            def do_PROPFIND(self):
+                self._begin()
+                self._read_body()
+                entries = [
+                    f"<d:response><d:href>{self.path}</d:href>"
+                    "<d:propstat><d:prop><d:resourcetype><d:collection/></d:resourcetype>"
+                    "</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>"
+                ]
+                if self.headers.get("Depth", "1") != "0":
+                    prefix = self.path if self.path.endswith("/") else self.path + "/"
+                    with server.lock:
+                        children = [
+                            (path, len(server.files[path]), server.meta.get(path))
+                            for path in server.files
+                            if path.startswith(prefix) and "/" not in path[len(prefix):]
+                        ]
+                    for path, size, meta in children:
+                        etag, modified = (meta[0], meta[1]) if meta else ("", "")
+                        entries.append(
+                            f"<d:response><d:href>{path}</d:href><d:propstat><d:prop>"
+                            "<d:resourcetype/>"
+                            f"<d:getcontentlength>{size}</d:getcontentlength>"
+                            f"<d:getlastmodified>{modified}</d:getlastmodified>"
+                            f"<d:getetag>{escape(etag)}</d:getetag>"
+                            "</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>"
+                        )
+                body = (
+                    '<?xml version="1.0" encoding="utf-8"?>'
+                    '<d:multistatus xmlns:d="DAV:">' + "".join(entries) + "</d:multistatus>"
+                ).encode("utf-8")
+                self._reply(207, body, "application/xml")
+
+        return Handler
@@ -0,0 +1,139 @@
+"""Vectorized synthetic residents for the load benchmarks (requires NumPy)."""
+
+import math
+from models.enums import HUMAN_RANGES, STATE_LIST
+
+try:
+    import numpy as np
+except ImportError:  # optional, only needed for batch generation
+    np = None
+
+
+STATES = tuple(sorted(STATE_LIST))
+
+# Mean seconds a resident stays in a state before moving on
+MEAN_DWELL_SEC = {
+    "S_ABSENT": 1800.0,
+    "S_PRESENT_ROOM": 900.0,
+    "S_PRESENT_BED": 5400.0,
+    "S_PRESENT_BATHROOM": 300.0,
+}
+
+# Next-state probabilities when a dwell ends
+TRANSITIONS = {
+    "S_ABSENT": {"S_PRESENT_ROOM": 1.0},
+    "S_PRESENT_ROOM": {"S_PRESENT_BED": 0.5, "S_PRESENT_BATHROOM": 0.3, "S_ABSENT": 0.2},
+    "S_PRESENT_BED": {"S_PRESENT_ROOM": 0.7, "S_PRESENT_BATHROOM": 0.3},
+    "S_PRESENT_BATHROOM": {"S_PRESENT_ROOM": 0.8, "S_PRESENT_BED": 0.2},
+}
+
+# Vital sign -> (population mean, spread of resident baselines,
+#                within-resident drift std, drift mean-reversion time in seconds)
+VITAL_MODEL = {
+    "Heart": (70.0, 8.0, 6.0, 600.0),
+    "Breath": (15.0, 2.0, 2.0, 600.0),
+    "Temperature": (36.8, 0.3, 0.2, 3600.0),
+}
+
+
+class SyntheticResidents:
+    """States and vital signs for many residents, advanced in one step.
+
+    Each resident follows a Markov chain over STATE_LIST with exponential
+    dwell times (MEAN_DWELL_SEC, TRANSITIONS). Every vital sign drifts
+    around a per-resident baseline as a mean-reverting (Ornstein-Uhlenbeck)
+    process, clipped to HUMAN_RANGES. Vitals are only reported while the
+    resident is in bed; otherwise they are zero, as in random_vital_signs().
+
+    The same seed and step sequence always produce the same values.
+    """
+
+    def __init__(self, count: int, seed: int | None = None):
+        """
+        Initialize residents.
+
+        Args:
+            count: Number of residents
+            seed: Seed for the generator (None for fresh entropy)
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("SyntheticResidents requires NumPy (pip install numpy)")
+        self.count = count
+        self.rng = np.random.default_rng(seed)
+        self.elapsed = 0.0
+
+        self._mean_dwell = np.array([MEAN_DWELL_SEC[name] for name in STATES])
+        cumulative = np.zeros((len(STATES), len(STATES)))
+        for i, name in enumerate(STATES):
+            probabilities = [TRANSITIONS[name].get(other, 0.0) for other in STATES]
+            cumulative[i] = np.cumsum(probabilities) / sum(probabilities)
+        self._cumulative = cumulative
+
+        self.state = self.rng.integers(0, len(STATES), count).astype(np.int8)
+        self.dwell = self.rng.exponential(self._mean_dwell[self.state])
+
+        self.baseline = {}
+        self.vitals = {}
+        for name, (mean, spread, drift, _) in VITAL_MODEL.items():
+            low, high = HUMAN_RANGES[name]
+            baseline = np.clip(self.rng.normal(mean, spread, count), low, high)
+            self.baseline[name] = baseline
+            self.vitals[name] = np.clip(baseline + self.rng.normal(0.0, drift, count), low, high)
+
+    def step(self, dt: float) -> None:
+        """
+        Advance every resident by dt seconds.
+
+        Args:
+            dt: Simulated seconds since the previous step
+        """
+        self.elapsed += dt
+        self.dwell -= dt
+        moving = np.flatnonzero(self.dwell <= 0)
+        # A resident moves at most once per step; long steps just start a fresh dwell
+        if moving.size:
+            draws = self.rng.random(moving.size)
+            rows = self._cumulative[self.state[moving]]
+            self.state[moving] = np.minimum((draws[:, None] > rows).sum(axis=1), len(STATES) - 1)
+            self.dwell[moving] = self.rng.exponential(self._mean_dwell[self.state[moving]])
+
+        for name, (_, _, drift, reversion_sec) in VITAL_MODEL.items():
+            low, high = HUMAN_RANGES[name]
+            decay = math.exp(-dt / reversion_sec)
+            noise = drift * math.sqrt(1.0 - decay * decay)
+            baseline = self.baseline[name]
+            values = baseline + (self.vitals[name] - baseline) * decay
+            values += self.rng.normal(0.0, noise, self.count)
+            self.vitals[name] = np.clip(values, low, high)
+
+    def statuses(self) -> list:
+        """Current status name of every resident."""
+        names = np.array(STATES, dtype=object)
+        return names[self.state].tolist()
+
+    def readings(self) -> list:
+        """
+        Current status and reported vitals of every resident.
+
+        Returns:
+            list: [(status, vitals)] where vitals has the random_vital_signs()
+                  shape for residents in bed and is None otherwise
+        """
+        statuses = self.statuses()
+        heart = np.rint(self.vitals["Heart"]).astype(np.int64).tolist()
+        breath = np.rint(self.vitals["Breath"]).astype(np.int64).tolist()
+        temperature = np.round(self.vitals["Temperature"], 1).tolist()
+        result = []
+        for i, status in enumerate(statuses):
+            if status != "S_PRESENT_BED":
+                result.append((status, None))
+                continue
+            result.append((status, {
+                "Heart": {"Value": heart[i], "Limit": 0},
+                "Breath": {"Value": breath[i], "Limit": 0},
+                "Temperature": {"Value": temperature[i], "Limit": 0},
+            }))
+        return result
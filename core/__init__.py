@@ -1,22 +1,28 @@
 """Core module for Server Monitor."""
 
-from .storage import download_file, upload_file
+from .storage import download_file, upload_file, upload_bytes, get_download_cache_stats
 from .initialization import (
     setup_logging,
     init_webdav_client,
     get_saved_client,
     initialize_portal,
     get_saved_session,
+    get_portal_startup,
+    get_session_manager_metrics,
     get_paths
 )
 
 __all__ = [
     "download_file",
     "upload_file",
+    "upload_bytes",
+    "get_download_cache_stats",
     "setup_logging",
     "init_webdav_client",
     "get_saved_client",
     "initialize_portal",
     "get_saved_session",
+    "get_portal_startup",
+    "get_session_manager_metrics",
     "get_paths"
 ]
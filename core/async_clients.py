@@ -0,0 +1,161 @@
+"""Async WebDAV and portal clients sharing one aiohttp connection pool."""
+
+import asyncio
+import logging
+import os
+from urllib.parse import quote
+
+import aiohttp
+
+from config.config import SENSOR_INFO_URL
+from core.portal import FEED_CHUNK_SIZE, FEED_DRAIN_MAX_BYTES, SessionExpiredError
+from utils import json_codec
+from utils.feed_parser import FeedStreamParser
+from utils.json_utils import manipulate_sensor_json
+
+
+logger = logging.getLogger(__name__)
+
+# Total connections in the shared pool and per host
+ASYNC_POOL_LIMIT = int(os.getenv("ASYNC_POOL_LIMIT", "100"))
+ASYNC_POOL_LIMIT_PER_HOST = int(os.getenv("ASYNC_POOL_LIMIT_PER_HOST", "50"))
+ASYNC_HTTP_TIMEOUT = float(os.getenv("ASYNC_HTTP_TIMEOUT", "10"))
+
+
+def create_http_pool(
+    limit: int = ASYNC_POOL_LIMIT,
+    limit_per_host: int = ASYNC_POOL_LIMIT_PER_HOST,
+    timeout: float = ASYNC_HTTP_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """
+    Create the aiohttp session shared by all async clients.
+
+    Must be called from inside a running event loop.
+
+    Args:
+        limit: Maximum open connections overall
+        limit_per_host: Maximum open connections per host
+        timeout: Total request timeout in seconds
+
+    Returns:
+        aiohttp.ClientSession: Session backed by one pooled connector
+    """
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+class AsyncWebDAVClient:
+    """Minimal async WebDAV client for uploading notification files."""
+
+    def __init__(self, http: aiohttp.ClientSession, options: dict, verify: bool = False):
+        """
+        Initialize async WebDAV client.
+
+        Args:
+            http: Shared aiohttp session
+            options: WebDAV options as returned by Config.get_webdav_options()
+            verify: Verify TLS certificates (the sync client disables this)
+        """
+        self.http = http
+        self.hostname = options["webdav_hostname"].rstrip("/")
+        self.auth = aiohttp.BasicAuth(options["webdav_login"], options["webdav_password"])
+        self.ssl = None if verify else False
+
+    def get_url(self, remote_path: str) -> str:
+        return f"{self.hostname}/{quote(remote_path.lstrip('/'))}"
+
+    async def upload(self, data: bytes, remote_path: str) -> None:
+        """PUT raw bytes to a remote path."""
+        async with self.http.put(
+            self.get_url(remote_path), data=data, auth=self.auth, ssl=self.ssl
+        ) as response:
+            if response.status >= 400:
+                raise RuntimeError(
+                    f"WebDAV upload of {remote_path} failed with HTTP {response.status}"
+                )
+
+
+async def async_upload_file(client: AsyncWebDAVClient, local_path: str, remote_path: str) -> None:
+    """
+    Async counterpart of core.storage.upload_file.
+    """
+    def _prepare() -> bytes:
+        manipulate_sensor_json(local_path)
+        with open(local_path, "rb") as f:
+            return f.read()
+
+    data = await asyncio.to_thread(_prepare)
+    await client.upload(data, remote_path)
+
+
+class AsyncPortalClient:
+    """Async portal client reusing the cookies of an authenticated session."""
+
+    def __init__(self, http: aiohttp.ClientSession, session, generation: int = 0):
+        """
+        Initialize async portal client.
+
+        Args:
+            http: Shared aiohttp session
+            session: Authenticated requests.Session from initialize_portal()
+            generation: Session manager generation the session belongs to
+        """
+        self.http = http
+        self.refresh(session, generation)
+
+    def refresh(self, session, generation: int) -> None:
+        """Take over the cookies and headers of a (new) authenticated session."""
+        self.generation = generation
+        self.headers = dict(session.headers)
+        cookie_header = "; ".join(f"{c.name}={c.value}" for c in session.cookies)
+        if cookie_header:
+            self.headers["Cookie"] = cookie_header
+
+
+async def async_call_authenticated_api(portal: AsyncPortalClient, sensor_ids=None) -> dict:
+    """
+    Async counterpart of core.portal.call_authenticated_api.
+    """
+    async with portal.http.get(SENSOR_INFO_URL, headers=portal.headers) as response:
+        if response.status in (401, 403):
+            raise SessionExpiredError("Session not authenticated")
+
+        response.raise_for_status()
+        if sensor_ids is None:
+            return await response.json(content_type=None, loads=json_codec.loads)
+
+        parser = FeedStreamParser(sensor_ids)
+        async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+            parser.feed(chunk)
+            if parser.done:
+                break
+        data = parser.close()
+        # An unread body makes aiohttp close the connection on release
+        await _drain_response(response)
+        return data
+
+
+async def _drain_response(response, limit: int = FEED_DRAIN_MAX_BYTES) -> bool:
+    """
+    Read and discard the rest of a response body so its connection is reused.
+
+    Args:
+        response: aiohttp response, possibly partly read
+        limit: Most bytes to read (0 = none, negative = no limit)
+
+    Returns:
+        bool: True if the body ended within limit bytes
+    """
+    if limit == 0:
+        return False
+    read = 0
+    while True:
+        chunk = await response.content.read(FEED_CHUNK_SIZE)
+        if not chunk:
+            return True
+        read += len(chunk)
+        if 0 <= limit < read:
+            return False
@@ -0,0 +1,225 @@
+"""Asyncio monitoring engine for Server Monitor."""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from config.config import Config
+from core.async_clients import (
+    AsyncPortalClient,
+    AsyncWebDAVClient,
+    async_call_authenticated_api,
+    create_http_pool,
+)
+from core.feed_cache import FEED_SELECTIVE_PARSE, AsyncFeedCache
+from core.initialization import get_saved_session
+from core.portal import SessionExpiredError
+from core.session_manager import get_session_manager
+from core.scheduler import SCHEDULER_JITTER
+from services.notification_service import async_notify_mismatch, async_notify_recovery
+from services.resident_monitor import NOTIFY_ALERT, NOTIFY_RECOVERY, ResidentMonitor
+from utils.json_utils import extract_resident
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum resident syncs running at the same time
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "100"))
+# Longest single sleep between shutdown-flag checks
+SHUTDOWN_POLL_SEC = 1.0
+
+
+class AsyncMonitorService:
+    """Runs every resident as a coroutine on one event loop."""
+
+    def __init__(
+        self,
+        residents_config: list,
+        shutdown_flag=None,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+    ):
+        """
+        Initialize async monitor service.
+
+        Args:
+            residents_config: List of resident configs with id, interval, etc.
+            shutdown_flag: Callable that returns True when shutdown is requested
+            max_concurrency: Maximum resident syncs in flight at once
+        """
+        self.residents_config = residents_config
+        self.shutdown_flag = shutdown_flag
+        self.max_concurrency = max(1, max_concurrency)
+        self.monitors = {}
+        # One feed fetch is shared by every resident checking at the same time
+        self.feed_cache = AsyncFeedCache(self._fetch_feed)
+        for config in residents_config:
+            resident_id = config.get("id")
+            self.monitors[resident_id] = ResidentMonitor(
+                resident_id=resident_id,
+                interval_sec=config.get("interval", 60),
+            )
+            logger.info(f"Initialized async monitor for resident {resident_id}")
+        # Decode only our residents' entries of the feed
+        self.sensor_ids = frozenset(self.monitors) if FEED_SELECTIVE_PARSE else None
+
+    def _shutdown_requested(self) -> bool:
+        return bool(self.shutdown_flag and self.shutdown_flag())
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep in short slices so shutdown is noticed promptly."""
+        deadline = time.monotonic() + seconds
+        while not self._shutdown_requested():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, SHUTDOWN_POLL_SEC))
+
+    async def _fetch_feed(self, portal: AsyncPortalClient) -> dict:
+        """Fetch the feed, re-authenticating through the session manager on expiry."""
+        manager = get_session_manager()
+        if manager is not None and portal.generation != manager.generation:
+            # Another engine path already replaced the session
+            portal.refresh(*manager.current())
+        try:
+            return await async_call_authenticated_api(portal, self.sensor_ids)
+        except SessionExpiredError:
+            if manager is None:
+                raise
+            # The lock in reauthenticate() makes concurrent callers share one login
+            await asyncio.to_thread(manager.reauthenticate, portal.generation)
+            portal.refresh(*manager.current())
+            return await async_call_authenticated_api(portal, self.sensor_ids)
+
+    async def wait_for_propagation(self, monitor: ResidentMonitor, portal: AsyncPortalClient) -> dict | None:
+        """Async counterpart of ResidentMonitor.wait_for_propagation."""
+        if monitor.propagation_mode != "poll":
+            await asyncio.sleep(monitor.propagation_wait_sec)
+            return None
+
+        not_before = monitor.uploaded_at
+        api_data = None
+        for delay in monitor.poll_delays():
+            await asyncio.sleep(delay)
+            polled_at = time.monotonic()
+            api_data = await self.feed_cache.get(portal, not_before=not_before)
+            not_before = polled_at
+            if monitor.check_propagation(api_data, polled_at):
+                return api_data
+        monitor.record_propagation_timeout()
+        return api_data
+
+    async def sync_once(
+        self,
+        monitor: ResidentMonitor,
+        webdav: AsyncWebDAVClient,
+        portal: AsyncPortalClient,
+    ) -> bool:
+        """
+        Async counterpart of ResidentMonitor.sync_once.
+
+        Args:
+            monitor: Resident monitor holding counters and state
+            webdav: Async WebDAV client
+            portal: Async portal client
+
+        Returns:
+            bool: True if sync successful, False otherwise
+        """
+        resident_id = monitor.resident_id
+        try:
+            logger.info(f"[{resident_id}] Uploading to {monitor.remote_path}")
+            payload, resident = monitor.build_payload()
+            await webdav.upload(payload, monitor.remote_path)
+            uploaded_at = time.monotonic()
+            monitor.uploaded_at = uploaded_at
+            await asyncio.to_thread(monitor.record_uploaded_status, resident)
+
+            try:
+                api_data = await self.wait_for_propagation(monitor, portal)
+            except Exception:
+                logger.exception(f"[{resident_id}] Polling portal failed")
+                api_data = None
+
+            if api_data is None:
+                api_data = await self.feed_cache.get(portal, not_before=uploaded_at)
+            resident = extract_resident(api_data, resident_id)
+
+            # evaluate() may write to SQLite (STATE_BACKEND=sqlite); keep it off the loop
+            action = await asyncio.to_thread(monitor.evaluate, resident["Status"], resident.get("Timestamp"))
+            if action == NOTIFY_ALERT:
+                await async_notify_mismatch(resident_id, monitor.mismatch_count)
+            elif action == NOTIFY_RECOVERY:
+                await async_notify_recovery(resident_id)
+            return True
+
+        except Exception:
+            logger.exception(f"[{resident_id}] Sync failed")
+            monitor.mismatch_count += 1
+            return False
+
+    async def _resident_loop(self, monitor, webdav, portal, limiter) -> None:
+        """Sync one resident on its own interval until shutdown."""
+        interval = monitor.interval_sec
+        # Stagger start-up so residents do not all fire at once
+        await self._sleep(random.uniform(0.0, interval * SCHEDULER_JITTER))
+        next_ideal = time.monotonic()
+        while not self._shutdown_requested():
+            async with limiter:
+                success = await self.sync_once(monitor, webdav, portal)
+            if not success:
+                logger.warning(f"Sync failed for resident {monitor.resident_id}")
+
+            now = time.monotonic()
+            next_ideal += interval
+            if next_ideal < now:
+                # Fell behind: skip missed slots instead of bursting
+                next_ideal = now
+            await self._sleep(next_ideal - now + random.uniform(0.0, interval * SCHEDULER_JITTER))
+
+    async def run_cycle(self, webdav: AsyncWebDAVClient, portal: AsyncPortalClient) -> list:
+        """
+        Sync every resident once, concurrently.
+
+        Returns:
+            list: Success flag per resident
+        """
+        limiter = asyncio.Semaphore(self.max_concurrency)
+
+        async def _one(monitor):
+            async with limiter:
+                return await self.sync_once(monitor, webdav, portal)
+
+        return await asyncio.gather(*(_one(m) for m in self.monitors.values()))
+
+    async def run(self, webdav_options: dict | None = None, session=None) -> None:
+        """
+        Run all residents until shutdown_flag is set.
+
+        Args:
+            webdav_options: WebDAV options (defaults to Config.get_webdav_options())
+            session: Authenticated portal session (defaults to the saved session)
+        """
+        webdav_options = webdav_options or Config.get_webdav_options()
+        session = session or get_saved_session()
+        if session is None:
+            raise RuntimeError("Portal session not initialized. Call initialize_portal() first.")
+
+        logger.info(
+            f"Starting async monitor service for {len(self.monitors)} residents "
+            f"(max_concurrency={self.max_concurrency})"
+        )
+        async with create_http_pool() as http:
+            webdav = AsyncWebDAVClient(http, webdav_options)
+            manager = get_session_manager()
+            portal = AsyncPortalClient(http, session, manager.generation if manager else 0)
+            limiter = asyncio.Semaphore(self.max_concurrency)
+            await asyncio.gather(
+                *(self._resident_loop(m, webdav, portal, limiter) for m in self.monitors.values())
+            )
+
+        logger.info("Graceful shutdown of async monitor service complete")
+
+    def start(self) -> None:
+        """Blocking entry point matching MonitorService.start()."""
+        asyncio.run(self.run())
@@ -0,0 +1,252 @@
+"""Chrome options and an optional pool of warm headless drivers."""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from config.config import BASE_URL
+
+try:
+    import psutil
+except ImportError:  # memory-based recycling is skipped without psutil
+    psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+# Number of warm drivers to keep (0 = start and quit Chrome for every login)
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "0"))
+# Recycle a driver after this many logins
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "20"))
+# Recycle a driver once Chrome and its children use more than this (needs psutil)
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+
+CHROME_HEADLESS_ARG = os.getenv("CHROME_HEADLESS_ARG", "--headless=new")
+CHROME_BINARY = os.getenv("CHROME_BINARY", "")
+CHROME_EXTRA_ARGS = os.getenv("CHROME_EXTRA_ARGS", "")
+
+
+def build_chrome_options() -> Options:
+    """Build Chrome options; the only place browser flags are defined."""
+    options = Options()
+    if CHROME_HEADLESS_ARG:
+        options.add_argument(CHROME_HEADLESS_ARG)
+    options.add_argument("--disable-gpu")
+    # Docker-only flags
+    if os.getenv("RUNNING_IN_DOCKER") == "1":
+        options.binary_location = CHROME_BINARY or "/usr/bin/chromium"
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+    elif CHROME_BINARY:
+        options.binary_location = CHROME_BINARY
+    for arg in CHROME_EXTRA_ARGS.split():
+        options.add_argument(arg)
+    return options
+
+
+def create_driver():
+    """Start a new Chrome driver with the configured options."""
+    # IMPORTANT: do NOT pass Service()
+    return webdriver.Chrome(options=build_chrome_options())
+
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        logger.warning("Failed to quit Chrome driver cleanly")
+
+
+def driver_rss_mb(driver) -> float | None:
+    """Return resident memory of chromedriver plus all Chrome children, in MB."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        total = 0
+        for proc in procs:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def portal_origin() -> str:
+    """Return the scheme://host[:port] origin of BASE_URL."""
+    parts = urlsplit(BASE_URL)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def reset_driver(driver, origin: str | None = None) -> None:
+    """
+    Clear cookies and the portal's storage so the next login starts clean.
+
+    Args:
+        driver: Pooled WebDriver
+        origin: Origin whose storage is cleared (defaults to the portal origin)
+    """
+    origin = origin or portal_origin()
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    except Exception:
+        # No CDP: WebDriver only reaches the storage of the page it is on
+        try:
+            if not driver.current_url.startswith(origin):
+                driver.get(origin)
+            driver.delete_all_cookies()
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            logger.warning(f"Failed to clear browser storage for {origin}")
+            raise
+    driver.get("about:blank")
+
+
+class BrowserPool:
+    """Fixed-size pool of warm Chrome drivers for login flows.
+
+    Drivers are started lazily, handed out one caller at a time, and
+    recycled after max_uses logins or when their memory grows past
+    max_rss_mb. A driver that raised during use is always recycled.
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_uses: int = BROWSER_MAX_USES,
+        max_rss_mb: int = BROWSER_MAX_RSS_MB,
+        factory=create_driver,
+    ):
+        """
+        Initialize browser pool.
+
+        Args:
+            size: Maximum number of live drivers
+            max_uses: Logins per driver before it is recycled
+            max_rss_mb: Memory limit per driver before it is recycled
+            factory: Callable creating a new driver
+        """
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.factory = factory
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._live = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.created = 0
+        self.recycled = 0
+
+    def _take(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._live < self.size:
+                    self._live += 1
+                    break
+            # Pool is full: wait for a driver to come back (or be retired)
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        with self._lock:
+            self.created += 1
+            self._uses[id(driver)] = 0
+        logger.info(f"Started pooled Chrome driver ({self._live}/{self.size})")
+        return driver
+
+    def _retire(self, driver, reason: str) -> None:
+        logger.info(f"Recycling pooled Chrome driver: {reason}")
+        _quit(driver)
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._live -= 1
+            self.recycled += 1
+
+    def _give_back(self, driver, failed: bool) -> None:
+        with self._lock:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            closed = self._closed
+
+        if closed:
+            self._retire(driver, "pool closed")
+            return
+        if failed:
+            self._retire(driver, "error during use")
+            return
+        if uses >= self.max_uses:
+            self._retire(driver, f"{uses} uses")
+            return
+        rss = driver_rss_mb(driver)
+        if rss is not None and rss > self.max_rss_mb:
+            self._retire(driver, f"memory {rss:.0f}MB > {self.max_rss_mb}MB")
+            return
+        try:
+            reset_driver(driver)
+        except Exception:
+            self._retire(driver, "reset failed")
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        """Borrow a warm driver for the duration of a with-block."""
+        driver = self._take()
+        failed = False
+        try:
+            yield driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._give_back(driver, failed)
+
+    def close(self) -> None:
+        """Quit every idle driver; busy drivers are quit when returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver, "pool closed")
+
+
+_browser_pool: BrowserPool | None = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool | None:
+    """Return the process-wide pool, or None when BROWSER_POOL_SIZE is 0."""
+    global _browser_pool
+    if BROWSER_POOL_SIZE <= 0:
+        return None
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool()
+            atexit.register(_browser_pool.close)
+        return _browser_pool
@@ -0,0 +1,228 @@
+"""Shared snapshot cache for the portal notifications feed."""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from core.session_manager import fetch_feed
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a fetched feed may be reused by other residents.
+# Keep this below PROPAGATION_WAIT so reused snapshots are not too early.
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "2"))
+# Stream the feed and decode only watched sensors ("0" = parse the whole feed)
+FEED_SELECTIVE_PARSE = os.getenv("FEED_SELECTIVE_PARSE", "1") == "1"
+
+
+@dataclass
+class FeedSnapshot:
+    """One fetched copy of the notifications feed."""
+    data: dict
+    started_at: float
+
+
+@dataclass
+class FeedCacheStats:
+    """Counters for feed cache usage."""
+    fetches: int = 0
+    hits: int = 0
+    joined: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _Flight:
+    """A fetch in progress that other callers can wait on."""
+    started_at: float
+    event: threading.Event = field(default_factory=threading.Event)
+    result: dict | None = None
+    error: BaseException | None = None
+
+
+class FeedCache:
+    """Thread-safe feed cache with a short TTL and single-flight fetches.
+
+    A snapshot is reused only if its fetch started within the TTL and no
+    earlier than the caller's not_before time (normally the moment its
+    upload finished), so a resident never checks a feed requested before
+    its own upload.
+
+    Once sensors are registered with watch(), the fetch callable is passed
+    the watched ids so it can skip decoding everything else.
+    """
+
+    def __init__(self, fetch=fetch_feed, ttl: float = FEED_CACHE_TTL, clock=time.monotonic):
+        """
+        Initialize feed cache.
+
+        Args:
+            fetch: Callable taking a session and returning the feed dict
+            ttl: Seconds a snapshot may be reused
+            clock: Monotonic time source
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = FeedCacheStats()
+        self._lock = threading.Lock()
+        self._snapshot: FeedSnapshot | None = None
+        self._in_flight: _Flight | None = None
+        self.sensor_ids: frozenset | None = None
+
+    def watch(self, sensor_ids) -> None:
+        """Restrict future fetches to these sensors (adds to any already watched)."""
+        with self._lock:
+            self.sensor_ids = frozenset(sensor_ids) | (self.sensor_ids or frozenset())
+            self._snapshot = None
+
+    def _usable(self, started_at: float, now: float, not_before: float | None) -> bool:
+        if now - started_at > self.ttl:
+            return False
+        return not_before is None or started_at >= not_before
+
+    def get(self, session, not_before: float | None = None) -> dict:
+        """
+        Return a feed snapshot, fetching it at most once for concurrent callers.
+
+        Args:
+            session: Authenticated session passed to the fetch callable
+            not_before: Monotonic time the snapshot's fetch must not precede
+
+        Returns:
+            dict: Notifications feed keyed by sensor id
+        """
+        while True:
+            with self._lock:
+                now = self.clock()
+                snapshot = self._snapshot
+                if snapshot and self._usable(snapshot.started_at, now, not_before):
+                    self.stats.hits += 1
+                    return snapshot.data
+
+                flight = self._in_flight
+                leader = flight is None
+                if leader:
+                    flight = _Flight(started_at=now)
+                    self._in_flight = flight
+
+            if leader:
+                return self._lead(flight, session)
+
+            flight.event.wait()
+            if not_before is None or flight.started_at >= not_before:
+                with self._lock:
+                    self.stats.joined += 1
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+            # The fetch we waited on started before our upload; go again
+
+    def _lead(self, flight: _Flight, session) -> dict:
+        try:
+            sensor_ids = self.sensor_ids
+            if sensor_ids is None:
+                flight.result = self.fetch(session)
+            else:
+                flight.result = self.fetch(session, sensor_ids)
+            with self._lock:
+                self.stats.fetches += 1
+                self._snapshot = FeedSnapshot(flight.result, flight.started_at)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.stats.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight = None
+            flight.event.set()
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._snapshot = None
+
+
+class AsyncFeedCache:
+    """Asyncio counterpart of FeedCache for the async engine."""
+
+    def __init__(self, fetch, ttl: float = FEED_CACHE_TTL, clock=time.monotonic):
+        """
+        Initialize async feed cache.
+
+        Args:
+            fetch: Coroutine function taking a portal client and returning the feed dict
+            ttl: Seconds a snapshot may be reused
+            clock: Monotonic time source
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = FeedCacheStats()
+        self._snapshot: FeedSnapshot | None = None
+        self._in_flight: tuple[float, asyncio.Future] | None = None
+
+    def _usable(self, started_at: float, now: float, not_before: float | None) -> bool:
+        if now - started_at > self.ttl:
+            return False
+        return not_before is None or started_at >= not_before
+
+    async def get(self, portal, not_before: float | None = None) -> dict:
+        """Async counterpart of FeedCache.get."""
+        while True:
+            now = self.clock()
+            snapshot = self._snapshot
+            if snapshot and self._usable(snapshot.started_at, now, not_before):
+                self.stats.hits += 1
+                return snapshot.data
+
+            if self._in_flight is None:
+                future = asyncio.get_running_loop().create_future()
+                self._in_flight = (now, future)
+                try:
+                    data = await self.fetch(portal)
+                    self.stats.fetches += 1
+                    self._snapshot = FeedSnapshot(data, now)
+                    future.set_result(data)
+                    return data
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except BaseException as e:
+                    self.stats.errors += 1
+                    future.set_exception(e)
+                    # Mark retrieved so an unawaited failure is not logged twice
+                    future.exception()
+                    raise
+                finally:
+                    self._in_flight = None
+
+            started_at, future = self._in_flight
+            try:
+                data = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leading fetch was cancelled, not us; try again
+                    continue
+                raise
+            if not_before is None or started_at >= not_before:
+                self.stats.joined += 1
+                return data
+
+
+_feed_cache: FeedCache | None = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> FeedCache:
+    """Return the process-wide feed cache."""
+    global _feed_cache
+    with _feed_cache_lock:
+        if _feed_cache is None:
+            _feed_cache = FeedCache()
+        return _feed_cache
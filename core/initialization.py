@@ -6,18 +6,23 @@ Handles setup of logging, WebDAV client, paths, and portal authentication.
 
 import logging
 import os
+import time
 import urllib3
 from webdav3.client import Client
 from colorlog import ColoredFormatter
 from config.config import Config
-from core.portal import validate_credentials, browser_login, create_authenticated_session
+from core.portal import validate_credentials, browser_login, create_authenticated_session, probe_session
+from core.transport import configure_webdav_client
+from core.session_manager import PortalSessionManager, set_session_manager
+from core.session_cache import load_session_cookies, save_session_cookies, clear_session_cache
 
 # Suppress SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Global instances
 _client = None
-_saved_session = None
+_session_manager = None
+_portal_startup = None
 
 
 def setup_logging() -> logging.Logger:
@@ -64,6 +69,7 @@ def init_webdav_client() -> Client:
     
     _client = Client(options)
     _client.verify = False
+    configure_webdav_client(_client)
     
     logger.info("WebDAV client initialized successfully")
     return _client
@@ -81,11 +87,15 @@ def get_saved_client() -> Client:
     return _client
 
 
-def initialize_portal() -> None:
-    """Initialize portal: validate credentials, login, and fetch sensor data."""
-    global _saved_session
-    logger = logging.getLogger(__name__)
+def login_portal():
+    """Validate credentials, log in with the browser and build a session.
     
+    Returns:
+        requests.Session: Freshly authenticated session (also saved to the cookie cache)
+    """
+    logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+
     logger.info("Step 1: Validating backend credentials...")
     validate_credentials()
     
@@ -93,17 +103,76 @@ def initialize_portal() -> None:
     cookies = browser_login()
     
     logger.info("Step 3: Creating authenticated session...")
-    _saved_session = create_authenticated_session(cookies)
+    session = create_authenticated_session(cookies)
+
+    save_session_cookies(cookies, login_seconds=time.perf_counter() - start)
+    return session
+
+
+def initialize_portal() -> None:
+    """Initialize portal: reuse cached cookies, or validate credentials and log in."""
+    global _session_manager, _portal_startup
+    logger = logging.getLogger(__name__)
+    start = time.perf_counter()
+
+    session = None
+    cached = load_session_cookies()
+    if cached:
+        logger.info("Probing cached portal session...")
+        candidate = create_authenticated_session(cached["cookies"])
+        if probe_session(candidate):
+            session = candidate
+            elapsed = time.perf_counter() - start
+            _portal_startup = {"source": "cache", "seconds": elapsed}
+            login_seconds = cached.get("login_seconds")
+            baseline = f" (browser login took {login_seconds:.2f}s)" if login_seconds else ""
+            logger.info(f"Portal ready from cached session in {elapsed:.2f}s{baseline}")
+        else:
+            logger.info("Cached portal session rejected, logging in again")
+            clear_session_cache()
+
+    if session is None:
+        session = login_portal()
+        elapsed = time.perf_counter() - start
+        _portal_startup = {"source": "browser", "seconds": elapsed}
+        logger.info(f"Portal ready after browser login in {elapsed:.2f}s")
+
+    # Expired sessions are replaced in flight by the manager
+    _session_manager = PortalSessionManager(login=login_portal, session=session)
+    set_session_manager(_session_manager)
+
+
+def get_portal_startup() -> dict | None:
+    """Return how the portal session was obtained and how long it took.
+    
+    Returns:
+        dict: {"source": "cache" | "browser", "seconds": float}, or None before startup
+    """
+    return _portal_startup
 
 
 def get_saved_session():
-    """Get the saved authenticated session.
+    """Get the current authenticated session.
     
     Returns:
         requests.Session: The authenticated session, or None if not initialized
     """
-    global _saved_session
-    return _saved_session
+    global _session_manager
+    if _session_manager is None:
+        return None
+    return _session_manager.session
+
+
+def get_session_manager_metrics():
+    """Get re-login count and latency.
+    
+    Returns:
+        ReloginMetrics: Re-authentication counters, or None if not initialized
+    """
+    global _session_manager
+    if _session_manager is None:
+        return None
+    return _session_manager.metrics
 
 
 def get_paths() -> tuple[str, str, str]:
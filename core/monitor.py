@@ -3,30 +3,70 @@
 import os
 import time
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from core.initialization import get_saved_client, get_saved_session
+from core.feed_cache import FEED_SELECTIVE_PARSE, get_feed_cache
+from core.scheduler import DeadlineScheduler
+from core.session_manager import get_session_manager
+from core.transport import get_transport_stats
 from services.resident_monitor import ResidentMonitor
-from services.notification_service import send_mismatch_email
+from services.notification_service import NOTIFY_MODE, get_notification_stats
+from services.state_manager import STATE_PERSIST_MODE, get_flush_stats
+from utils.webdav_utils import NOTIFICATIONS_DIR, find_stale_residents, scan_directory
 
 
 logger = logging.getLogger(__name__)
 
+# Longest single sleep between shutdown-flag checks
+SHUTDOWN_POLL_SEC = 1.0
+# How often scheduler drift/lateness counters are logged
+SCHEDULER_REPORT_INTERVAL = int(os.getenv("SCHEDULER_REPORT_INTERVAL", "300"))
+# Worker threads for resident syncs (1 = run syncs inline, one after another)
+MONITOR_WORKERS = int(os.getenv("MONITOR_WORKERS", "1"))
+# Maximum syncs submitted to the pool at once (defaults to MONITOR_WORKERS)
+MONITOR_MAX_IN_FLIGHT = int(os.getenv("MONITOR_MAX_IN_FLIGHT", "0"))
+# How often all notification files are checked for freshness (0 = never)
+FRESHNESS_CHECK_INTERVAL = int(os.getenv("FRESHNESS_CHECK_INTERVAL", "300"))
+# A file is stale once it is older than this many sync intervals
+FRESHNESS_STALE_FACTOR = float(os.getenv("FRESHNESS_STALE_FACTOR", "3"))
+
 
 class MonitorService:
     """Service for continuous monitoring of residents."""
-    
-    def __init__(self, residents_config: list, shutdown_flag=None):
+
+    def __init__(
+        self,
+        residents_config: list,
+        shutdown_flag=None,
+        max_workers: int = MONITOR_WORKERS,
+        max_in_flight: int = MONITOR_MAX_IN_FLIGHT,
+    ):
         """
         Initialize monitor service.
-        
+
         Args:
             residents_config: List of resident configs with id, interval, etc.
             shutdown_flag: Callable that returns True when shutdown is requested
+            max_workers: Worker threads for concurrent syncs (1 = sequential)
+            max_in_flight: Upper bound on submitted but unfinished syncs
         """
         self.residents_config = residents_config
         self.shutdown_flag = shutdown_flag
+        self.max_workers = max(1, max_workers)
+        self.max_in_flight = max_in_flight if max_in_flight > 0 else self.max_workers
         self.monitors = {}
+        self.scheduler = DeadlineScheduler()
+        self._last_report = time.monotonic()
+        self._last_freshness_check = time.monotonic()
+        self.stale_residents = {}
+        self._pending = deque()
+        self._in_flight = {}
+        self.overlap_skips = 0
         self._initialize_monitors()
-    
+        if FEED_SELECTIVE_PARSE:
+            get_feed_cache().watch(self.monitors)
+
     def _initialize_monitors(self):
         """Initialize monitors for each resident."""
         for config in self.residents_config:
@@ -37,36 +77,284 @@ class MonitorService:
                 interval_sec=interval
             )
             self.monitors[resident_id] = monitor
+            self.scheduler.add(resident_id, interval)
             logger.info(f"Initialized monitor for resident {resident_id}")
-    
-    def start(self) -> None:
+
+    def _shutdown_requested(self) -> bool:
+        return bool(self.shutdown_flag and self.shutdown_flag())
+
+    def _wait_for_next_due(self) -> None:
+        """Sleep until the next resident is due, checking the shutdown flag."""
+        while not self._shutdown_requested():
+            remaining = self.scheduler.time_until_next()
+            if remaining is None:
+                remaining = SHUTDOWN_POLL_SEC
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, SHUTDOWN_POLL_SEC))
+
+    def _report_scheduler_stats(self) -> None:
+        """Periodically log per-resident lateness/drift, HTTP pool reuse, feed cache and portal re-auth."""
+        now = time.monotonic()
+        if now - self._last_report < SCHEDULER_REPORT_INTERVAL:
+            return
+        self._last_report = now
+        for resident_id, stats in self.scheduler.get_all_stats().items():
+            logger.info(
+                f"[{resident_id}] Scheduler: runs={stats.runs} "
+                f"late={stats.late_runs} skipped={stats.skipped_runs} "
+                f"avg_lateness={stats.avg_lateness:.2f}s "
+                f"max_lateness={stats.max_lateness:.2f}s "
+                f"drift={stats.last_drift:.2f}s"
+            )
+        for host, pool in get_transport_stats().items():
+            logger.info(
+                f"HTTP pool {host}: connections={pool['connections']} "
+                f"requests={pool['requests']} reused={pool['reused']} idle={pool['idle']}"
+            )
+        feed = get_feed_cache().stats
+        logger.info(
+            f"Feed cache: fetches={feed.fetches} hits={feed.hits} "
+            f"joined={feed.joined} errors={feed.errors}"
+        )
+        manager = get_session_manager()
+        if manager is not None:
+            relogin = manager.metrics
+            logger.info(
+                f"Portal re-auth: relogins={relogin.count} failures={relogin.failures} "
+                f"avg={relogin.avg_seconds:.2f}s last={relogin.last_seconds:.2f}s"
+            )
+        if STATE_PERSIST_MODE == "deferred":
+            flush = get_flush_stats()
+            logger.info(
+                f"State flush: interval={flush['interval_ms']}ms batch={flush['batch']} "
+                f"flushes={flush['flushes']} entries={flush['entries']} "
+                f"coalesced={flush['coalesced']} dirty={flush['dirty']} "
+                f"avg={flush['avg_seconds'] * 1000:.1f}ms max={flush['max_seconds'] * 1000:.1f}ms"
+            )
+        if NOTIFY_MODE == "outbox":
+            mail = get_notification_stats()
+            logger.info(
+                f"Notification outbox: depth={mail['depth']} max_depth={mail['max_depth']} "
+                f"sent={mail['sent']} failed={mail['failed']} dropped={mail['dropped']} "
+                f"digests={mail['digests']} digested={mail['digested']} "
+                f"deferred={mail['deferred']} replayed={mail['replayed']} "
+                f"duplicates={mail['duplicates']} "
+                f"throttled={mail['throttled_seconds']:.0f}s "
+                f"connects={mail['connects']} avg_send={mail['avg_send_seconds'] * 1000:.0f}ms "
+                f"max_send={mail['max_send_seconds'] * 1000:.0f}ms "
+                f"max_wait={mail['max_wait_seconds'] * 1000:.0f}ms"
+            )
+
+    def _check_freshness(self, client) -> None:
+        """Periodically flag residents whose remote file stopped updating.
+
+        One PROPFIND covers every resident; no file content is downloaded.
         """
-        Start continuous monitoring of all residents.
-        Runs until shutdown_flag is set.
+        if FRESHNESS_CHECK_INTERVAL <= 0 or client is None:
+            return
+        now = time.monotonic()
+        if now - self._last_freshness_check < FRESHNESS_CHECK_INTERVAL:
+            return
+        self._last_freshness_check = now
+
+        try:
+            records = scan_directory(client, NOTIFICATIONS_DIR)
+        except Exception:
+            logger.exception(f"Freshness scan of {NOTIFICATIONS_DIR} failed")
+            return
+
+        max_age = {
+            resident_id: monitor.interval_sec * FRESHNESS_STALE_FACTOR
+            for resident_id, monitor in self.monitors.items()
+        }
+        self.stale_residents = find_stale_residents(records, max_age)
+        for resident_id, age in self.stale_residents.items():
+            if age is None:
+                logger.warning(f"[{resident_id}] No notification file in {NOTIFICATIONS_DIR}")
+            else:
+                logger.warning(f"[{resident_id}] Notification file not updated for {age:.0f}s")
+        logger.info(
+            f"Freshness scan: {len(records)} files, "
+            f"{len(self.stale_residents)} stale resident(s)"
+        )
+
+    def get_scheduler_stats(self) -> dict:
+        """Return scheduler timing counters keyed by resident id."""
+        return self.scheduler.get_all_stats()
+
+    def _run_sync(self, resident_id: str, client, session) -> bool:
+        """Run one resident sync, isolating any failure to that resident."""
+        try:
+            success = self.monitors[resident_id].sync_once(client=client, session=session)
+        except Exception:
+            logger.exception(f"[{resident_id}] Unhandled error during sync")
+            success = False
+        if not success:
+            logger.warning(f"Sync failed for resident {resident_id}")
+        return success
+
+    def _sync_batch(self, resident_ids: list, client, session) -> None:
+        """
+        Sync a batch of due residents with one shared propagation wait.
+
+        All residents upload first, then wait once, then verify against a
+        single feed snapshot instead of one portal fetch per resident.
+        """
+        if client is None or session is None:
+            for resident_id in resident_ids:
+                self._run_sync(resident_id, client, session)
+            return
+
+        uploaded = []
+        for resident_id in resident_ids:
+            if self._shutdown_requested():
+                return
+            monitor = self.monitors[resident_id]
+            if monitor.upload_once(client):
+                uploaded.append(monitor)
+            else:
+                logger.warning(f"Sync failed for resident {resident_id}")
+
+        if not uploaded:
+            return
+        try:
+            snapshots = self._wait_for_batch(uploaded, session)
+        except Exception:
+            logger.exception("Polling portal failed")
+            snapshots = {}
+
+        for monitor in uploaded:
+            api_data = snapshots.get(monitor.resident_id)
+            if not monitor.verify_once(session, api_data=api_data):
+                logger.warning(f"Sync failed for resident {monitor.resident_id}")
+
+    def _wait_for_batch(self, uploaded: list, session) -> dict:
         """
-        logger.info(f"Starting monitor service for {len(self.monitors)} residents")
-        
-        while not (self.shutdown_flag and self.shutdown_flag()):
+        Wait until the portal reflects a batch of uploads.
+
+        Poll mode shares each feed snapshot across the whole batch and stops
+        as soon as every upload is visible or the deadline expires.
+
+        Returns:
+            dict: Last feed snapshot seen per resident id (empty in fixed mode)
+        """
+        if any(m.propagation_mode != "poll" for m in uploaded):
+            wait_sec = max(m.propagation_wait_sec for m in uploaded)
+            logger.debug(f"Waiting {wait_sec} seconds for server processing of {len(uploaded)} upload(s)")
+            time.sleep(wait_sec)
+            return {}
+
+        feed_cache = get_feed_cache()
+        pending = list(uploaded)
+        snapshots = {}
+        not_before = max(m.uploaded_at for m in uploaded)
+        api_data = None
+        for delay in max(uploaded, key=lambda m: m.propagation_deadline_sec).poll_delays():
+            if self._shutdown_requested():
+                break
+            time.sleep(delay)
+            polled_at = time.monotonic()
+            api_data = feed_cache.get(session, not_before=not_before)
+            not_before = polled_at
+            still_pending = []
+            for monitor in pending:
+                if monitor.check_propagation(api_data, polled_at):
+                    snapshots[monitor.resident_id] = api_data
+                else:
+                    still_pending.append(monitor)
+            pending = still_pending
+            if not pending:
+                break
+
+        for monitor in pending:
+            monitor.record_propagation_timeout()
+            if api_data is not None:
+                snapshots[monitor.resident_id] = api_data
+        return snapshots
+
+    def _queue_due(self) -> None:
+        """Move due residents into the pending queue, dropping overlapping runs."""
+        for resident_id in self.scheduler.pop_due():
+            if resident_id in self._in_flight or resident_id in self._pending:
+                self.overlap_skips += 1
+                logger.debug(f"[{resident_id}] Previous sync still running, skipping run")
+                continue
+            self._pending.append(resident_id)
+
+    def _run_sequential(self) -> None:
+        """Run due residents inline, one after another."""
+        while not self._shutdown_requested():
             try:
                 # Get client and session for each cycle
                 client = get_saved_client()
                 session = get_saved_session()
-                
-                for resident_id, monitor in self.monitors.items():
-                    success = monitor.sync_once(client=client, session=session)
-                    if not success:
-                        logger.warning(f"Sync failed for resident {resident_id}")
-                
-                # Sleep based on minimum interval
-                min_interval = min(
-                    (config.get("interval", 60) for config in self.residents_config),
-                    default=60
-                )
-                logger.debug(f"Sleeping for {min_interval} seconds")
-                time.sleep(min_interval)
-                
+
+                due = self.scheduler.pop_due()
+                if due:
+                    self._sync_batch(due, client, session)
+
+                self._check_freshness(client)
+                self._report_scheduler_stats()
+                self._wait_for_next_due()
+
             except Exception:
                 logger.exception("Monitor cycle failed")
                 time.sleep(5)
-        
+
+    def _run_concurrent(self) -> None:
+        """Submit due residents to a thread pool, bounded by max_in_flight."""
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="resident-sync"
+        ) as executor:
+            while not self._shutdown_requested():
+                try:
+                    client = get_saved_client()
+                    session = get_saved_session()
+
+                    self._queue_due()
+                    while self._pending and len(self._in_flight) < self.max_in_flight:
+                        resident_id = self._pending.popleft()
+                        future = executor.submit(self._run_sync, resident_id, client, session)
+                        self._in_flight[resident_id] = future
+
+                    self._check_freshness(client)
+                    self._report_scheduler_stats()
+
+                    # Wake on the next deadline or when a worker frees a slot
+                    timeout = self.scheduler.time_until_next()
+                    if timeout is None:
+                        timeout = SHUTDOWN_POLL_SEC
+                    timeout = min(timeout, SHUTDOWN_POLL_SEC)
+                    if self._in_flight:
+                        wait(self._in_flight.values(), timeout=timeout, return_when=FIRST_COMPLETED)
+                    elif timeout > 0:
+                        time.sleep(timeout)
+
+                    for resident_id, future in list(self._in_flight.items()):
+                        if future.done():
+                            del self._in_flight[resident_id]
+
+                except Exception:
+                    logger.exception("Monitor cycle failed")
+                    time.sleep(5)
+
+            logger.info(f"Waiting for {len(self._in_flight)} in-flight sync(s) to finish")
+            self._pending.clear()
+
+    def start(self) -> None:
+        """
+        Start continuous monitoring of all residents.
+        Each resident is synced on its own interval until shutdown_flag is set.
+        """
+        logger.info(
+            f"Starting monitor service for {len(self.monitors)} residents "
+            f"(workers={self.max_workers}, max_in_flight={self.max_in_flight})"
+        )
+
+        if self.max_workers > 1:
+            self._run_concurrent()
+        else:
+            self._run_sequential()
+
         logger.info("Graceful shutdown of monitor service complete")
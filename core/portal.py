@@ -2,13 +2,14 @@ import os
 import json
 from dotenv import load_dotenv
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from core.browser_pool import create_driver, get_browser_pool
+from core.transport import create_session, get_shared_session
+from utils import json_codec
+from utils.feed_parser import parse_feed
 from config.config import BASE_URL, LOGGED_IN_URL, LOGIN_API_URL, SENSOR_INFO_URL, START_URL
 
 load_dotenv(override=True)
@@ -18,11 +19,22 @@ PASSWORD = os.getenv("PORTAL_PASSWORD")
 if not USERNAME or not PASSWORD:
     raise RuntimeError("Missing USERNAME or PASSWORD, Please Check .env file")
 
+# Bytes read per chunk when streaming the notifications feed
+FEED_CHUNK_SIZE = int(os.getenv("FEED_CHUNK_SIZE", "65536"))
+# Once the watched sensors are found, read and discard up to this many more bytes so
+# the connection goes back to the pool; a longer remainder closes it instead
+# (0 = stop reading at once and always reconnect, -1 = always drain the whole body)
+FEED_DRAIN_MAX_BYTES = int(os.getenv("FEED_DRAIN_MAX_BYTES", str(4 * 1024 * 1024)))
+
+
+class SessionExpiredError(RuntimeError):
+    """Raised when the portal rejects the session cookies."""
+
 # -------------------------------------------------
 # BACKEND CREDENTIAL CHECK
 # -------------------------------------------------
 def validate_credentials() -> None:
-    response = requests.post(
+    response = get_shared_session().post(
         LOGIN_API_URL,
         data={
             "login": USERNAME,
@@ -43,49 +55,47 @@ def validate_credentials() -> None:
 # BROWSER LOGIN
 # -------------------------------------------------
 def browser_login():
-    options = Options()
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-gpu")
-    # Docker-only flags
-    if os.getenv("RUNNING_IN_DOCKER") == "1":
-        options.binary_location = "/usr/bin/chromium"
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-
-    # IMPORTANT: do NOT pass Service()
-    driver = webdriver.Chrome(options=options)
+    pool = get_browser_pool()
+    if pool is not None:
+        with pool.driver() as driver:
+            return _login_with_driver(driver)
+
+    driver = create_driver()
     try:
-        driver.get(START_URL)
-        wait = WebDriverWait(driver, 20)
+        return _login_with_driver(driver)
+    finally:
+        driver.quit()
 
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#login")))
 
-        driver.execute_script(
-            'document.querySelector("#login").value = arguments[0];',
-            USERNAME,
-        )
-        driver.execute_script(
-            'document.querySelector("#password").value = arguments[0];',
-            PASSWORD,
-        )
+def _login_with_driver(driver):
+    driver.get(START_URL)
+    wait = WebDriverWait(driver, 20)
 
-        driver.execute_script(
-            'document.querySelector("button#loginButton").click();'
-        )
+    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#login")))
 
-        wait.until(lambda d: LOGGED_IN_URL in d.current_url)
+    driver.execute_script(
+        'document.querySelector("#login").value = arguments[0];',
+        USERNAME,
+    )
+    driver.execute_script(
+        'document.querySelector("#password").value = arguments[0];',
+        PASSWORD,
+    )
 
-        print("Login successful")
-        return driver.get_cookies()
+    driver.execute_script(
+        'document.querySelector("button#loginButton").click();'
+    )
 
-    finally:
-        driver.quit()
+    wait.until(lambda d: LOGGED_IN_URL in d.current_url)
+
+    print("Login successful")
+    return driver.get_cookies()
 
 # -------------------------------------------------
 # SESSION CREATION
 # -------------------------------------------------
 def create_authenticated_session(cookies) -> requests.Session:
-    session = requests.Session()
+    session = create_session()
 
     for cookie in cookies:
         session.cookies.set(
@@ -102,17 +112,80 @@ def create_authenticated_session(cookies) -> requests.Session:
 
     return session
 
+# -------------------------------------------------
+# STREAMED BODIES
+# -------------------------------------------------
+def drain_chunks(chunks, limit: int = FEED_DRAIN_MAX_BYTES) -> bool:
+    """
+    Read and discard the rest of a streamed body so its connection can be reused.
+
+    Closing a response with unread body bytes closes its connection instead
+    of returning it to the pool.
+
+    Args:
+        chunks: Partly consumed iterator from response.iter_content()
+        limit: Most bytes to read (0 = none, negative = no limit)
+
+    Returns:
+        bool: True if the body ended within limit bytes
+    """
+    if limit == 0:
+        return False
+    read = 0
+    for chunk in chunks:
+        read += len(chunk)
+        if 0 <= limit < read:
+            return False
+    return True
+
+# -------------------------------------------------
+# SESSION PROBE
+# -------------------------------------------------
+def probe_session(session) -> bool:
+    """Cheap check that a session is still logged in (no feed download)."""
+    try:
+        with session.get(
+            f"{BASE_URL}{LOGGED_IN_URL}",
+            timeout=10,
+            allow_redirects=False,
+            stream=True,
+        ) as response:
+            # Read the (small) page or redirect body so the connection is reused
+            drain_chunks(response.iter_content(FEED_CHUNK_SIZE))
+    except requests.RequestException:
+        return False
+    # An expired session is redirected to the login page or rejected
+    return 200 <= response.status_code < 300
+
 # -------------------------------------------------
 # AUTHENTICATED API CALL
 # -------------------------------------------------
-def call_authenticated_api(session) -> dict:
+def call_authenticated_api(session, sensor_ids=None) -> dict:
+    """
+    Fetch the notifications feed.
+
+    With sensor_ids, the body is streamed and only those sensors are decoded
+    (see utils.feed_parser); otherwise the whole feed is parsed. The rest of
+    a streamed body is drained (up to FEED_DRAIN_MAX_BYTES) so the pooled
+    connection stays open.
+    """
+    if sensor_ids is not None:
+        with session.get(SENSOR_INFO_URL, timeout=10, stream=True) as response:
+            if response.status_code in (401, 403):
+                raise SessionExpiredError("Session not authenticated")
+            response.raise_for_status()
+            chunks = response.iter_content(FEED_CHUNK_SIZE)
+            data = parse_feed(chunks, sensor_ids)
+            drain_chunks(chunks)
+            return data
+
     response = session.get(SENSOR_INFO_URL, timeout=10)
 
-    if response.status_code == 401:
-        raise RuntimeError("Session not authenticated")
+    if response.status_code in (401, 403):
+        raise SessionExpiredError("Session not authenticated")
 
     response.raise_for_status()
-    data = response.json()
+    data = json_codec.loads(response.content)
 
     #print(json.dumps(data, indent=2, ensure_ascii=False))
     return data
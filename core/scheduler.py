@@ -0,0 +1,171 @@
+"""Deadline scheduler for per-resident sync intervals."""
+
+import heapq
+import logging
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a resident's interval used as random jitter on each deadline
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "0.1"))
+# Seconds a run may start after its deadline before it is counted as late
+SCHEDULER_LATE_TOLERANCE = float(os.getenv("SCHEDULER_LATE_TOLERANCE", "1.0"))
+
+
+@dataclass
+class ScheduleStats:
+    """Timing counters for a single scheduled resident."""
+    interval: float
+    runs: int = 0
+    late_runs: int = 0
+    skipped_runs: int = 0
+    last_lateness: float = 0.0
+    max_lateness: float = 0.0
+    total_lateness: float = 0.0
+    last_drift: float = 0.0
+
+    @property
+    def avg_lateness(self) -> float:
+        return self.total_lateness / self.runs if self.runs else 0.0
+
+
+class DeadlineScheduler:
+    """Min-heap of next-due times, one entry per resident.
+
+    Every resident keeps an ideal grid (anchor + k * interval). Deadlines are
+    the grid point plus a small random jitter, so residents sharing the same
+    interval do not fire in lockstep. Runs that start after their deadline are
+    counted as late, and missed grid points are skipped instead of replayed.
+    """
+
+    def __init__(
+        self,
+        jitter: float = SCHEDULER_JITTER,
+        late_tolerance: float = SCHEDULER_LATE_TOLERANCE,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            jitter: Jitter as a fraction of each resident's interval
+            late_tolerance: Seconds after the deadline before a run is late
+            clock: Monotonic time source
+        """
+        self.jitter = max(0.0, jitter)
+        self.late_tolerance = late_tolerance
+        self.clock = clock
+        self._heap = []
+        self._ideal = {}
+        self._entries = {}
+        self._stats = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _jitter(self, interval: float) -> float:
+        return random.uniform(0.0, interval * self.jitter) if self.jitter else 0.0
+
+    def _push(self, key, due: float) -> None:
+        self._seq += 1
+        entry = (due, self._seq, key)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def add(self, key, interval: float, first_due: float | None = None) -> None:
+        """
+        Register a resident.
+
+        Args:
+            key: Resident identifier
+            interval: Sync interval in seconds
+            first_due: Monotonic time of the first run (defaults to now + jitter)
+        """
+        if interval <= 0:
+            raise ValueError(f"Interval for {key} must be positive")
+        now = self.clock()
+        ideal = now if first_due is None else first_due
+        self._ideal[key] = ideal
+        self._stats[key] = ScheduleStats(interval=float(interval))
+        self._push(key, ideal + self._jitter(interval))
+
+    def remove(self, key) -> None:
+        """Unregister a resident; its heap entry is discarded lazily."""
+        self._entries.pop(key, None)
+        self._ideal.pop(key, None)
+        self._stats.pop(key, None)
+
+    def next_due(self) -> float | None:
+        """Return the earliest deadline, or None if nothing is scheduled."""
+        while self._heap:
+            entry = self._heap[0]
+            if self._entries.get(entry[2]) is entry:
+                return entry[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def time_until_next(self) -> float | None:
+        """Return seconds until the earliest deadline (never negative)."""
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(0.0, due - self.clock())
+
+    def pop_due(self) -> list:
+        """
+        Pop every resident whose deadline has passed and schedule its next run.
+
+        Returns:
+            list: Resident identifiers due now, earliest deadline first
+        """
+        now = self.clock()
+        due_keys = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            due, _, key = entry
+            if self._entries.get(key) is not entry:
+                continue
+            self._record_start(key, due, now)
+            due_keys.append(key)
+        return due_keys
+
+    def _record_start(self, key, due: float, now: float) -> None:
+        stats = self._stats[key]
+        interval = stats.interval
+        ideal = self._ideal[key]
+
+        lateness = now - due
+        stats.runs += 1
+        stats.last_lateness = lateness
+        stats.total_lateness += lateness
+        stats.max_lateness = max(stats.max_lateness, lateness)
+        stats.last_drift = now - ideal
+        if lateness > self.late_tolerance:
+            stats.late_runs += 1
+            logger.debug(f"[{key}] Scheduled run started {lateness:.2f}s late")
+
+        # Advance along the ideal grid; skip slots that are already in the past
+        missed = max(1, math.floor((now - ideal) / interval) + 1)
+        if missed > 1:
+            stats.skipped_runs += missed - 1
+            logger.warning(
+                f"[{key}] Scheduler fell behind by {now - ideal:.2f}s, "
+                f"skipping {missed - 1} run(s)"
+            )
+        next_ideal = ideal + missed * interval
+        self._ideal[key] = next_ideal
+        self._push(key, next_ideal + self._jitter(interval))
+
+    def get_stats(self, key) -> ScheduleStats | None:
+        """Return timing counters for a resident."""
+        return self._stats.get(key)
+
+    def get_all_stats(self) -> dict:
+        """Return timing counters for every scheduled resident."""
+        return dict(self._stats)
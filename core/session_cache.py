@@ -0,0 +1,96 @@
+"""On-disk cache of portal session cookies."""
+
+import logging
+import os
+import time
+from utils import json_codec
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_FILE = os.getenv("SESSION_CACHE_FILE", "data/session.json")
+# Upper bound on cache lifetime for cookies that carry no expiry of their own
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "43200"))
+
+
+def save_session_cookies(
+    cookies: list,
+    login_seconds: float | None = None,
+    path: str = SESSION_CACHE_FILE,
+    ttl: int = SESSION_CACHE_TTL,
+) -> bool:
+    """
+    Persist browser cookies with an expiry time.
+
+    The file is written to a temp path and renamed so a crash never leaves
+    a half-written cache behind.
+
+    Args:
+        cookies: Cookies as returned by Selenium's driver.get_cookies()
+        login_seconds: Duration of the browser login, kept for startup reports
+        path: Cache file path
+        ttl: Maximum cache lifetime in seconds
+
+    Returns:
+        bool: True if the cache was written
+    """
+    now = time.time()
+    expires_at = now + ttl
+    for cookie in cookies:
+        if cookie.get("expiry"):
+            expires_at = min(expires_at, float(cookie["expiry"]))
+
+    record = {
+        "saved_at": now,
+        "expires_at": expires_at,
+        "login_seconds": login_seconds,
+        "cookies": cookies,
+    }
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(json_codec.dumps(record))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved portal session cache to {path}")
+        return True
+    except Exception:
+        logger.exception(f"Failed to save portal session cache {path}")
+        return False
+
+
+def load_session_cookies(path: str = SESSION_CACHE_FILE) -> dict | None:
+    """
+    Load cached cookies if present and not expired.
+
+    Args:
+        path: Cache file path
+
+    Returns:
+        dict | None: Cache record with "cookies", "expires_at" and "login_seconds", or None
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        record = json_codec.load(path)
+    except Exception:
+        logger.warning(f"Ignoring unreadable portal session cache {path}")
+        return None
+
+    if record.get("expires_at", 0) <= time.time():
+        logger.info("Cached portal session expired")
+        return None
+    if not record.get("cookies"):
+        return None
+    return record
+
+
+def clear_session_cache(path: str = SESSION_CACHE_FILE) -> None:
+    """Remove the cache file."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.warning(f"Failed to remove portal session cache {path}")
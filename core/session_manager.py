@@ -0,0 +1,142 @@
+"""Portal session ownership and single-flight re-authentication."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from core.portal import SessionExpiredError, call_authenticated_api
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReloginMetrics:
+    """Counters for in-flight re-authentication."""
+    count: int = 0
+    failures: int = 0
+    last_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+
+class PortalSessionManager:
+    """Holds the current portal session and replaces it when it expires.
+
+    Every swap bumps a generation number. A caller that saw generation N
+    fail only triggers a login if the session is still at generation N;
+    callers arriving while a login runs block on the lock and then reuse
+    the fresh session instead of logging in again.
+    """
+
+    def __init__(self, login, session=None):
+        """
+        Initialize session manager.
+
+        Args:
+            login: Callable returning a new authenticated requests.Session
+            session: Already authenticated session, if any
+        """
+        self._login = login
+        self._session = session
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.metrics = ReloginMetrics()
+
+    @property
+    def session(self):
+        return self._session
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def current(self) -> tuple:
+        """Return (session, generation) as one consistent pair."""
+        return self._session, self._generation
+
+    def reauthenticate(self, seen_generation: int):
+        """
+        Log in again unless another caller already replaced the session.
+
+        Args:
+            seen_generation: Generation of the session that was rejected
+
+        Returns:
+            requests.Session: The current (possibly fresh) session
+        """
+        with self._lock:
+            if self._generation != seen_generation:
+                return self._session
+
+            logger.warning("Portal session expired, logging in again")
+            start = time.perf_counter()
+            try:
+                session = self._login()
+            except Exception:
+                self.metrics.failures += 1
+                logger.exception("Portal re-authentication failed")
+                raise
+            elapsed = time.perf_counter() - start
+
+            self._session = session
+            self._generation += 1
+            self.metrics.count += 1
+            self.metrics.last_seconds = elapsed
+            self.metrics.total_seconds += elapsed
+            logger.info(
+                f"Portal re-authenticated in {elapsed:.2f}s "
+                f"(relogins={self.metrics.count})"
+            )
+            return session
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call fn(session, ...) and retry once with a fresh session on expiry.
+
+        Args:
+            fn: Callable taking the session as first argument
+
+        Returns:
+            Whatever fn returns
+        """
+        session, generation = self.current()
+        try:
+            return fn(session, *args, **kwargs)
+        except SessionExpiredError:
+            session = self.reauthenticate(generation)
+            return fn(session, *args, **kwargs)
+
+
+_session_manager: PortalSessionManager | None = None
+
+
+def set_session_manager(manager: PortalSessionManager | None) -> None:
+    """Install the process-wide session manager."""
+    global _session_manager
+    _session_manager = manager
+
+
+def get_session_manager() -> PortalSessionManager | None:
+    """Return the process-wide session manager, if initialized."""
+    return _session_manager
+
+
+def fetch_feed(session, sensor_ids=None) -> dict:
+    """
+    Fetch the notifications feed, re-authenticating once on expiry.
+
+    Uses the managed session when a manager is installed, so callers holding
+    an expired session object still get the fresh one.
+
+    Args:
+        session: Authenticated session
+        sensor_ids: Only decode these sensors (None = whole feed)
+    """
+    manager = _session_manager
+    if manager is None:
+        return call_authenticated_api(session, sensor_ids)
+    return manager.call(call_authenticated_api, sensor_ids)
@@ -1,21 +1,135 @@
 """WebDAV storage operations for Server Monitor."""
 
-import json
-from utils.json_utils import manipulate_sensor_json
+import logging
+import threading
+from dataclasses import dataclass
+from webdav3.urn import Urn
+from utils import json_codec
+from utils.json_utils import file_checksum, manipulate_sensor_json
 
 
-def download_file(client, notif_path, temp_local_file_path):
-    """Download JSON file from WebDAV and extract resident status."""
-    client.download_sync(remote_path=notif_path, local_path=temp_local_file_path)
-    with open(temp_local_file_path, encoding='utf8') as f:
-        json_content_temp = json.load(f)
-    
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RemoteFileEntry:
+    """Validators, content hash and parsed result of one remote file."""
+    etag: str | None
+    modified: str | None
+    size: str | None
+    checksum: str
+    result: tuple
+
+
+@dataclass
+class DownloadCacheStats:
+    """Counters for conditional downloads."""
+    validator_hits: int = 0
+    checksum_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.validator_hits + self.checksum_hits + self.misses
+        return (self.validator_hits + self.checksum_hits) / total if total else 0.0
+
+
+_download_cache = {}
+_download_cache_lock = threading.Lock()
+_download_stats = DownloadCacheStats()
+
+
+def get_remote_validators(client, remote_path) -> tuple:
+    """
+    Fetch ETag, Last-Modified and size of a remote file without its body.
+
+    Uses a HEAD request; falls back to PROPFIND when HEAD carries no validators.
+
+    Returns:
+        tuple: (etag, modified, size), entries may be None
+    """
+    response = client.execute_request(action="check", path=Urn(remote_path).quote())
+    response.close()
+    etag = response.headers.get("ETag")
+    modified = response.headers.get("Last-Modified")
+    size = response.headers.get("Content-Length")
+    if etag or modified:
+        return etag, modified, size
+
+    info = client.info(remote_path)
+    return info.get("etag"), info.get("modified"), info.get("size")
+
+
+def _parse_notification(json_content_temp: dict) -> tuple:
     status = json_content_temp["Resident"]["Status"]
     timestamp_status = json_content_temp["Resident"]["Timestamp"]
     timestamp_notif = json_content_temp["Timestamp"]
     return status, timestamp_status, timestamp_notif
 
 
+def _validators_match(entry: RemoteFileEntry, etag, modified, size) -> bool:
+    if etag:
+        return etag == entry.etag
+    return bool(modified) and modified == entry.modified and size == entry.size
+
+
+def download_file(client, notif_path, temp_local_file_path):
+    """Download JSON file from WebDAV and extract resident status.
+    
+    The remote file is only downloaded when its ETag / Last-Modified / size
+    changed since the last call, and only re-parsed when its SHA256 changed.
+    """
+    with _download_cache_lock:
+        entry = _download_cache.get(notif_path)
+
+    # Validators are read before the body, so a change in between is seen next time
+    try:
+        validators = get_remote_validators(client, notif_path)
+    except Exception:
+        logger.warning(f"Validator check failed for {notif_path}, downloading")
+        validators = (None, None, None)
+
+    if entry is not None and _validators_match(entry, *validators):
+        with _download_cache_lock:
+            _download_stats.validator_hits += 1
+        return entry.result
+
+    response = client.execute_request(action="download", path=Urn(notif_path).quote())
+    try:
+        with open(temp_local_file_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=65536):
+                f.write(chunk)
+    finally:
+        response.close()
+
+    checksum = file_checksum(temp_local_file_path)
+    if entry is not None and checksum == entry.checksum:
+        result = entry.result
+        with _download_cache_lock:
+            _download_stats.checksum_hits += 1
+    else:
+        json_content_temp = json_codec.load(temp_local_file_path)
+        result = _parse_notification(json_content_temp)
+        with _download_cache_lock:
+            _download_stats.misses += 1
+
+    with _download_cache_lock:
+        _download_cache[notif_path] = RemoteFileEntry(*validators, checksum=checksum, result=result)
+    return result
+
+
+def get_download_cache_stats() -> dict:
+    """Return conditional download hit/miss counters and the hit rate."""
+    with _download_cache_lock:
+        stats = _download_stats
+        return {
+            "validator_hits": stats.validator_hits,
+            "checksum_hits": stats.checksum_hits,
+            "misses": stats.misses,
+            "hit_rate": stats.hit_rate,
+        }
+
+
 def upload_file(client, local_path, remote_path):
     """
     Upload a local file to WebDAV.
@@ -25,3 +139,17 @@ def upload_file(client, local_path, remote_path):
         remote_path=remote_path,
         local_path=local_path
     )
+
+
+def upload_bytes(client, data: bytes, remote_path):
+    """
+    Upload an in-memory payload to WebDAV with a single PUT.
+
+    Unlike client.upload_to this skips the HEAD check of the parent folder
+    (a missing folder still fails the PUT) and closes the streamed response
+    so its keep-alive connection goes back to the pool.
+    """
+    response = client.execute_request(
+        action="upload", path=Urn(remote_path).quote(), data=data
+    )
+    response.close()
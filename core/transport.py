@@ -0,0 +1,132 @@
+"""Shared pooled HTTP transport for WebDAV and portal requests."""
+
+import logging
+import os
+import threading
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+# Distinct hosts kept in the pool manager, and keep-alive connections per host
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+_adapters = weakref.WeakSet()
+_pooled_adapter: "PooledHTTPAdapter | None" = None
+_pooled_adapter_lock = threading.Lock()
+_shared_session: requests.Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with configured pool sizes and a default timeout.
+
+    Requests that pass no timeout get (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT).
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        timeout: tuple = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        **kwargs,
+    ):
+        self.default_timeout = timeout
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+        _adapters.add(self)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.default_timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def get_pooled_adapter() -> PooledHTTPAdapter:
+    """Return the process-wide adapter, so every session shares one connection pool."""
+    global _pooled_adapter
+    with _pooled_adapter_lock:
+        if _pooled_adapter is None:
+            _pooled_adapter = PooledHTTPAdapter()
+        return _pooled_adapter
+
+
+def mount_pooled_adapter(session: requests.Session, adapter: PooledHTTPAdapter | None = None) -> requests.Session:
+    """
+    Mount a pooled adapter for http and https on an existing session.
+
+    Sessions share the process-wide adapter unless one is given, so a new
+    session (e.g. after a re-login) reuses the warm keep-alive connections.
+    Closing such a session empties the shared pool; drop it instead.
+
+    Args:
+        session: Session to configure
+        adapter: Adapter to mount (defaults to get_pooled_adapter())
+
+    Returns:
+        requests.Session: The same session
+    """
+    adapter = adapter or get_pooled_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_session() -> requests.Session:
+    """Create a requests.Session backed by the shared pooled adapter."""
+    return mount_pooled_adapter(requests.Session())
+
+
+def get_shared_session() -> requests.Session:
+    """Return the process-wide cookie-less session for one-off requests."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
+
+def configure_webdav_client(client):
+    """
+    Route a webdav3 Client through the pooled adapter.
+
+    Args:
+        client: webdav3.client.Client
+
+    Returns:
+        Client: The same client
+    """
+    mount_pooled_adapter(client.session)
+    client.timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    return client
+
+
+def get_transport_stats() -> dict:
+    """
+    Report pool usage per host across all pooled adapters.
+
+    Returns:
+        dict: {host: {"connections": opened, "requests": sent, "reused": requests - connections,
+               "idle": idle connections in the pool}}
+    """
+    stats = {}
+    for adapter in list(_adapters):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {"connections": 0, "requests": 0, "reused": 0, "idle": 0})
+            entry["connections"] += pool.num_connections
+            entry["requests"] += pool.num_requests
+            if pool.pool is not None:
+                # The queue is pre-filled with None placeholders for unopened slots
+                entry["idle"] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    for entry in stats.values():
+        entry["reused"] = max(0, entry["requests"] - entry["connections"])
+    return stats
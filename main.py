@@ -5,10 +5,20 @@ from pathlib import Path
 from core.initialization import initialize_portal, setup_logging, get_paths, init_webdav_client
 from config.config import get_residents
 from core.monitor import MonitorService
+from services.state_manager import get_state_manager
+from services.notification_service import (
+    NOTIFY_DURABLE,
+    NOTIFY_MODE,
+    close_notification_outbox,
+    get_notification_outbox,
+)
 
 # Setup logging
 logger = setup_logging()
 
+# "thread" (scheduler + optional thread pool) or "async" (asyncio engine)
+MONITOR_ENGINE = os.getenv("MONITOR_ENGINE", "thread").lower()
+
 # Global flag for graceful shutdown
 shutdown_event = False
 
@@ -56,15 +66,31 @@ def main() -> None:
         logger.info("Initializing WebDAV client...")
         init_webdav_client()
         logger.info("WebDAV client initialized")
-        
+
+        # Start the outbox now so emails left unsent by the last run are replayed
+        if NOTIFY_MODE == "outbox" and NOTIFY_DURABLE:
+            get_notification_outbox()
+
         # Create and start monitor service
-        logger.info(f"Starting monitor service for {len(residents_config)} resident(s)")
-        monitor_service = MonitorService(
-            residents_config=residents_config,
-            shutdown_flag=lambda: shutdown_event
-        )
+        logger.info(f"Starting {MONITOR_ENGINE} monitor service for {len(residents_config)} resident(s)")
+        if MONITOR_ENGINE == "async":
+            from core.async_monitor import AsyncMonitorService
+            monitor_service = AsyncMonitorService(
+                residents_config=residents_config,
+                shutdown_flag=lambda: shutdown_event
+            )
+        else:
+            monitor_service = MonitorService(
+                residents_config=residents_config,
+                shutdown_flag=lambda: shutdown_event
+            )
         
         monitor_service.start()
+
+        # Write any state still buffered by deferred persistence
+        get_state_manager().close()
+        # Send emails still waiting in the notification outbox
+        close_notification_outbox()
         
         logger.info("Application completed successfully")
         
@@ -2,9 +2,10 @@
 
 from dataclasses import dataclass
 from typing import Optional
+from .resident_table import ResidentTable, ResidentView, get_resident_table
 
 
-@dataclass
+@dataclass(slots=True)
 class ResidentConfig:
     """Configuration for a single resident monitor."""
     id: str
@@ -20,7 +21,7 @@ class ResidentConfig:
             self.download_path = f"data/{self.id}_download.json"
 
 
-@dataclass
+@dataclass(slots=True)
 class ResidentState:
     """Current state of a resident."""
     resident_id: str
@@ -9,4 +9,8 @@ STATE_LIST = {
     "S_PRESENT_ROOM",
     "S_PRESENT_BED",
     "S_PRESENT_BATHROOM",
-}
\ No newline at end of file
+}
+
+# Small-int codes for statuses; 0 means "no status yet"
+STATUS_NAMES = (None, *sorted(STATE_LIST))
+STATUS_CODES = {name: code for code, name in enumerate(STATUS_NAMES) if name is not None}
@@ -0,0 +1,294 @@
+"""Struct-of-arrays storage for per-resident counters."""
+
+import math
+import os
+import threading
+from array import array
+from models.enums import STATUS_CODES, STATUS_NAMES
+
+
+# Number of most recent sync outcomes kept per resident for windowed alert rules
+ALERT_WINDOW = int(os.getenv("ALERT_WINDOW", "20"))
+# Ring positions and counts are stored in unsigned 16-bit ("H") columns
+MAX_ALERT_WINDOW = 65535
+
+if not 1 <= ALERT_WINDOW <= MAX_ALERT_WINDOW:
+    raise ValueError(f"ALERT_WINDOW must be between 1 and {MAX_ALERT_WINDOW}, got {ALERT_WINDOW}")
+
+# Column name -> (array typecode, value stored for None)
+_COLUMNS = {
+    "interval_sec": ("d", 0.0),
+    "mismatch_count": ("I", 0),
+    "match_count": ("I", 0),
+    "alert_active": ("b", 0),
+    "last_email_ts": ("d", math.nan),
+    "expected_status": ("H", 0),
+    "uploaded_at": ("d", math.nan),
+    "last_propagation_sec": ("d", math.nan),
+    "propagation_timeouts": ("I", 0),
+    # Ring buffer bookkeeping: next write position, filled entries, running sums
+    "outcome_pos": ("H", 0),
+    "outcome_count": ("H", 0),
+    "outcome_failures": ("H", 0),
+    "latency_count": ("H", 0),
+    "latency_sum": ("d", 0.0),
+}
+
+
+class ResidentTable:
+    """Counters for many residents, one typed array per field.
+
+    A resident is a slot index into every column. Statuses are stored as
+    small ints (see STATUS_CODES); names outside STATE_LIST are interned
+    on first use. Float columns use NaN for "not set".
+
+    Each resident also owns a preallocated ring of the last `window` sync
+    outcomes (1 = mismatch) and latencies. Running sums are updated on
+    every write, so windowed counts and averages cost O(1) and recording
+    an outcome allocates nothing.
+    """
+
+    def __init__(self, window: int = ALERT_WINDOW):
+        """
+        Initialize resident table.
+
+        Args:
+            window: Outcomes kept per resident (1..MAX_ALERT_WINDOW)
+
+        Raises:
+            ValueError: If window is out of range
+        """
+        if not 1 <= window <= MAX_ALERT_WINDOW:
+            raise ValueError(f"window must be between 1 and {MAX_ALERT_WINDOW}, got {window}")
+        self.window = window
+        self.outcomes = bytearray()
+        self.latencies = array("d")
+        self.ids = []
+        self.slots = {}
+        self.columns = {name: array(typecode) for name, (typecode, _) in _COLUMNS.items()}
+        self._status_names = list(STATUS_NAMES)
+        self._status_codes = dict(STATUS_CODES)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, resident_id: str, interval_sec: float = 60) -> int:
+        """
+        Allocate a slot for a resident.
+
+        Adding an id that already has a slot resets that slot: counters,
+        expected status and outcome window start empty and interval_sec is
+        replaced, so a re-created monitor never inherits stale state.
+
+        Args:
+            resident_id: Resident identifier
+            interval_sec: Sync interval in seconds
+
+        Returns:
+            int: Slot index
+        """
+        with self._lock:
+            slot = self.slots.get(resident_id)
+            if slot is None:
+                slot = len(self.ids)
+                self.ids.append(resident_id)
+                self.slots[resident_id] = slot
+                for name, (_, empty) in _COLUMNS.items():
+                    self.columns[name].append(empty)
+                self.outcomes.extend(bytes(self.window))
+                self.latencies.extend([math.nan] * self.window)
+            else:
+                for name, (_, empty) in _COLUMNS.items():
+                    self.columns[name][slot] = empty
+                start = slot * self.window
+                self.outcomes[start:start + self.window] = bytes(self.window)
+                for index in range(start, start + self.window):
+                    self.latencies[index] = math.nan
+            self.columns["interval_sec"][slot] = interval_sec
+            return slot
+
+    def record_outcome(self, slot: int, failed: bool, latency: float | None = None) -> None:
+        """
+        Push one sync outcome into a resident's ring, evicting the oldest.
+
+        Args:
+            slot: Resident slot
+            failed: True for a mismatch
+            latency: Upload-to-portal delay in seconds, if measured
+        """
+        cols = self.columns
+        pos = cols["outcome_pos"][slot]
+        index = slot * self.window + pos
+
+        if cols["outcome_count"][slot] == self.window:
+            cols["outcome_failures"][slot] -= self.outcomes[index]
+            old_latency = self.latencies[index]
+            if not math.isnan(old_latency):
+                cols["latency_count"][slot] -= 1
+                cols["latency_sum"][slot] -= old_latency
+                if not cols["latency_count"][slot]:
+                    cols["latency_sum"][slot] = 0.0  # drop accumulated rounding error
+        else:
+            cols["outcome_count"][slot] += 1
+
+        self.outcomes[index] = 1 if failed else 0
+        if failed:
+            cols["outcome_failures"][slot] += 1
+        if latency is None:
+            self.latencies[index] = math.nan
+        else:
+            self.latencies[index] = latency
+            cols["latency_count"][slot] += 1
+            cols["latency_sum"][slot] += latency
+        cols["outcome_pos"][slot] = (pos + 1) % self.window
+
+    def recent_outcomes(self, slot: int) -> list:
+        """Return a resident's window as [(failed, latency)], oldest first."""
+        count = self.columns["outcome_count"][slot]
+        pos = self.columns["outcome_pos"][slot]
+        base = slot * self.window
+        result = []
+        for i in range(pos - count, pos):
+            index = base + i % self.window
+            latency = self.latencies[index]
+            result.append((bool(self.outcomes[index]), None if math.isnan(latency) else latency))
+        return result
+
+    def view(self, resident_id: str) -> "ResidentView":
+        """Return a lightweight accessor for one resident's row."""
+        return ResidentView(self, self.slots[resident_id])
+
+    def intern_status(self, status: str | None) -> int:
+        """Return the code of a status name, assigning a new one if unseen."""
+        if status is None:
+            return 0
+        code = self._status_codes.get(status)
+        if code is None:
+            with self._lock:
+                code = self._status_codes.get(status)
+                if code is None:
+                    code = len(self._status_names)
+                    self._status_names.append(status)
+                    self._status_codes[status] = code
+        return code
+
+    def status_name(self, code: int) -> str | None:
+        return self._status_names[code]
+
+    def alerting(self) -> list:
+        """Return the ids of residents with an active alert."""
+        flags = self.columns["alert_active"]
+        return [self.ids[slot] for slot in range(len(flags)) if flags[slot]]
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers."""
+        columns = sum(col.itemsize * len(col) for col in self.columns.values())
+        return columns + len(self.outcomes) + self.latencies.itemsize * len(self.latencies)
+
+
+def _int_column(name: str) -> property:
+    def getter(self):
+        return self._table.columns[name][self._slot]
+
+    def setter(self, value):
+        self._table.columns[name][self._slot] = value
+
+    return property(getter, setter)
+
+
+def _bool_column(name: str) -> property:
+    def getter(self):
+        return bool(self._table.columns[name][self._slot])
+
+    def setter(self, value):
+        self._table.columns[name][self._slot] = 1 if value else 0
+
+    return property(getter, setter)
+
+
+def _optional_float_column(name: str) -> property:
+    def getter(self):
+        value = self._table.columns[name][self._slot]
+        return None if math.isnan(value) else value
+
+    def setter(self, value):
+        self._table.columns[name][self._slot] = math.nan if value is None else value
+
+    return property(getter, setter)
+
+
+def _status_column(name: str) -> property:
+    def getter(self):
+        return self._table.status_name(self._table.columns[name][self._slot])
+
+    def setter(self, value):
+        self._table.columns[name][self._slot] = self._table.intern_status(value)
+
+    return property(getter, setter)
+
+
+class ResidentColumns:
+    """Mixin exposing a table row as attributes; needs _table and _slot."""
+
+    __slots__ = ()
+
+    mismatch_count = _int_column("mismatch_count")
+    match_count = _int_column("match_count")
+    alert_active = _bool_column("alert_active")
+    last_email_ts = _optional_float_column("last_email_ts")
+    expected_status = _status_column("expected_status")
+    uploaded_at = _optional_float_column("uploaded_at")
+    last_propagation_sec = _optional_float_column("last_propagation_sec")
+    propagation_timeouts = _int_column("propagation_timeouts")
+
+    def record_outcome(self, failed: bool, latency: float | None = None) -> None:
+        """Push one sync outcome into this resident's window."""
+        self._table.record_outcome(self._slot, failed, latency)
+
+    @property
+    def window_count(self) -> int:
+        """Outcomes currently in the window (at most the table's window size)."""
+        return self._table.columns["outcome_count"][self._slot]
+
+    @property
+    def window_failures(self) -> int:
+        """Mismatches among the outcomes in the window."""
+        return self._table.columns["outcome_failures"][self._slot]
+
+    @property
+    def window_avg_latency(self) -> float | None:
+        """Mean measured latency over the window, or None if none was measured."""
+        count = self._table.columns["latency_count"][self._slot]
+        if not count:
+            return None
+        return self._table.columns["latency_sum"][self._slot] / count
+
+
+class ResidentView(ResidentColumns):
+    """Slotted accessor for one row of a ResidentTable."""
+
+    __slots__ = ("_table", "_slot")
+
+    def __init__(self, table: ResidentTable, slot: int):
+        self._table = table
+        self._slot = slot
+
+    @property
+    def resident_id(self) -> str:
+        return self._table.ids[self._slot]
+
+    @property
+    def interval_sec(self) -> float:
+        return self._table.columns["interval_sec"][self._slot]
+
+    def __repr__(self):
+        return f"ResidentView({self.resident_id}, slot={self._slot})"
+
+
+_resident_table = ResidentTable()
+
+
+def get_resident_table() -> ResidentTable:
+    """Return the process-wide resident table."""
+    return _resident_table
@@ -1,7 +1,15 @@
 """Services module for Server Monitor."""
 
 from .resident_monitor import ResidentMonitor
-from .notification_service import send_mismatch_email
-from .state_manager import StateManager
+from .notification_service import send_mismatch_email, notify_mismatch, notify_recovery, get_notification_stats
+from .state_manager import StateManager, get_state_manager
 
-__all__ = ["ResidentMonitor", "send_mismatch_email", "StateManager"]
+__all__ = [
+    "ResidentMonitor",
+    "send_mismatch_email",
+    "notify_mismatch",
+    "notify_recovery",
+    "get_notification_stats",
+    "StateManager",
+    "get_state_manager",
+]
@@ -1,15 +1,322 @@
 """Notification service for alerts and emails."""
 
 import os
+import queue
+import asyncio
 import smtplib
 import logging
+import threading
+import itertools
+import time
+import atexit
+from dataclasses import dataclass, field
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from services.outbox_store import OutboxStore
 from utils.time_utils import now_utc_iso
 
 
 logger = logging.getLogger(__name__)
 
+# "outbox": hand emails to a background worker; "inline": send on the caller's thread
+NOTIFY_MODE = os.getenv("NOTIFY_MODE", "outbox").lower()
+# Emails waiting for the worker; further emails are dropped (and counted) when full
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+# Close the reused SMTP connection after this many idle seconds
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+# Socket timeout for connecting and for each SMTP command
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# Collect emails for this many seconds after the first one and send them together (0 = off)
+NOTIFY_DIGEST_WINDOW_SEC = float(os.getenv("NOTIFY_DIGEST_WINDOW_SEC", "30"))
+# A window touching at least this many residents becomes one digest; fewer go out one by one
+NOTIFY_DIGEST_MIN_RESIDENTS = int(os.getenv("NOTIFY_DIGEST_MIN_RESIDENTS", "4"))
+# Persist queued emails in SQLite and replay unsent ones on startup
+NOTIFY_DURABLE = os.getenv("NOTIFY_DURABLE", "1") == "1"
+NOTIFY_OUTBOX_DB = os.getenv("NOTIFY_OUTBOX_DB", "data/outbox.db")
+# Re-queue unsent outbox rows this often; give up on a row after NOTIFY_MAX_ATTEMPTS failures
+NOTIFY_RETRY_SEC = float(os.getenv("NOTIFY_RETRY_SEC", "60"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+# Global send rate across all residents (emails per minute, 0 = unlimited) and burst size
+NOTIFY_RATE_PER_MIN = float(os.getenv("NOTIFY_RATE_PER_MIN", "20"))
+NOTIFY_BURST = int(os.getenv("NOTIFY_BURST", "5"))
+
+KIND_ALERT = "alert"
+KIND_RECOVERY = "recovery"
+# Lower sends first: alerts go out before recoveries
+PRIORITIES = {KIND_ALERT: 0, KIND_RECOVERY: 1}
+
+
+def _smtp_config() -> dict:
+    """
+    Read SMTP settings from the environment.
+
+    Returns:
+        dict: sender, password, recipients (list), server and port
+
+    Raises:
+        RuntimeError: If a setting is missing or no recipient is valid
+    """
+    email_sender = os.getenv("EMAIL_SENDER")
+    email_password = os.getenv("EMAIL_PASSWORD")
+    # Support multiple recipients: EMAIL_RECIPIENTS can be a comma-separated list.
+    recipients_raw = os.getenv("EMAIL_RECIPIENTS")
+    smtp_server = os.getenv("SMTP_SERVER")
+    smtp_port = int(os.getenv("SMTP_PORT", "465"))
+
+    if not all([email_sender, email_password, recipients_raw, smtp_server]):
+        logger.error("SMTP configuration incomplete")
+        raise RuntimeError("SMTP configuration incomplete")
+
+    # Parse recipients into a list, trimming whitespace and ignoring empties
+    recipients = [r.strip() for r in recipients_raw.split(",") if r.strip()]
+    if not recipients:
+        logger.error("No valid email recipients configured")
+        raise RuntimeError("No valid email recipients configured")
+
+    return {
+        "sender": email_sender,
+        "password": email_password,
+        "recipients": recipients,
+        "server": smtp_server,
+        "port": smtp_port,
+    }
+
+
+def build_mismatch_message(
+    config: dict,
+    resident_id: str,
+    mismatch_count: int,
+    timestamp: str | None = None,
+) -> MIMEMultipart:
+    """Build the HTML alert email for a resident status mismatch (timestamp defaults to now)."""
+    timestamp = timestamp or now_utc_iso()
+    msg = MIMEMultipart()
+    msg["From"] = config["sender"]
+    msg["To"] = ", ".join(config["recipients"])
+    msg["Subject"] = f" VMedD Server Monitor Alert"
+
+    body = f"""
+                <html>
+        <body style="font-family: Arial, Helvetica, sans-serif; color: #333;">
+            
+            <h2 style="color: #b00020; margin-bottom: 10px;">
+            VMedD Server Monitor – Alert
+            </h2>
+
+            <p>
+            This alert indicates a detected inconsistency in server behavior that
+            requires attention.
+            </p>
+
+            <table style="border-collapse: collapse; margin-top: 10px;">
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Resident</td>
+                <td style="padding: 6px 12px;">{resident_id}</td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Issue</td>
+                <td style="padding: 6px 12px;">
+                WebDAV upload status does not match the portal (browser) download status.
+                This may indicate a server-side processing or synchronization issue.
+                </td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Consecutive Mismatches</td>
+                <td style="padding: 6px 12px;">{mismatch_count}</td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Timestamp (UTC)</td>
+                <td style="padding: 6px 12px;">{timestamp}</td>
+            </tr>
+            </table>
+
+            <p style="margin-top: 16px;">
+            Please investigate the server and related services to ensure normal
+            operation is restored.
+            </p>
+
+            <p style="font-size: 12px; color: #777;">
+            This is an automated message generated by the VMedD Server Monitoring
+            system.
+            </p>
+
+        </body>
+        </html>
+
+    """
+
+    msg.attach(MIMEText(body, "html"))
+    return msg
+
+
+def build_recovery_message(config: dict, resident_id: str, timestamp: str | None = None) -> MIMEMultipart:
+    """Build the HTML recovery email for a resident (timestamp defaults to now)."""
+    timestamp = timestamp or now_utc_iso()
+    msg = MIMEMultipart()
+    msg["From"] = config["sender"]
+    msg["To"] = ", ".join(config["recipients"])
+    msg["Subject"] = f"VMedDServer Monitor Recovery"
+
+    body = f"""
+                <html>
+        <body style="font-family: Arial, Helvetica, sans-serif; color: #333;">
+            
+            <h2 style="color: #2e7d32; margin-bottom: 10px;">
+            VMedD Server Monitor – Recovery
+            </h2>
+
+            <p>
+            This notification confirms that the monitored server functionality has
+            returned to a stable and healthy state.
+            </p>
+
+            <table style="border-collapse: collapse; margin-top: 10px;">
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Resident</td>
+                <td style="padding: 6px 12px;">{resident_id}</td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Status</td>
+                <td style="padding: 6px 12px;">
+                WebDAV upload status and portal (browser) status are consistent.
+                </td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Verification</td>
+                <td style="padding: 6px 12px;">
+                Status has matched continuously for the configured recovery window.
+                </td>
+            </tr>
+            <tr>
+                <td style="padding: 6px 12px; font-weight: bold;">Timestamp (UTC)</td>
+                <td style="padding: 6px 12px;">{timestamp}</td>
+            </tr>
+            </table>
+
+            <p style="margin-top: 16px;">
+            No further action is required at this time. Monitoring will continue
+            automatically.
+            </p>
+
+            <p style="font-size: 12px; color: #777;">
+            This is an automated message generated by the VMedD Server Monitoring
+            system.
+            </p>
+
+        </body>
+        </html>
+
+    """
+
+    msg.attach(MIMEText(body, "html"))
+    return msg
+
+
+def summarize_notifications(notifications: list) -> list:
+    """
+    Group queued notifications by resident and kind.
+
+    Args:
+        notifications: Notification objects, oldest first
+
+    Returns:
+        list: One dict per (resident, kind) with resident_id, kind, events,
+              mismatch_count (highest seen), first_seen and last_seen,
+              alerts before recoveries, then by resident id
+    """
+    rows = {}
+    for notification in notifications:
+        key = (notification.resident_id, notification.kind)
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                "resident_id": notification.resident_id,
+                "kind": notification.kind,
+                "events": 1,
+                "mismatch_count": notification.mismatch_count,
+                "first_seen": notification.created_at,
+                "last_seen": notification.created_at,
+            }
+            continue
+        row["events"] += 1
+        row["mismatch_count"] = max(row["mismatch_count"], notification.mismatch_count)
+        row["first_seen"] = min(row["first_seen"], notification.created_at)
+        row["last_seen"] = max(row["last_seen"], notification.created_at)
+    return sorted(rows.values(), key=lambda row: (row["kind"] != KIND_ALERT, row["resident_id"]))
+
+
+def build_digest_message(config: dict, rows: list, timestamp: str | None = None) -> MIMEMultipart:
+    """Build one HTML email listing many residents' alerts and recoveries (see summarize_notifications)."""
+    timestamp = timestamp or now_utc_iso()
+    alerts = sum(1 for row in rows if row["kind"] == KIND_ALERT)
+    recoveries = len(rows) - alerts
+    msg = MIMEMultipart()
+    msg["From"] = config["sender"]
+    msg["To"] = ", ".join(config["recipients"])
+    msg["Subject"] = f"VMedD Server Monitor Digest: {alerts} alert(s), {recoveries} recovery(ies)"
+
+    cell = 'style="padding: 6px 12px; border-bottom: 1px solid #ddd;"'
+    colors = {KIND_ALERT: "#b00020", KIND_RECOVERY: "#2e7d32"}
+    table_rows = "".join(
+        f"""
+            <tr>
+                <td {cell}>{row["resident_id"]}</td>
+                <td style="padding: 6px 12px; border-bottom: 1px solid #ddd; color: {colors[row["kind"]]};">{row["kind"].capitalize()}</td>
+                <td {cell}>{row["events"]}</td>
+                <td {cell}>{row["mismatch_count"] if row["kind"] == KIND_ALERT else ""}</td>
+                <td {cell}>{row["first_seen"]}</td>
+                <td {cell}>{row["last_seen"]}</td>
+            </tr>"""
+        for row in rows
+    )
+    body = f"""
+        <html>
+        <body style="font-family: Arial, Helvetica, sans-serif; color: #333;">
+
+            <h2 style="color: #b00020; margin-bottom: 10px;">
+            VMedD Server Monitor – Digest
+            </h2>
+
+            <p>
+            {len({row["resident_id"] for row in rows})} resident(s) changed health state within a short
+            window. Their notifications are combined into this single message.
+            </p>
+
+            <table style="border-collapse: collapse; margin-top: 10px;">
+            <tr>
+                <th {cell}>Resident</th>
+                <th {cell}>Event</th>
+                <th {cell}>Count</th>
+                <th {cell}>Consecutive Mismatches</th>
+                <th {cell}>First Seen (UTC)</th>
+                <th {cell}>Last Seen (UTC)</th>
+            </tr>{table_rows}
+            </table>
+
+            <p style="margin-top: 16px;">
+            Digest generated at {timestamp} (UTC).
+            </p>
+
+            <p style="font-size: 12px; color: #777;">
+            This is an automated message generated by the VMedD Server Monitoring
+            system.
+            </p>
+
+        </body>
+        </html>
+    """
+
+    msg.attach(MIMEText(body, "html"))
+    return msg
+
+
+def _send_once(config: dict, msg: MIMEMultipart) -> None:
+    """Send one message over a new, short-lived SMTP connection."""
+    with smtplib.SMTP_SSL(config["server"], config["port"], timeout=SMTP_TIMEOUT) as server:
+        server.login(config["sender"], config["password"])
+        # send_message accepts an explicit list of recipients
+        server.send_message(msg, to_addrs=config["recipients"])
+
 
 def send_mismatch_email(resident_id: str, mismatch_count: int) -> bool:
     """
@@ -23,86 +330,8 @@ def send_mismatch_email(resident_id: str, mismatch_count: int) -> bool:
         bool: True if email sent successfully, False otherwise
     """
     try:
-
-        email_sender = os.getenv("EMAIL_SENDER")
-        email_password = os.getenv("EMAIL_PASSWORD")
-        # Support multiple recipients: EMAIL_RECIPIENTS can be a comma-separated list.
-        recipients_raw = os.getenv("EMAIL_RECIPIENTS") 
-        smtp_server = os.getenv("SMTP_SERVER")
-        smtp_port = int(os.getenv("SMTP_PORT", "465"))
-
-        if not all([email_sender, email_password, recipients_raw, smtp_server]):
-            logger.error("SMTP configuration incomplete")
-            raise RuntimeError("SMTP configuration incomplete")
-
-        # Parse recipients into a list, trimming whitespace and ignoring empties
-        recipients = [r.strip() for r in recipients_raw.split(",") if r.strip()]
-        if not recipients:
-            logger.error("No valid email recipients configured")
-            raise RuntimeError("No valid email recipients configured")
-
-        msg = MIMEMultipart()
-        msg["From"] = email_sender
-        msg["To"] = ", ".join(recipients)
-        msg["Subject"] = f" VMedD Server Monitor Alert"
-
-        body = f"""
-                    <html>
-            <body style="font-family: Arial, Helvetica, sans-serif; color: #333;">
-                
-                <h2 style="color: #b00020; margin-bottom: 10px;">
-                VMedD Server Monitor – Alert
-                </h2>
-
-                <p>
-                This alert indicates a detected inconsistency in server behavior that
-                requires attention.
-                </p>
-
-                <table style="border-collapse: collapse; margin-top: 10px;">
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Resident</td>
-                    <td style="padding: 6px 12px;">{resident_id}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Issue</td>
-                    <td style="padding: 6px 12px;">
-                    WebDAV upload status does not match the portal (browser) download status.
-                    This may indicate a server-side processing or synchronization issue.
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Consecutive Mismatches</td>
-                    <td style="padding: 6px 12px;">{mismatch_count}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Timestamp (UTC)</td>
-                    <td style="padding: 6px 12px;">{now_utc_iso()}</td>
-                </tr>
-                </table>
-
-                <p style="margin-top: 16px;">
-                Please investigate the server and related services to ensure normal
-                operation is restored.
-                </p>
-
-                <p style="font-size: 12px; color: #777;">
-                This is an automated message generated by the VMedD Server Monitoring
-                system.
-                </p>
-
-            </body>
-            </html>
-
-        """
-
-        msg.attach(MIMEText(body, "html"))
-
-        with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
-            server.login(email_sender, email_password)
-            # send_message accepts an explicit list of recipients
-            server.send_message(msg, to_addrs=recipients)
-
+        config = _smtp_config()
+        _send_once(config, build_mismatch_message(config, resident_id, mismatch_count))
         logger.info(f"Alert email sent for resident {resident_id}")
         return True
 
@@ -123,86 +352,598 @@ def send_recovery_email(resident_id: str) -> bool:
         bool: True if email sent successfully, False otherwise
     """
     try:
-        email_sender = os.getenv("EMAIL_SENDER")
-        email_password = os.getenv("EMAIL_PASSWORD")
-        recipients_raw = os.getenv("EMAIL_RECIPIENTS")
-        smtp_server = os.getenv("SMTP_SERVER")
-        smtp_port = int(os.getenv("SMTP_PORT", "465"))
-
-        if not all([email_sender, email_password, recipients_raw, smtp_server]):
-            logger.error("SMTP configuration incomplete")
-            raise RuntimeError("SMTP configuration incomplete")
-
-        recipients = [r.strip() for r in recipients_raw.split(",") if r.strip()]
-        if not recipients:
-            logger.error("No valid email recipients configured")
-            raise RuntimeError("No valid email recipients configured")
-
-        msg = MIMEMultipart()
-        msg["From"] = email_sender
-        msg["To"] = ", ".join(recipients)
-        msg["Subject"] = f"VMedDServer Monitor Recovery"
-
-        body = f"""
-                    <html>
-            <body style="font-family: Arial, Helvetica, sans-serif; color: #333;">
-                
-                <h2 style="color: #2e7d32; margin-bottom: 10px;">
-                VMedD Server Monitor – Recovery
-                </h2>
-
-                <p>
-                This notification confirms that the monitored server functionality has
-                returned to a stable and healthy state.
-                </p>
-
-                <table style="border-collapse: collapse; margin-top: 10px;">
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Resident</td>
-                    <td style="padding: 6px 12px;">{resident_id}</td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Status</td>
-                    <td style="padding: 6px 12px;">
-                    WebDAV upload status and portal (browser) status are consistent.
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Verification</td>
-                    <td style="padding: 6px 12px;">
-                    Status has matched continuously for the configured recovery window.
-                    </td>
-                </tr>
-                <tr>
-                    <td style="padding: 6px 12px; font-weight: bold;">Timestamp (UTC)</td>
-                    <td style="padding: 6px 12px;">{now_utc_iso()}</td>
-                </tr>
-                </table>
-
-                <p style="margin-top: 16px;">
-                No further action is required at this time. Monitoring will continue
-                automatically.
-                </p>
-
-                <p style="font-size: 12px; color: #777;">
-                This is an automated message generated by the VMedD Server Monitoring
-                system.
-                </p>
-
-            </body>
-            </html>
+        config = _smtp_config()
+        _send_once(config, build_recovery_message(config, resident_id))
+        logger.info(f"Recovery email sent for resident {resident_id}")
+        return True
+
+    except Exception:
+        logger.exception("Failed to send recovery email")
+        return False
+
+
+class SmtpConnection:
+    """One authenticated SMTP connection, reused across sends.
 
+    The connection is opened on first use and closed after SMTP_IDLE_TIMEOUT
+    seconds without a send. If the server dropped it, the send reconnects
+    once and retries.
+    """
+
+    def __init__(self, idle_timeout: float = SMTP_IDLE_TIMEOUT, timeout: float = SMTP_TIMEOUT):
+        """
+        Initialize connection holder.
+
+        Args:
+            idle_timeout: Seconds without a send before the connection is closed
+            timeout: Socket timeout for connect and each command
+        """
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connects = 0
+        self._server = None
+        self._key = None
+        self._last_used = 0.0
+
+    def _connect(self, config: dict) -> None:
+        server = smtplib.SMTP_SSL(config["server"], config["port"], timeout=self.timeout)
+        try:
+            server.login(config["sender"], config["password"])
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._key = (config["server"], config["port"], config["sender"])
+        self.connects += 1
+        logger.debug(f"SMTP connection opened to {config['server']}:{config['port']}")
+
+    def send(self, config: dict, msg: MIMEMultipart) -> None:
         """
+        Send a message, connecting or reconnecting as needed.
 
-        msg.attach(MIMEText(body, "html"))
+        Raises:
+            smtplib.SMTPException, OSError: If the send fails after one reconnect
+        """
+        key = (config["server"], config["port"], config["sender"])
+        if self._server is not None and (self._key != key or self.idle_seconds() > self.idle_timeout):
+            self.close()
+
+        for attempt in (1, 2):
+            if self._server is None:
+                self._connect(config)
+            try:
+                self._server.send_message(msg, to_addrs=config["recipients"])
+                self._last_used = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                # Stale or dropped connection: start over once
+                self.close()
+                if attempt == 2:
+                    raise
+            except Exception:
+                # Unknown protocol state; do not reuse the connection
+                self.close()
+                raise
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self._last_used
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and self.idle_seconds() > self.idle_timeout:
+            logger.debug("Closing idle SMTP connection")
+            self.close()
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+@dataclass
+class Notification:
+    """One email waiting in the outbox."""
+    kind: str
+    resident_id: str
+    mismatch_count: int = 0
+    created_at: str = field(default_factory=now_utc_iso)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Row id in the durable outbox, if persisted
+    outbox_id: int | None = None
+
+    @property
+    def priority(self) -> int:
+        return PRIORITIES.get(self.kind, len(PRIORITIES))
+
+
+@dataclass
+class NotificationStats:
+    """Counters for the notification outbox."""
+    enqueued: int = 0
+    sent: int = 0
+    failed: int = 0
+    dropped: int = 0
+    max_depth: int = 0
+    total_send_seconds: float = 0.0
+    max_send_seconds: float = 0.0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    digests: int = 0
+    digested: int = 0
+    persisted: int = 0
+    replayed: int = 0
+    deferred: int = 0
+    # Queued copies of a row that was already sent, skipped instead of resent
+    duplicates: int = 0
+    throttled_seconds: float = 0.0
+
+    @property
+    def avg_send_seconds(self) -> float:
+        return self.total_send_seconds / self.sent if self.sent else 0.0
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.sent if self.sent else 0.0
+
+
+class TokenBucket:
+    """Global send-rate limit shared by every resident.
+
+    Holds up to `burst` tokens and refills `rate_per_min` per minute; each
+    email (or digest) takes one. A rate of 0 disables the limit.
+    """
 
-        with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
-            server.login(email_sender, email_password)
-            server.send_message(msg, to_addrs=recipients)
+    def __init__(self, rate_per_min: float = NOTIFY_RATE_PER_MIN, burst: int = NOTIFY_BURST):
+        """
+        Initialize bucket.
 
-        logger.info(f"Recovery email sent for resident {resident_id}")
+        Args:
+            rate_per_min: Tokens added per minute
+            burst: Bucket capacity (emails that may go out back to back)
+        """
+        self.rate = rate_per_min / 60
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, else seconds until the next one
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+_STOP = object()
+# Sorts after every notification, so close() sends what is queued first
+_STOP_PRIORITY = 1 << 30
+
+
+class NotificationOutbox:
+    """Bounded priority queue of emails drained by one background worker.
+
+    enqueue() never blocks on SMTP. The worker sends over a single reused
+    SmtpConnection, so a slow or hanging SMTP server only delays other
+    emails, never resident syncs. Alerts are sent before recoveries, and a
+    TokenBucket caps the global send rate.
+
+    With a store, every email is committed to the OutboxStore before
+    enqueue() returns and marked sent only after the server accepted it.
+    Unsent rows are replayed when the worker starts and re-queued every
+    NOTIFY_RETRY_SEC, which covers crashes, failed sends and emails that
+    did not fit in the queue.
+
+    With a digest window, the first email opens a window and everything
+    queued before it closes is handled together. If the window touches at
+    least digest_min_residents residents, one digest replaces the
+    individual emails, so an outage affecting every resident produces one
+    message instead of hundreds.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = NOTIFY_QUEUE_SIZE,
+        connection: SmtpConnection | None = None,
+        digest_window: float = NOTIFY_DIGEST_WINDOW_SEC,
+        digest_min_residents: int = NOTIFY_DIGEST_MIN_RESIDENTS,
+        store: OutboxStore | None = None,
+        bucket: TokenBucket | None = None,
+    ):
+        """
+        Initialize outbox.
+
+        Args:
+            maxsize: Most emails held in memory
+            connection: SMTP connection to reuse (a new one by default)
+            digest_window: Seconds to collect emails before sending (0 = send each at once)
+            digest_min_residents: Residents in one window that turn it into a digest
+            store: Durable outbox (None = in-memory only)
+            bucket: Global rate limit (a TokenBucket from the environment by default)
+        """
+        self.connection = connection or SmtpConnection()
+        self.digest_window = digest_window
+        self.digest_min_residents = max(1, digest_min_residents)
+        self.store = store
+        self.bucket = bucket or TokenBucket()
+        self.stats = NotificationStats()
+        self._queue = queue.PriorityQueue(max(1, maxsize))
+        self._seq = itertools.count()
+        # Outbox row ids currently queued or being sent, so replays do not duplicate them
+        self._queued_ids = set()
+        self._last_refill = 0.0
+        # Set when an email was left in the store because the queue was full
+        self._refill_due = False
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+        self._closed = False
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _put(self, notification: Notification) -> None:
+        """Queue without blocking; raises queue.Full."""
+        self._queue.put_nowait((notification.priority, next(self._seq), notification))
+
+    def _get(self, timeout: float):
+        return self._queue.get(timeout=timeout)[2]
+
+    def enqueue(self, notification: Notification) -> bool:
+        """
+        Persist (if durable) and queue an email without waiting for it to be sent.
+
+        Returns:
+            bool: True if the email will be sent, False if it was dropped
+        """
+        if self._closed:
+            logger.error(f"Notification outbox closed, dropping {notification.kind} for {notification.resident_id}")
+            return False
+        if self.store is not None:
+            try:
+                # Register the id in the same critical section as the insert, so a
+                # concurrent _refill() never sees the row pending and unqueued
+                with self._stats_lock:
+                    notification.outbox_id = self.store.add(
+                        notification.kind,
+                        notification.resident_id,
+                        notification.priority,
+                        notification.mismatch_count,
+                        notification.created_at,
+                    )
+                    self.stats.persisted += 1
+                    self._queued_ids.add(notification.outbox_id)
+            except Exception:
+                logger.exception(f"Failed to persist {notification.kind} for {notification.resident_id}")
+
+        try:
+            self._put(notification)
+        except queue.Full:
+            if notification.outbox_id is None:
+                with self._stats_lock:
+                    self.stats.dropped += 1
+                logger.error(f"Notification outbox full, dropping {notification.kind} for {notification.resident_id}")
+                return False
+            # Stays in the store; queued again once the worker catches up
+            with self._stats_lock:
+                self._queued_ids.discard(notification.outbox_id)
+                self.stats.deferred += 1
+                self._refill_due = True
+            logger.warning(f"Notification queue full, deferring {notification.kind} for {notification.resident_id}")
+            return True
+        with self._stats_lock:
+            self.stats.enqueued += 1
+            self.stats.max_depth = max(self.stats.max_depth, self._queue.qsize())
         return True
 
-    except Exception:
-        logger.exception("Failed to send recovery email")
-        return False
+    def _refill(self) -> None:
+        """Queue unsent rows from the store that are not already queued."""
+        self._last_refill = time.monotonic()
+        self._refill_due = False
+        if self.store is None or self._closed:
+            return
+        free = self._queue.maxsize - self._queue.qsize()
+        if free <= 0:
+            return
+        try:
+            rows = self.store.pending(limit=free + len(self._queued_ids), max_attempts=NOTIFY_MAX_ATTEMPTS)
+        except Exception:
+            logger.exception("Failed to read the notification outbox")
+            return
+        replayed = 0
+        for row in rows:
+            with self._stats_lock:
+                if row["id"] in self._queued_ids:
+                    continue
+                self._queued_ids.add(row["id"])
+            notification = Notification(
+                row["kind"], row["resident_id"], row["mismatch_count"], row["created_at"], outbox_id=row["id"]
+            )
+            try:
+                self._put(notification)
+            except queue.Full:
+                with self._stats_lock:
+                    self._queued_ids.discard(row["id"])
+                break
+            replayed += 1
+        if replayed:
+            with self._stats_lock:
+                self.stats.replayed += replayed
+            logger.info(f"Replaying {replayed} unsent notification(s) from {self.store.path}")
+
+    def _run(self) -> None:
+        poll = max(0.1, min(1.0, self.connection.idle_timeout))
+        self._refill()
+        while True:
+            try:
+                item = self._get(timeout=poll)
+            except queue.Empty:
+                self.connection.close_if_idle()
+                if self._refill_due or time.monotonic() - self._last_refill >= NOTIFY_RETRY_SEC:
+                    self._refill()
+                continue
+            if item is _STOP:
+                break
+            if self.digest_window <= 0:
+                if self._unsent([item]):
+                    self._deliver(item)
+                continue
+            batch = [item]
+            stopping = self._collect(batch)
+            batch = self._unsent(batch)
+            if batch:
+                self._deliver_batch(batch)
+            if stopping:
+                break
+        self.connection.close()
+
+    def _collect(self, batch: list) -> bool:
+        """Add emails queued within the digest window to batch; True if stop was requested."""
+        deadline = batch[0].enqueued_at + self.digest_window
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = self._get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+
+    def _unsent(self, notifications: list) -> list:
+        """Drop queued copies of outbox rows that are already sent or appear twice."""
+        ids = {n.outbox_id for n in notifications if n.outbox_id is not None}
+        if not ids:
+            return notifications
+        try:
+            unsent = self.store.unsent(ids)
+        except Exception:
+            logger.exception("Failed to read the notification outbox")
+            return notifications
+        result = []
+        for notification in notifications:
+            if notification.outbox_id is not None:
+                if notification.outbox_id not in unsent:
+                    logger.warning(
+                        f"Skipping {notification.kind} for {notification.resident_id}: "
+                        f"outbox row {notification.outbox_id} already handled"
+                    )
+                    with self._stats_lock:
+                        self.stats.duplicates += 1
+                        self._queued_ids.discard(notification.outbox_id)
+                    continue
+                unsent.discard(notification.outbox_id)
+            result.append(notification)
+        return result
+
+    def _deliver_batch(self, batch: list) -> None:
+        residents = {notification.resident_id for notification in batch}
+        if len(residents) < self.digest_min_residents:
+            # Alerts first, then arrival order
+            for notification in sorted(batch, key=lambda n: n.priority):
+                self._deliver(notification)
+            return
+
+        rows = summarize_notifications(batch)
+        description = f"digest for {len(residents)} residents ({len(batch)} events)"
+        if self._send(lambda config: build_digest_message(config, rows), description, batch):
+            with self._stats_lock:
+                self.stats.digests += 1
+                self.stats.digested += len(batch)
+
+    def _deliver(self, notification: Notification) -> None:
+        def build(config):
+            if notification.kind == KIND_ALERT:
+                return build_mismatch_message(
+                    config, notification.resident_id, notification.mismatch_count, notification.created_at
+                )
+            return build_recovery_message(config, notification.resident_id, notification.created_at)
+
+        description = f"{notification.kind} email for resident {notification.resident_id}"
+        self._send(build, description, [notification])
+
+    def _wait_for_token(self) -> bool:
+        """Block until the rate limit allows a send; False if closing with a store to replay from."""
+        while True:
+            delay = self.bucket.take()
+            if delay <= 0:
+                return True
+            if self._closed and self.store is not None:
+                return False
+            delay = min(delay, 0.5)
+            with self._stats_lock:
+                self.stats.throttled_seconds += delay
+            time.sleep(delay)
+
+    def _send(self, build, description: str, notifications: list) -> bool:
+        """Build a message from the SMTP config and send it, recording latency and outbox state."""
+        ids = [n.outbox_id for n in notifications if n.outbox_id is not None]
+        try:
+            if not self._wait_for_token():
+                logger.info(f"Shutting down before rate limit allowed {description}; left in outbox")
+                return False
+
+            started = time.monotonic()
+            try:
+                config = _smtp_config()
+                self.connection.send(config, build(config))
+            except Exception as e:
+                logger.exception(f"Failed to send {description}")
+                with self._stats_lock:
+                    self.stats.failed += 1
+                if self.store is not None:
+                    self._store_call(self.store.mark_failed, ids, repr(e))
+                return False
+
+            if self.store is not None:
+                self._store_call(self.store.mark_sent, ids)
+            finished = time.monotonic()
+            send_seconds = finished - started
+            wait_seconds = started - min(n.enqueued_at for n in notifications)
+            with self._stats_lock:
+                stats = self.stats
+                stats.sent += 1
+                stats.total_send_seconds += send_seconds
+                stats.max_send_seconds = max(stats.max_send_seconds, send_seconds)
+                stats.total_wait_seconds += wait_seconds
+                stats.max_wait_seconds = max(stats.max_wait_seconds, wait_seconds)
+            logger.info(f"Sent {description}")
+            return True
+        finally:
+            with self._stats_lock:
+                self._queued_ids.difference_update(ids)
+
+    @staticmethod
+    def _store_call(method, *args) -> None:
+        try:
+            method(*args)
+        except Exception:
+            logger.exception("Failed to update the notification outbox")
+
+    def close(self, timeout: float = SMTP_TIMEOUT) -> None:
+        """Send what is already queued, then stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            try:
+                self._queue.put((_STOP_PRIORITY, next(self._seq), _STOP), timeout=timeout)
+            except queue.Full:
+                logger.warning(f"Notification outbox still full after {timeout}s; stopping with {self.depth()} unsent")
+            else:
+                self._thread.join(timeout)
+                if self._thread.is_alive():
+                    logger.warning(f"Notification worker still sending after {timeout}s; {self.depth()} unsent")
+        if self.store is not None and not self._thread.is_alive():
+            self.store.close()
+
+    def get_stats(self) -> dict:
+        """Return queue depth, counters and send latency."""
+        with self._stats_lock:
+            return _stats_dict(self.stats, self.depth(), self.connection.connects)
+
+
+def _stats_dict(stats: NotificationStats, depth: int, connects: int) -> dict:
+    return {
+        "depth": depth,
+        "max_depth": stats.max_depth,
+        "enqueued": stats.enqueued,
+        "sent": stats.sent,
+        "failed": stats.failed,
+        "dropped": stats.dropped,
+        "connects": connects,
+        "avg_send_seconds": stats.avg_send_seconds,
+        "max_send_seconds": stats.max_send_seconds,
+        "avg_wait_seconds": stats.avg_wait_seconds,
+        "max_wait_seconds": stats.max_wait_seconds,
+        "digests": stats.digests,
+        "digested": stats.digested,
+        "persisted": stats.persisted,
+        "replayed": stats.replayed,
+        "deferred": stats.deferred,
+        "duplicates": stats.duplicates,
+        "throttled_seconds": stats.throttled_seconds,
+    }
+
+
+_outbox: NotificationOutbox | None = None
+_outbox_lock = threading.Lock()
+
+
+def get_notification_outbox() -> NotificationOutbox:
+    """Return the process-wide outbox, starting its worker (and replay) on first use."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                store = OutboxStore(NOTIFY_OUTBOX_DB) if NOTIFY_DURABLE else None
+                outbox = NotificationOutbox(store=store)
+                outbox.start()
+                atexit.register(outbox.close)
+                _outbox = outbox
+    return _outbox
+
+
+def close_notification_outbox() -> None:
+    """Drain and stop the outbox if it was started."""
+    if _outbox is not None:
+        _outbox.close()
+
+
+def get_notification_stats() -> dict:
+    """Return outbox counters (all zero if nothing was queued yet)."""
+    if _outbox is None:
+        return _stats_dict(NotificationStats(), depth=0, connects=0)
+    return _outbox.get_stats()
+
+
+def notify_mismatch(resident_id: str, mismatch_count: int) -> bool:
+    """
+    Send or queue an alert email, depending on NOTIFY_MODE.
+
+    Returns:
+        bool: True if sent (inline) or queued (outbox)
+    """
+    if NOTIFY_MODE == "inline":
+        return send_mismatch_email(resident_id, mismatch_count)
+    return get_notification_outbox().enqueue(Notification(KIND_ALERT, resident_id, mismatch_count))
+
+
+def notify_recovery(resident_id: str) -> bool:
+    """
+    Send or queue a recovery email, depending on NOTIFY_MODE.
+
+    Returns:
+        bool: True if sent (inline) or queued (outbox)
+    """
+    if NOTIFY_MODE == "inline":
+        return send_recovery_email(resident_id)
+    return get_notification_outbox().enqueue(Notification(KIND_RECOVERY, resident_id))
+
+
+async def async_notify_mismatch(resident_id: str, mismatch_count: int) -> bool:
+    """notify_mismatch for the event loop, run on a worker thread (SMTP or outbox INSERT)."""
+    return await asyncio.to_thread(notify_mismatch, resident_id, mismatch_count)
+
+
+async def async_notify_recovery(resident_id: str) -> bool:
+    """notify_recovery for the event loop, run on a worker thread (SMTP or outbox INSERT)."""
+    return await asyncio.to_thread(notify_recovery, resident_id)
@@ -0,0 +1,151 @@
+"""Durable SQLite outbox for notification emails."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from utils.time_utils import now_utc_iso
+
+
+logger = logging.getLogger(__name__)
+
+# Days sent entries are kept before they are pruned at startup
+NOTIFY_OUTBOX_KEEP_DAYS = float(os.getenv("NOTIFY_OUTBOX_KEEP_DAYS", "7"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    resident_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    mismatch_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    queued_ts REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    sent_ts REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending
+    ON outbox (priority, id) WHERE sent_ts IS NULL;
+"""
+
+
+class OutboxStore:
+    """Notifications written to SQLite before they are sent.
+
+    Every row is committed before enqueue returns and marked sent only after
+    the SMTP server accepted it. Rows still unsent after a crash or a failed
+    send are returned by pending() and replayed.
+    """
+
+    def __init__(self, path: str, keep_days: float = NOTIFY_OUTBOX_KEEP_DAYS):
+        """
+        Initialize outbox store.
+
+        Args:
+            path: Database file path
+            keep_days: Sent rows older than this are deleted on open
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self._conn:
+            pruned = self._conn.execute(
+                "DELETE FROM outbox WHERE sent_ts IS NOT NULL AND sent_ts < ?",
+                (time.time() - keep_days * 86400,),
+            ).rowcount
+        logger.info(f"Opened notification outbox {path} ({self.pending_count()} unsent, {pruned} pruned)")
+
+    def add(self, kind: str, resident_id: str, priority: int, mismatch_count: int = 0,
+            created_at: str | None = None) -> int:
+        """
+        Persist a notification.
+
+        Returns:
+            int: Row id
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (kind, resident_id, priority, mismatch_count, created_at, queued_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, resident_id, priority, mismatch_count, created_at or now_utc_iso(), time.time()),
+            )
+            return cursor.lastrowid
+
+    def mark_sent(self, ids: list) -> None:
+        """Mark rows as delivered."""
+        if not ids:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE outbox SET sent_ts = ? WHERE id = ?", [(now, i) for i in ids])
+
+    def mark_failed(self, ids: list, error: str) -> None:
+        """Count a failed delivery attempt; the rows stay pending."""
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(error[:500], i) for i in ids],
+            )
+
+    def unsent(self, ids) -> set:
+        """
+        Return the ids that are still waiting to be sent.
+
+        Args:
+            ids: Row ids to check
+
+        Returns:
+            set: Subset of ids not marked sent (pruned rows count as sent)
+        """
+        ids = list(ids)
+        if not ids:
+            return set()
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM outbox WHERE sent_ts IS NULL AND id IN ({placeholders})", ids
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def pending(self, limit: int = 1000, max_attempts: int | None = None) -> list:
+        """
+        Return unsent rows, highest priority (lowest number) first, then oldest.
+
+        Args:
+            limit: Most rows returned
+            max_attempts: Skip rows that already failed this many times
+
+        Returns:
+            list: Dicts with the outbox columns
+        """
+        sql = (
+            "SELECT id, kind, resident_id, priority, mismatch_count, created_at, attempts "
+            "FROM outbox WHERE sent_ts IS NULL"
+        )
+        params = []
+        if max_attempts is not None:
+            sql += " AND attempts < ?"
+            params.append(max_attempts)
+        sql += " ORDER BY priority, id LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        columns = ("id", "kind", "resident_id", "priority", "mismatch_count", "created_at", "attempts")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE sent_ts IS NULL").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -3,46 +3,136 @@
 import os
 import time
 import logging
-from core.storage import  upload_file
-from utils.json_utils import extract_resident_status, get_resident_status_from_file
-from services.state_manager import StateManager
-from core.portal import call_authenticated_api
-from services.notification_service import send_mismatch_email, send_recovery_email
+from collections import deque
+from core.storage import upload_bytes
+from utils.json_utils import (
+    build_sensor_payload,
+    extract_resident,
+    load_payload_template,
+)
+from utils.time_utils import backoff_delays, parse_iso_timestamp
+from services.state_manager import get_state_manager
+from models.resident_table import ALERT_WINDOW, ResidentColumns, get_resident_table
+from core.feed_cache import get_feed_cache
+from services.notification_service import notify_mismatch, notify_recovery
 
 logger = logging.getLogger(__name__)
 
+# Hours between alert emails for the same resident (global rate: NOTIFY_RATE_PER_MIN)
 EMAIL_PAUSE_HOURS = int(os.getenv("EMAIL_PAUSE", "1"))
 EMAIL_PAUSE_SEC = EMAIL_PAUSE_HOURS * 3600
 
 MISMATCH_THRESHOLD = int(os.getenv("MISMATCH_THRESHOLD", "10"))
 RECOVERY_THRESHOLD = int(os.getenv("RECOVERY_THRESHOLD", "10"))
-EMAIL_PAUSE_HOURS  = int(os.getenv("EMAIL_PAUSE", "10"))
+# Windowed alert rules over the last ALERT_WINDOW outcomes (0 = rule disabled)
+# k-of-n: alert once this many of the window's syncs mismatched
+ALERT_WINDOW_FAILURES = int(os.getenv("ALERT_WINDOW_FAILURES", "0"))
+# rate: alert once this fraction of the window mismatched, after ALERT_MIN_SAMPLES syncs
+ALERT_FAILURE_RATE = float(os.getenv("ALERT_FAILURE_RATE", "0"))
+ALERT_MIN_SAMPLES = int(os.getenv("ALERT_MIN_SAMPLES", "10"))
 
+# The window never holds more than ALERT_WINDOW outcomes; larger thresholds could never fire
+if ALERT_WINDOW_FAILURES > ALERT_WINDOW:
+    logger.warning(
+        f"ALERT_WINDOW_FAILURES={ALERT_WINDOW_FAILURES} exceeds ALERT_WINDOW={ALERT_WINDOW}; "
+        f"clamping to {ALERT_WINDOW}"
+    )
+    ALERT_WINDOW_FAILURES = ALERT_WINDOW
+if ALERT_FAILURE_RATE > 0 and ALERT_MIN_SAMPLES > ALERT_WINDOW:
+    logger.warning(
+        f"ALERT_MIN_SAMPLES={ALERT_MIN_SAMPLES} exceeds ALERT_WINDOW={ALERT_WINDOW}; "
+        f"clamping to {ALERT_WINDOW}"
+    )
+    ALERT_MIN_SAMPLES = ALERT_WINDOW
 
-class ResidentMonitor:
-    """Monitors a single resident's status."""
+# "poll": check the portal with backoff until the upload is visible (default)
+# "fixed": sleep PROPAGATION_WAIT once, then check
+PROPAGATION_MODE = os.getenv("PROPAGATION_MODE", "poll").lower()
+# Seconds to wait after an upload before checking the portal (fixed mode)
+PROPAGATION_WAIT_SEC = float(os.getenv("PROPAGATION_WAIT", "5"))
+# Poll mode: first delay, backoff factor, longest delay and overall deadline
+PROPAGATION_INITIAL_DELAY = float(os.getenv("PROPAGATION_INITIAL_DELAY", "0.5"))
+PROPAGATION_BACKOFF = float(os.getenv("PROPAGATION_BACKOFF", "2"))
+PROPAGATION_MAX_DELAY = float(os.getenv("PROPAGATION_MAX_DELAY", "5"))
+PROPAGATION_DEADLINE = float(os.getenv("PROPAGATION_DEADLINE", "30"))
+# Seconds the portal's Timestamp may lag the uploaded one and still count as the upload
+PROPAGATION_CLOCK_SKEW = float(os.getenv("PROPAGATION_CLOCK_SKEW", "2"))
+# Number of measured propagation delays kept per resident
+PROPAGATION_HISTORY = 100
+
+# Actions returned by ResidentMonitor.evaluate()
+NOTIFY_ALERT = "alert"
+NOTIFY_RECOVERY = "recovery"
+
+# Payload template; loaded once and filled in memory for every upload
+UPLOAD_TEMPLATE_PATH = "data/upload.json"
+
+
+class ResidentMonitor(ResidentColumns):
+    """Monitors a single resident's status.
+
+    Counters, alert flags and the expected status live in a row of the
+    shared ResidentTable rather than on the instance.
+    """
+
+    __slots__ = (
+        "resident_id",
+        "interval_sec",
+        "_table",
+        "_slot",
+        "state_manager",
+        "propagation_mode",
+        "propagation_wait_sec",
+        "propagation_deadline_sec",
+        "expected_timestamp",
+        "_propagation_samples",
+        "a",
+        "payload_template",
+    )
     
-    def __init__(self, resident_id: str, interval_sec: int = 60):
+    def __init__(self, resident_id: str, interval_sec: int = 60, table=None):
         """
         Initialize resident monitor.
         
         Args:
             resident_id: Unique resident identifier (e.g., "CG0128")
             interval_sec: Sync interval in seconds
+            table: ResidentTable holding the counters (defaults to the shared one)
         """
         self.resident_id = resident_id
         self.interval_sec = interval_sec
+        self._table = table if table is not None else get_resident_table()
+        self._slot = self._table.add(resident_id, interval_sec)
         self.mismatch_count = 0
         self.last_email_ts: float | None = None
-        self.state_manager = StateManager()
+        self.state_manager = get_state_manager()
         self.alert_active = False
         self.match_count = 0
+        self.propagation_mode = PROPAGATION_MODE
+        self.propagation_wait_sec = PROPAGATION_WAIT_SEC
+        self.propagation_deadline_sec = PROPAGATION_DEADLINE
+        self.uploaded_at: float | None = None
+        self.expected_status: str | None = None
+        self.expected_timestamp: str | None = None
+        self.last_propagation_sec: float | None = None
+        # Created on the first measured delay
+        self._propagation_samples = None
+        self.propagation_timeouts = 0
         self.a = 0
 
-        # Paths
-        self.upload_path = f"data/upload.json"
-        self.download_path = f"data/download.json"
-        self.remote_path = f"json_notifications/{resident_id}.json"
+        # Shared payload template, filled per upload
+        self.payload_template = load_payload_template(UPLOAD_TEMPLATE_PATH)
+
+    @property
+    def remote_path(self) -> str:
+        return f"json_notifications/{self.resident_id}.json"
+
+    @property
+    def propagation_samples(self) -> deque:
+        """Last PROPAGATION_HISTORY measured upload-to-portal delays."""
+        if self._propagation_samples is None:
+            self._propagation_samples = deque(maxlen=PROPAGATION_HISTORY)
+        return self._propagation_samples
 
     def _can_send_email(self) -> bool:
         """Check whether email pause window has elapsed."""
@@ -50,110 +140,332 @@ class ResidentMonitor:
             return True
         return (time.time() - self.last_email_ts) >= EMAIL_PAUSE_SEC
     
-    def sync_once(self, client=None, session=None) -> bool:
+    def build_payload(self) -> tuple[bytes, dict]:
         """
-        Perform single sync cycle for this resident.
-        
+        Generate this resident's next upload in memory.
+
+        Returns:
+            tuple: (payload bytes, Resident object with Status and Timestamp)
+        """
+        return build_sensor_payload(self.payload_template, self.resident_id)
+
+    def record_uploaded_status(self, resident: dict) -> str:
+        """Store the status that was just uploaded as the expected state."""
+        new_status = resident.get("Status", "UNKNOWN")
+        self.expected_status = new_status
+        self.expected_timestamp = resident.get("Timestamp")
+        self.state_manager.save_state(self.resident_id, new_status)
+        return new_status
+
+    def poll_delays(self):
+        """Yield backoff sleeps for poll mode, bounded by the propagation deadline."""
+        return backoff_delays(
+            PROPAGATION_INITIAL_DELAY,
+            PROPAGATION_BACKOFF,
+            PROPAGATION_MAX_DELAY,
+            self.propagation_deadline_sec,
+        )
+
+    def check_propagation(self, api_data: dict, polled_at: float) -> bool:
+        """
+        Check whether the last upload is visible in a feed snapshot.
+
+        Records the propagation delay the first time it is seen.
+
         Args:
-            client: WebDAV client instance
-            session: Authenticated session for API calls
-        
+            api_data: Notifications feed keyed by sensor id
+            polled_at: Monotonic time the snapshot was requested
+
         Returns:
-            bool: True if sync successful, False otherwise
+            bool: True if the portal shows the uploaded status
         """
         try:
-            if client is None or session is None:
-                logger.error(f"Missing client or session for resident {self.resident_id}")
-                self.mismatch_count += 1
-                return False
-            
-            logger.info(f"[{self.resident_id}] Uploading to {self.remote_path}")
-            upload_file(client, self.upload_path, self.remote_path)
-            
-            # Update state manager with new generated status
-            new_status = get_resident_status_from_file(self.upload_path)
-            self.state_manager.save_state(self.resident_id, new_status)
-            
-            logger.debug(f"[{self.resident_id}] Waiting 5 seconds for server processing")
-            time.sleep(5)
-            
-            if not os.path.exists(self.download_path):
-                logger.warning(f"[{self.resident_id}] Downloaded file missing after sync")
-                self.mismatch_count += 1
-                return False
-            
-            # Get statuses from API and local file
-            logger.debug(f"[{self.resident_id}] Fetching resident status from API")
-            api_data = call_authenticated_api(session)
-            api_status = extract_resident_status(api_data, self.resident_id)
-            
-            # Get latest state from state manager
-            latest_state = self.state_manager.get_latest_state(self.resident_id)
-            
-            logger.info(f"[{self.resident_id}] Portal Status: {api_status}")
-            logger.info(f"[{self.resident_id}] Latest State: {latest_state}")
-            
-            # Initialize state on first run if not found
-            if latest_state is None:
-                logger.info(f"[{self.resident_id}] Initializing state with API status: {api_status}")
-                self.state_manager.save_state(self.resident_id, api_status)
-                return True
-            
-            """
-            # For testing purpose only
-            if self.a < 12:
-                latest_state = "test"
-                self.a += 1 
-            """
-     
-            if api_status != latest_state:
-                    # ---- MISMATCH ----
-                    self.mismatch_count += 1
-                    self.match_count = 0  # reset recovery streak
-
-                    logger.warning(
-                        f"[{self.resident_id}] Status mismatch "
-                        f"({self.mismatch_count}/{MISMATCH_THRESHOLD}) "
-                        f"API={api_status}, State={latest_state}"
-                    )
-
-                    if (
-                        self.mismatch_count >= MISMATCH_THRESHOLD
-                        and not self.alert_active
-                        and self._can_send_email()
-                    ):
-                        logger.critical(
-                            f"[{self.resident_id}] Server unhealthy. Sending alert."
-                        )
-                        send_mismatch_email(self.resident_id, self.mismatch_count)
-                        self.last_email_ts = time.time()
-                        self.alert_active = True
+            resident = extract_resident(api_data, self.resident_id)
+        except (KeyError, ValueError):
+            return False
+        if resident.get("Status") != self.expected_status:
+            return False
+        if not self.is_current_timestamp(resident.get("Timestamp")):
+            return False
+        self.record_propagation(polled_at - self.uploaded_at)
+        return True
 
+    def is_current_timestamp(self, timestamp: str | None) -> bool:
+        """
+        Check that a portal Timestamp is not older than the last upload.
+
+        Both values are compared as UTC datetimes, so a different ISO format or
+        precision still matches; PROPAGATION_CLOCK_SKEW absorbs small clock
+        differences. If either value cannot be parsed, the snapshot (always
+        requested after the upload) showing the uploaded status is enough.
+
+        Args:
+            timestamp: Resident.Timestamp reported by the portal
+
+        Returns:
+            bool: True unless the portal timestamp predates the upload
+        """
+        expected = parse_iso_timestamp(self.expected_timestamp)
+        seen = parse_iso_timestamp(timestamp)
+        if expected is None or seen is None:
+            return True
+        return (expected - seen).total_seconds() <= PROPAGATION_CLOCK_SKEW
+
+    def record_propagation(self, delay: float) -> None:
+        """Store one measured upload-to-portal delay."""
+        self.last_propagation_sec = delay
+        self.propagation_samples.append(delay)
+        logger.debug(f"[{self.resident_id}] Upload visible on portal after {delay:.2f}s")
+
+    def record_propagation_timeout(self) -> None:
+        """Count an upload that did not appear before the deadline."""
+        self.last_propagation_sec = None
+        self.propagation_timeouts += 1
+        logger.warning(
+            f"[{self.resident_id}] Upload not visible on portal after "
+            f"{self.propagation_deadline_sec}s"
+        )
+
+    def wait_for_propagation(self, session, feed_cache=None) -> dict | None:
+        """
+        Wait until the portal reflects the last upload.
+
+        In fixed mode this sleeps PROPAGATION_WAIT once. In poll mode it checks
+        the feed with exponential backoff until the uploaded status appears or
+        the deadline expires.
+
+        Args:
+            session: Authenticated session for API calls
+            feed_cache: Shared feed cache (defaults to the process-wide cache)
+
+        Returns:
+            dict | None: Last feed snapshot seen in poll mode, None in fixed mode
+        """
+        if self.propagation_mode != "poll":
+            logger.debug(
+                f"[{self.resident_id}] Waiting {self.propagation_wait_sec} seconds for server processing"
+            )
+            time.sleep(self.propagation_wait_sec)
+            return None
+
+        feed_cache = feed_cache or get_feed_cache()
+        not_before = self.uploaded_at
+        api_data = None
+        for delay in self.poll_delays():
+            time.sleep(delay)
+            polled_at = time.monotonic()
+            api_data = feed_cache.get(session, not_before=not_before)
+            # Later polls must see a snapshot newer than this one
+            not_before = polled_at
+            if self.check_propagation(api_data, polled_at):
+                return api_data
+        self.record_propagation_timeout()
+        return api_data
+
+    def window_rule(self) -> str | None:
+        """
+        Check the windowed alert rules against this resident's outcome ring.
+
+        Returns:
+            str | None: Description of the rule that holds, else None
+        """
+        count = self.window_count
+        failures = self.window_failures
+        # Thresholds above this table's window could never be reached
+        window = self._table.window
+        if ALERT_WINDOW_FAILURES > 0 and failures >= min(ALERT_WINDOW_FAILURES, window):
+            return f"{failures} of last {count} syncs mismatched"
+        if (
+            ALERT_FAILURE_RATE > 0
+            and count >= min(ALERT_MIN_SAMPLES, window)
+            and failures >= ALERT_FAILURE_RATE * count
+        ):
+            return f"mismatch rate {failures / count:.0%} over last {count} syncs"
+        return None
+
+    def evaluate(self, api_status: str, api_timestamp: str | None = None) -> str | None:
+        """
+        Compare the portal status with the latest stored state.
+
+        Updates mismatch/match streaks, the outcome window and alert state,
+        and records the observation in the state history. An alert fires on
+        MISMATCH_THRESHOLD mismatches in a row or when a window rule holds;
+        recovery needs RECOVERY_THRESHOLD matches in a row and no window rule.
+
+        Args:
+            api_status: Resident status reported by the portal
+            api_timestamp: Resident timestamp reported by the portal
+
+        Returns:
+            str | None: NOTIFY_ALERT or NOTIFY_RECOVERY if an email is due, else None
+        """
+        # Get latest state from state manager
+        latest_state = self.state_manager.get_latest_state(self.resident_id)
+
+        logger.info(f"[{self.resident_id}] Portal Status: {api_status}")
+        logger.info(f"[{self.resident_id}] Latest State: {latest_state}")
+
+        # Initialize state on first run if not found
+        if latest_state is None:
+            logger.info(f"[{self.resident_id}] Initializing state with API status: {api_status}")
+            self.state_manager.save_state(self.resident_id, api_status)
+            return None
+
+        self.state_manager.record_observation(
+            self.resident_id,
+            latest_state,
+            api_status,
+            expected_timestamp=self.expected_timestamp,
+            portal_timestamp=api_timestamp,
+            latency_sec=self.last_propagation_sec,
+        )
+
+        """
+        # For testing purpose only
+        if self.a < 12:
+            latest_state = "test"
+            self.a += 1 
+        """
+
+        mismatch = api_status != latest_state
+        self.record_outcome(mismatch, self.last_propagation_sec)
+
+        if mismatch:
+            # ---- MISMATCH ----
+            self.mismatch_count += 1
+            self.match_count = 0  # reset recovery streak
+
+            logger.warning(
+                f"[{self.resident_id}] Status mismatch "
+                f"({self.mismatch_count}/{MISMATCH_THRESHOLD}, "
+                f"window {self.window_failures}/{self.window_count}) "
+                f"API={api_status}, State={latest_state}"
+            )
+
+            if self.mismatch_count >= MISMATCH_THRESHOLD:
+                reason = f"{self.mismatch_count} mismatches in a row"
             else:
-                # ---- MATCH ----
-                self.match_count += 1
-                self.mismatch_count = 0  # reset failure streak
+                reason = self.window_rule()
+            if (
+                reason
+                and not self.alert_active
+                and self._can_send_email()
+            ):
+                logger.critical(
+                    f"[{self.resident_id}] Server unhealthy ({reason}). Sending alert."
+                )
+                self.last_email_ts = time.time()
+                self.alert_active = True
+                return NOTIFY_ALERT
+
+        else:
+            # ---- MATCH ----
+            self.match_count += 1
+            self.mismatch_count = 0  # reset failure streak
 
+            logger.info(
+                f"[{self.resident_id}] Status match "
+                f"({self.match_count}/{RECOVERY_THRESHOLD})"
+            )
+
+            # Send recovery email ONLY if there was a prior alert
+            if (
+                self.alert_active
+                and self.match_count >= RECOVERY_THRESHOLD
+                and self.window_rule() is None
+            ):
                 logger.info(
-                    f"[{self.resident_id}] Status match "
-                    f"({self.match_count}/{RECOVERY_THRESHOLD})"
+                    f"[{self.resident_id}] Server recovered. Sending recovery email."
                 )
+                self.alert_active = False
+                self.match_count = 0
+                return NOTIFY_RECOVERY
+
+        return None
+
+    def notify(self, action: str | None) -> None:
+        """Queue (or, with NOTIFY_MODE=inline, send) the email chosen by evaluate(), if any."""
+        if action == NOTIFY_ALERT:
+            notify_mismatch(self.resident_id, self.mismatch_count)
+        elif action == NOTIFY_RECOVERY:
+            notify_recovery(self.resident_id)
+
+    def upload_once(self, client) -> bool:
+        """
+        Upload a freshly generated status for this resident.
+
+        Args:
+            client: WebDAV client instance
+
+        Returns:
+            bool: True if the upload succeeded, False otherwise
+        """
+        try:
+            logger.info(f"[{self.resident_id}] Uploading to {self.remote_path}")
+            payload, resident = self.build_payload()
+            upload_bytes(client, payload, self.remote_path)
+            self.uploaded_at = time.monotonic()
+
+            # Update state manager with new generated status
+            self.record_uploaded_status(resident)
+            return True
+
+        except Exception:
+            logger.exception(f"[{self.resident_id}] Upload failed")
+            self.mismatch_count += 1
+            return False
+
+    def verify_once(self, session, feed_cache=None, api_data: dict | None = None) -> bool:
+        """
+        Compare the portal status with the uploaded state and send alerts.
+
+        Args:
+            session: Authenticated session for API calls
+            feed_cache: Shared feed cache (defaults to the process-wide cache)
+            api_data: Feed snapshot already fetched while polling, if any
 
-                # Send recovery email ONLY if there was a prior alert
-                if self.alert_active and self.match_count >= RECOVERY_THRESHOLD:
-                    logger.info(
-                        f"[{self.resident_id}] Server recovered. Sending recovery email."
-                    )
-                    send_recovery_email(self.resident_id)
-                    self.alert_active = False
-                    self.match_count = 0
+        Returns:
+            bool: True if the check ran, False otherwise
+        """
+        try:
+            # One feed fetch is shared by every resident checking at the same time
+            logger.debug(f"[{self.resident_id}] Fetching resident status from API")
+            if api_data is None:
+                feed_cache = feed_cache or get_feed_cache()
+                api_data = feed_cache.get(session, not_before=self.uploaded_at)
+            resident = extract_resident(api_data, self.resident_id)
 
-            
+            self.notify(self.evaluate(resident["Status"], resident.get("Timestamp")))
             return True
-            
+
         except Exception:
             logger.exception(f"[{self.resident_id}] Sync failed")
             self.mismatch_count += 1
             return False
+
+    def sync_once(self, client=None, session=None) -> bool:
+        """
+        Perform single sync cycle for this resident.
+        
+        Args:
+            client: WebDAV client instance
+            session: Authenticated session for API calls
         
+        Returns:
+            bool: True if sync successful, False otherwise
+        """
+        if client is None or session is None:
+            logger.error(f"Missing client or session for resident {self.resident_id}")
+            self.mismatch_count += 1
+            return False
+
+        if not self.upload_once(client):
+            return False
+
+        try:
+            api_data = self.wait_for_propagation(session)
+        except Exception:
+            logger.exception(f"[{self.resident_id}] Polling portal failed")
+            api_data = None
 
+        return self.verify_once(session, api_data=api_data)
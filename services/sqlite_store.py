@@ -0,0 +1,211 @@
+"""SQLite persistence for resident state and observation history."""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from services.state_store import ShardedStateStore, StateSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered before they are written in one transaction
+STATE_DB_BATCH = int(os.getenv("STATE_DB_BATCH", "100"))
+# Longest time rows stay buffered, checked on every write
+STATE_DB_FLUSH_SEC = float(os.getenv("STATE_DB_FLUSH_SEC", "1"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS states (
+    resident_id TEXT PRIMARY KEY,
+    status TEXT,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    resident_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    expected_status TEXT,
+    portal_status TEXT,
+    expected_timestamp TEXT,
+    portal_timestamp TEXT,
+    latency_sec REAL,
+    match INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_resident_ts
+    ON observations (resident_id, ts);
+CREATE INDEX IF NOT EXISTS idx_observations_mismatch
+    ON observations (resident_id, ts) WHERE match = 0;
+"""
+
+_OBSERVATION_COLUMNS = (
+    "resident_id", "ts", "expected_status", "portal_status",
+    "expected_timestamp", "portal_timestamp", "latency_sec", "match",
+)
+
+
+class SQLiteStateStore:
+    """Latest state per resident plus every observation, in one WAL database.
+
+    Latest states are also kept in a sharded in-memory store so reads never
+    touch the disk. Writes are buffered and flushed in a single transaction
+    once batch_size rows are pending or flush_interval has passed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = STATE_DB_BATCH,
+        flush_interval: float = STATE_DB_FLUSH_SEC,
+    ):
+        """
+        Initialize SQLite store.
+
+        Args:
+            path: Database file path
+            batch_size: Pending rows that trigger a flush
+            flush_interval: Seconds after which pending rows are flushed
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._pending_states = {}
+        self._pending_observations = []
+        self._last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._states = ShardedStateStore()
+        self._states.replace_all({
+            resident_id: {"status": status, "timestamp": timestamp}
+            for resident_id, status, timestamp in self._conn.execute(
+                "SELECT resident_id, status, timestamp FROM states"
+            )
+        })
+        logger.info(f"Opened state database {path} ({len(self._states)} residents)")
+
+    def _pending_count(self) -> int:
+        return len(self._pending_states) + len(self._pending_observations)
+
+    def _maybe_flush(self) -> None:
+        if (
+            self._pending_count() >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered rows in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_count():
+                return
+            states = [
+                (resident_id, entry["status"], entry["timestamp"])
+                for resident_id, entry in self._pending_states.items()
+            ]
+            observations = self._pending_observations
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO states (resident_id, status, timestamp) VALUES (?, ?, ?) "
+                    "ON CONFLICT(resident_id) DO UPDATE SET "
+                    "status = excluded.status, timestamp = excluded.timestamp",
+                    states,
+                )
+                self._conn.executemany(
+                    f"INSERT INTO observations ({', '.join(_OBSERVATION_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_OBSERVATION_COLUMNS))})",
+                    observations,
+                )
+            self._pending_states = {}
+            self._pending_observations = []
+
+    def save_state(self, resident_id: str, entry: dict) -> None:
+        """Store the latest state of a resident."""
+        self._states.put(resident_id, entry)
+        with self._lock:
+            self._pending_states[resident_id] = entry
+            self._maybe_flush()
+
+    def get_state(self, resident_id: str) -> dict | None:
+        return self._states.get(resident_id)
+
+    def snapshot(self) -> StateSnapshot:
+        """Return a read-only view of all latest states."""
+        return self._states.snapshot()
+
+    def record_observation(
+        self,
+        resident_id: str,
+        expected_status: str | None,
+        portal_status: str | None,
+        expected_timestamp: str | None = None,
+        portal_timestamp: str | None = None,
+        latency_sec: float | None = None,
+        ts: float | None = None,
+    ) -> None:
+        """Buffer one comparison of expected and portal status."""
+        row = (
+            resident_id,
+            time.time() if ts is None else ts,
+            expected_status,
+            portal_status,
+            expected_timestamp,
+            portal_timestamp,
+            latency_sec,
+            int(expected_status == portal_status),
+        )
+        with self._lock:
+            self._pending_observations.append(row)
+            self._maybe_flush()
+
+    def _query_observations(self, where: str, params: tuple, limit: int) -> list:
+        with self._lock:
+            self.flush()
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(_OBSERVATION_COLUMNS)} FROM observations "
+                f"WHERE {where} ORDER BY ts DESC LIMIT ?",
+                (*params, limit),
+            )
+            rows = cursor.fetchall()
+        return [
+            {**dict(zip(_OBSERVATION_COLUMNS, row)), "match": bool(row[-1])}
+            for row in rows
+        ]
+
+    def get_observations(self, resident_id: str, limit: int = 100) -> list:
+        """Return the newest observations of a resident, newest first."""
+        return self._query_observations("resident_id = ?", (resident_id,), limit)
+
+    def get_recent_mismatches(self, resident_id: str, limit: int = 10) -> list:
+        """Return the newest mismatching observations of a resident, newest first."""
+        return self._query_observations("resident_id = ? AND match = 0", (resident_id,), limit)
+
+    def close(self) -> None:
+        """Flush pending rows and close the connection."""
+        with self._lock:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(f"Failed to flush state database {self.path}")
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: str) -> SQLiteStateStore:
+    """Return the process-wide store for a database path, opening it once."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SQLiteStateStore(path)
+            _stores[path] = store
+            atexit.register(store.close)
+        return store
@@ -1,43 +1,226 @@
 """State persistence management."""
 
-import json
+import atexit
 import logging
 import os
+import threading
+import time
+from dataclasses import dataclass
+from utils import json_codec
 from utils.time_utils import now_utc_iso
+from services.sqlite_store import get_sqlite_store
+from services.state_store import ShardedStateStore, StateSnapshot
 
 
 logger = logging.getLogger(__name__)
 
-# In-memory state store (can be extended to database in future)
-_state_store = {}
+# Journal entries appended before they are folded into the snapshot file
+STATE_COMPACT_EVERY = int(os.getenv("STATE_COMPACT_EVERY", "1000"))
+# fsync the journal after every append (survives power loss, not just crashes)
+STATE_FSYNC = os.getenv("STATE_FSYNC", "0") == "1"
+# "file": JSON snapshot plus journal, latest state only
+# "sqlite": SQLite database in WAL mode, with observation history
+STATE_BACKEND = os.getenv("STATE_BACKEND", "file").lower()
+STATE_DB_FILE = os.getenv("STATE_DB_FILE", "data/state.db")
+# "immediate": append every update to the journal as it happens
+# "deferred": mark residents dirty; a background thread writes them in batches
+STATE_PERSIST_MODE = os.getenv("STATE_PERSIST_MODE", "immediate").lower()
+# Deferred mode: flush at least this often, or as soon as this many residents are dirty
+STATE_FLUSH_INTERVAL_MS = int(os.getenv("STATE_FLUSH_INTERVAL_MS", "500"))
+STATE_FLUSH_BATCH = int(os.getenv("STATE_FLUSH_BATCH", "256"))
+
+# Process-wide in-memory state store, striped by resident id
+_state_store = ShardedStateStore()
+# Guards the journal handle and entry count; taken after a shard lock, never before
+_journal_lock = threading.Lock()
+# Serializes loading so the snapshot file is only read once
+_load_lock = threading.Lock()
+# Open journal handle, entries since the last compaction, and loaded snapshot path
+_journal = None
+_journal_entries = 0
+_loaded_file = None
+# Residents changed since the last deferred flush
+_dirty = set()
+_dirty_lock = threading.Lock()
+# Serializes flushes and compactions; always taken before any shard lock
+_flush_lock = threading.RLock()
+
+
+@dataclass
+class FlushStats:
+    """Counters for deferred state flushes."""
+    saves: int = 0
+    flushes: int = 0
+    entries: int = 0
+    total_seconds: float = 0.0
+    last_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.flushes if self.flushes else 0.0
+
+    @property
+    def coalesced(self) -> int:
+        """Saves absorbed by a later save of the same resident before a flush."""
+        return max(0, self.saves - self.entries)
+
+
+_flush_stats = FlushStats()
 
 
 class StateManager:
-    """Manages resident state persistence."""
+    """Manages resident state persistence.
+
+    The snapshot file is only rewritten on compaction. Every update is
+    appended as one JSON line to ``<state_file>.journal``; recovery loads
+    the snapshot and replays the journal on top of it.
+
+    With STATE_BACKEND=sqlite, state and the observation history live in
+    a SQLite database instead; observations are ignored by the file backend.
+
+    All instances share one process-wide store; use get_state_manager()
+    rather than creating one per resident.
+
+    With STATE_PERSIST_MODE=deferred, save_state only updates memory and
+    marks the resident dirty; a StateFlusher thread appends the latest
+    entry of every dirty resident in one write. Call close() on shutdown.
+    """
     
-    def __init__(self, state_file: str = "data/state.json"):
+    def __init__(
+        self,
+        state_file: str = "data/state.json",
+        backend: str = STATE_BACKEND,
+        db_file: str = STATE_DB_FILE,
+        persist_mode: str = STATE_PERSIST_MODE,
+    ):
         """
         Initialize state manager.
         
         Args:
             state_file: Path to state persistence file
+            backend: "file" or "sqlite"
+            db_file: Path to the SQLite database (sqlite backend)
+            persist_mode: "immediate" or "deferred" (file backend)
         """
         self.state_file = state_file
-        self._load_state()
+        self.journal_file = f"{state_file}.journal"
+        self.db = get_sqlite_store(db_file) if backend == "sqlite" else None
+        self.deferred = persist_mode == "deferred" and self.db is None
+        self.flusher = None
+        if self.db is None:
+            self._load_state()
+        if self.deferred:
+            self.flusher = StateFlusher(self)
+            self.flusher.start()
     
     def _load_state(self):
-        """Load state from file if exists."""
-        global _state_store
+        """Load the snapshot and replay the journal, once per state file."""
+        global _journal_entries, _loaded_file
+        with _load_lock:
+            if _loaded_file == self.state_file:
+                return
+            with _journal_lock:
+                self._close_journal()
+            states = {}
+            try:
+                if os.path.exists(self.state_file):
+                    states = json_codec.load(self.state_file)
+                    logger.info(f"Loaded state from {self.state_file}")
+            except Exception:
+                logger.warning(f"Failed to load state file {self.state_file}")
+                states = {}
+
+            _journal_entries, repair = self._replay_journal(states)
+            _state_store.replace_all(states)
+            _loaded_file = self.state_file
+            # Compacting also drops a torn or unterminated tail so new appends start on a clean line
+            if repair or _journal_entries >= STATE_COMPACT_EVERY:
+                self.compact()
+
+    def _replay_journal(self, states: dict) -> tuple:
+        """Apply journal entries to a loaded snapshot.
+
+        Returns:
+            tuple: (entries applied, lines needing repair: corrupt lines skipped,
+                    plus a last record missing its newline)
+        """
+        if not os.path.exists(self.journal_file):
+            return 0, 0
+        applied = 0
+        repair = 0
+        with open(self.journal_file, 'r') as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    entry = json_codec.loads(line)
+                    states[entry["id"]] = {
+                        "status": entry["status"],
+                        "timestamp": entry["timestamp"],
+                    }
+                    applied += 1
+                except (ValueError, KeyError, TypeError):
+                    repair += 1
+                    # A crash mid-append leaves at most one torn line at the end
+                    logger.warning(f"Skipping corrupt journal line {line_no} in {self.journal_file}")
+                    continue
+                if not line.endswith("\n"):
+                    # Complete, but the next append would be joined onto the same line
+                    repair += 1
+        if applied:
+            logger.info(f"Replayed {applied} journal entries from {self.journal_file}")
+        return applied, repair
+
+    def _open_journal(self):
+        global _journal
+        if _journal is None:
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            _journal = open(self.journal_file, 'a', encoding='utf8')
+        return _journal
+
+    @staticmethod
+    def _close_journal():
+        global _journal
+        if _journal is not None:
+            try:
+                _journal.close()
+            except Exception:
+                pass
+            _journal = None
+
+    def compact(self) -> bool:
+        """
+        Fold the journal into a new snapshot.
+
+        The snapshot is written to a temp file and renamed over the old one,
+        then the journal is truncated. A crash in between only means the
+        journal is replayed again, which is harmless.
+
+        Returns:
+            bool: True if compacted successfully
+        """
+        global _journal_entries
         try:
-            if os.path.exists(self.state_file):
-                with open(self.state_file, 'r') as f:
-                    _state_store = json.load(f)
-                logger.info(f"Loaded state from {self.state_file}")
-            else:
-                _state_store = {}
+            # Flush lock, then shard locks, then the journal: the order every writer uses
+            with _flush_lock, _state_store.locked(), _journal_lock:
+                # The snapshot holds every dirty entry, so nothing is left to flush
+                with _dirty_lock:
+                    _dirty.clear()
+                tmp_path = f"{self.state_file}.tmp"
+                os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    f.write(json_codec.dumps(dict(_state_store.snapshot()), pretty=True))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.state_file)
+
+                self._close_journal()
+                open(self.journal_file, 'w').close()
+                _journal_entries = 0
+            logger.debug(f"Compacted state journal into {self.state_file}")
+            return True
         except Exception:
-            logger.warning(f"Failed to load state file {self.state_file}")
-            _state_store = {}
+            logger.exception(f"Failed to compact state file {self.state_file}")
+            return False
     
     def save_state(self, resident_id: str, status: str) -> bool:
         """
@@ -50,19 +233,108 @@ class StateManager:
         Returns:
             bool: True if saved successfully
         """
-        global _state_store
+        global _journal_entries
+        entry = {
+            "status": status,
+            "timestamp": now_utc_iso()
+        }
+        if self.db is not None:
+            try:
+                self.db.save_state(resident_id, entry)
+                return True
+            except Exception:
+                logger.exception(f"Failed to save state for {resident_id}")
+                return False
+        if self.deferred:
+            with _state_store.lock_for(resident_id):
+                _state_store.put(resident_id, entry)
+                with _dirty_lock:
+                    _dirty.add(resident_id)
+                    _flush_stats.saves += 1
+                    batch_full = len(_dirty) >= STATE_FLUSH_BATCH
+            if batch_full:
+                self.flusher.wake()
+            return True
         try:
-            _state_store[resident_id] = {
-                "status": status,
-                "timestamp": now_utc_iso()
-            }
-            with open(self.state_file, 'w') as f:
-                json.dump(_state_store, f, indent=2)
+            # The shard lock keeps journal order equal to memory order per resident
+            with _state_store.lock_for(resident_id):
+                with _journal_lock:
+                    journal = self._open_journal()
+                    journal.write(json_codec.dumps_str({"id": resident_id, **entry}) + "\n")
+                    journal.flush()
+                    if STATE_FSYNC:
+                        os.fsync(journal.fileno())
+                    _journal_entries += 1
+                    compact_due = _journal_entries >= STATE_COMPACT_EVERY
+                _state_store.put(resident_id, entry)
+            # Compaction takes every shard lock, so it must not start while holding one
+            if compact_due:
+                self.compact()
             return True
         except Exception:
             logger.exception(f"Failed to save state for {resident_id}")
             return False
     
+    def flush(self) -> int:
+        """
+        Append the latest entry of every dirty resident in one write.
+
+        Entries that fail to write stay dirty and are retried on the next flush.
+
+        Returns:
+            int: Number of journal entries written
+        """
+        global _journal_entries
+        if self.db is not None:
+            self.db.flush()
+            return 0
+        with _flush_lock:
+            with _dirty_lock:
+                dirty = list(_dirty)
+                _dirty.clear()
+            if not dirty:
+                return 0
+
+            start = time.perf_counter()
+            lines = []
+            for resident_id in dirty:
+                entry = _state_store.get(resident_id)
+                if entry is not None:
+                    lines.append(json_codec.dumps_str({"id": resident_id, **entry}) + "\n")
+            try:
+                with _journal_lock:
+                    journal = self._open_journal()
+                    journal.write("".join(lines))
+                    journal.flush()
+                    if STATE_FSYNC:
+                        os.fsync(journal.fileno())
+                    _journal_entries += len(lines)
+                    compact_due = _journal_entries >= STATE_COMPACT_EVERY
+            except Exception:
+                with _dirty_lock:
+                    _dirty.update(dirty)
+                raise
+            elapsed = time.perf_counter() - start
+
+            with _dirty_lock:
+                _flush_stats.flushes += 1
+                _flush_stats.entries += len(lines)
+                _flush_stats.last_seconds = elapsed
+                _flush_stats.total_seconds += elapsed
+                _flush_stats.max_seconds = max(_flush_stats.max_seconds, elapsed)
+            if compact_due:
+                self.compact()
+            return len(lines)
+
+    def close(self) -> None:
+        """Stop the background flusher and write everything still pending."""
+        if self.flusher is not None:
+            self.flusher.stop()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final state flush failed")
+
     def get_latest_state(self, resident_id: str) -> str:
         """
         Get latest state for resident.
@@ -74,13 +346,137 @@ class StateManager:
         Returns:
             str: Latest status, or None if not found
         """
-        global _state_store
-        if resident_id not in _state_store:
+        if self.db is not None:
+            entry = self.db.get_state(resident_id)
+        else:
+            entry = _state_store.get(resident_id)
+        if entry is None:
             logger.info(f"State not found for {resident_id}, will initialize on next sync")
             return None
-        return _state_store[resident_id].get("status")
+        return entry.get("status")
     
+    def snapshot(self) -> StateSnapshot:
+        """
+        Get a read-only view of all resident states.
+
+        Only shards changed since the previous snapshot are copied.
+
+        Returns:
+            StateSnapshot: Mapping of resident id to {"status", "timestamp"}
+        """
+        if self.db is not None:
+            return self.db.snapshot()
+        return _state_store.snapshot()
+
     def get_all_states(self) -> dict:
-        """Get all resident states."""
-        global _state_store
-        return _state_store.copy()
+        """Get all resident states as a new dict (prefer snapshot())."""
+        return dict(self.snapshot())
+
+    def record_observation(
+        self,
+        resident_id: str,
+        expected_status: str | None,
+        portal_status: str | None,
+        expected_timestamp: str | None = None,
+        portal_timestamp: str | None = None,
+        latency_sec: float | None = None,
+    ) -> bool:
+        """
+        Record one comparison of expected and portal status.
+
+        Returns:
+            bool: True if stored (always False with the file backend)
+        """
+        if self.db is None:
+            return False
+        try:
+            self.db.record_observation(
+                resident_id,
+                expected_status,
+                portal_status,
+                expected_timestamp=expected_timestamp,
+                portal_timestamp=portal_timestamp,
+                latency_sec=latency_sec,
+            )
+            return True
+        except Exception:
+            logger.exception(f"Failed to record observation for {resident_id}")
+            return False
+
+    def get_recent_mismatches(self, resident_id: str, limit: int = 10) -> list:
+        """Return the last mismatching observations of a resident, newest first."""
+        if self.db is None:
+            return []
+        return self.db.get_recent_mismatches(resident_id, limit)
+
+
+class StateFlusher:
+    """Background thread flushing dirty states every interval or full batch."""
+
+    def __init__(self, manager: StateManager, interval_ms: int = STATE_FLUSH_INTERVAL_MS):
+        """
+        Initialize flusher.
+
+        Args:
+            manager: State manager whose flush() is called
+            interval_ms: Longest time between flushes
+        """
+        self.manager = manager
+        self.interval_sec = max(1, interval_ms) / 1000
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="state-flusher", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Flush now instead of waiting for the interval."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.interval_sec)
+            self._wake.clear()
+            try:
+                self.manager.flush()
+            except Exception:
+                logger.exception("Deferred state flush failed")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+
+def get_flush_stats() -> dict:
+    """Return deferred flush counters and timings."""
+    with _dirty_lock:
+        stats = _flush_stats
+        return {
+            "interval_ms": STATE_FLUSH_INTERVAL_MS,
+            "batch": STATE_FLUSH_BATCH,
+            "saves": stats.saves,
+            "flushes": stats.flushes,
+            "entries": stats.entries,
+            "coalesced": stats.coalesced,
+            "dirty": len(_dirty),
+            "avg_seconds": stats.avg_seconds,
+            "last_seconds": stats.last_seconds,
+            "max_seconds": stats.max_seconds,
+        }
+
+
+_state_manager: StateManager | None = None
+_state_manager_lock = threading.Lock()
+
+
+def get_state_manager() -> StateManager:
+    """Return the process-wide state manager, loading state on first use."""
+    global _state_manager
+    with _state_manager_lock:
+        if _state_manager is None:
+            _state_manager = StateManager()
+            atexit.register(_state_manager.close)
+        return _state_manager
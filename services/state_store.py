@@ -0,0 +1,115 @@
+"""Lock-striped in-memory store for the latest resident states."""
+
+import os
+import threading
+from collections.abc import Mapping
+from contextlib import ExitStack, contextmanager
+
+
+# Number of independently locked shards (residents are spread by id hash)
+STATE_SHARDS = int(os.getenv("STATE_SHARDS", "16"))
+
+
+class _Shard:
+    """One stripe of the store with its own lock and snapshot cache."""
+
+    __slots__ = ("lock", "data", "version", "frozen", "frozen_version")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data = {}
+        self.version = 0
+        self.frozen = {}
+        self.frozen_version = 0
+
+
+class StateSnapshot(Mapping):
+    """Read-only view over frozen shard copies, taken by ShardedStateStore.snapshot()."""
+
+    __slots__ = ("_shards",)
+
+    def __init__(self, shards: tuple):
+        self._shards = shards
+
+    def __getitem__(self, key):
+        return self._shards[hash(key) % len(self._shards)][key]
+
+    def __iter__(self):
+        for shard in self._shards:
+            yield from shard
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+
+class ShardedStateStore:
+    """Latest state per resident, striped over shards by resident id.
+
+    Writers only lock the shard owning their resident, so concurrent
+    syncs of different residents rarely contend. snapshot() is
+    copy-on-write: a shard is only copied again if it changed since the
+    previous snapshot.
+    """
+
+    def __init__(self, shards: int = STATE_SHARDS):
+        """
+        Initialize sharded store.
+
+        Args:
+            shards: Number of lock stripes
+        """
+        self._shards = tuple(_Shard() for _ in range(max(1, shards)))
+
+    def _shard(self, key) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def lock_for(self, key) -> threading.RLock:
+        """Return the lock of the shard owning key."""
+        return self._shard(key).lock
+
+    def get(self, key, default=None):
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.data.get(key, default)
+
+    def put(self, key, value) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.data[key] = value
+            shard.version += 1
+
+    @contextmanager
+    def locked(self):
+        """Hold every shard lock, always taken in the same order."""
+        with ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(shard.lock)
+            yield self
+
+    def replace_all(self, data: dict) -> None:
+        """Replace the whole content, e.g. after loading from disk."""
+        with self.locked():
+            for shard in self._shards:
+                shard.data = {}
+                shard.version += 1
+            for key, value in data.items():
+                self._shard(key).data[key] = value
+
+    def snapshot(self) -> StateSnapshot:
+        """
+        Return a consistent-per-shard, read-only view of all states.
+
+        Returns:
+            StateSnapshot: Mapping of resident id to state entry
+        """
+        frozen = []
+        for shard in self._shards:
+            with shard.lock:
+                if shard.frozen_version != shard.version:
+                    shard.frozen = shard.data.copy()
+                    shard.frozen_version = shard.version
+                frozen.append(shard.frozen)
+        return StateSnapshot(tuple(frozen))
+
+    def __len__(self):
+        return sum(len(shard.data) for shard in self._shards)
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+# Importing the services package loads core.portal, which requires credentials
+os.environ.setdefault("PORTAL_USERNAME", "test")
+os.environ.setdefault("PORTAL_PASSWORD", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeStateManager:
+    """In-memory stand-in for StateManager, without files or threads."""
+
+    def __init__(self):
+        self.states = {}
+        self.observations = []
+
+    def get_latest_state(self, resident_id):
+        return self.states.get(resident_id)
+
+    def save_state(self, resident_id, status):
+        self.states[resident_id] = status
+        return True
+
+    def record_observation(self, resident_id, expected, actual, **details):
+        self.observations.append((resident_id, expected, actual))
+
+
+@pytest.fixture
+def make_monitor(monkeypatch):
+    """Build ResidentMonitors on a private ResidentTable and FakeStateManager."""
+    from models.resident_table import ResidentTable
+    from services import resident_monitor
+
+    state_manager = FakeStateManager()
+    monkeypatch.setattr(resident_monitor, "get_state_manager", lambda: state_manager)
+    monkeypatch.setattr(resident_monitor, "load_payload_template", lambda path: {})
+
+    def make(resident_id="CG0001", window=20, interval_sec=60):
+        return resident_monitor.ResidentMonitor(resident_id, interval_sec, table=ResidentTable(window))
+
+    make.state_manager = state_manager
+    return make
@@ -0,0 +1,103 @@
+"""Alert and recovery decisions of ResidentMonitor.evaluate()."""
+
+import math
+
+import pytest
+
+from models.resident_table import ResidentTable
+from services import resident_monitor
+from services.resident_monitor import NOTIFY_ALERT, NOTIFY_RECOVERY
+
+EXPECTED = "S_PRESENT_BED"
+
+# Rules: MISMATCH_THRESHOLD, RECOVERY_THRESHOLD, ALERT_WINDOW_FAILURES,
+#        ALERT_FAILURE_RATE, ALERT_MIN_SAMPLES, window size
+STREAK = dict(streak=3, recovery=3, failures=0, rate=0, min_samples=10, window=20)
+
+# (name, rules, outcomes: M = mismatch / . = match, {index: action})
+# Window rules are checked on mismatches only
+CASES = [
+    ("streak fires", STREAK, "MMM", {2: NOTIFY_ALERT}),
+    ("broken streak", STREAK, "MM.MM", {}),
+    ("alert once per incident", STREAK, "MMMMMM", {2: NOTIFY_ALERT}),
+    ("recovery after alert", STREAK, "MMM...", {2: NOTIFY_ALERT, 5: NOTIFY_RECOVERY}),
+    ("recovery streak reset by mismatch", STREAK, "MMM..M...", {2: NOTIFY_ALERT, 8: NOTIFY_RECOVERY}),
+    ("no recovery without alert", STREAK, "MM......", {}),
+    ("pause blocks the next alert", dict(STREAK, recovery=1), "MMM.MMM", {2: NOTIFY_ALERT, 3: NOTIFY_RECOVERY}),
+    ("k of n", dict(STREAK, streak=10, failures=3, window=5), "M.M.M", {4: NOTIFY_ALERT}),
+    ("k of n evicts old failures", dict(STREAK, streak=10, failures=3, window=5), "M..M...M..M", {}),
+    ("k of n above window is clamped", dict(STREAK, streak=10, failures=9, window=4), "M.MMMM", {5: NOTIFY_ALERT}),
+    ("rate waits for min samples", dict(STREAK, streak=10, rate=0.5, min_samples=4), "M.M.M", {4: NOTIFY_ALERT}),
+    ("rate below threshold", dict(STREAK, streak=10, rate=0.5, min_samples=4), "M...M...M..", {}),
+    ("min samples above window", dict(STREAK, streak=10, rate=0.6, min_samples=10, window=5),
+     "MM.MM", {4: NOTIFY_ALERT}),
+    ("recovery waits for window rule", dict(STREAK, streak=10, recovery=2, failures=2, window=5),
+     "MM.....", {1: NOTIFY_ALERT, 5: NOTIFY_RECOVERY}),
+]
+
+
+@pytest.fixture
+def run(make_monitor, monkeypatch):
+    def run(rules, outcomes):
+        monkeypatch.setattr(resident_monitor, "MISMATCH_THRESHOLD", rules["streak"])
+        monkeypatch.setattr(resident_monitor, "RECOVERY_THRESHOLD", rules["recovery"])
+        monkeypatch.setattr(resident_monitor, "ALERT_WINDOW_FAILURES", rules["failures"])
+        monkeypatch.setattr(resident_monitor, "ALERT_FAILURE_RATE", rules["rate"])
+        monkeypatch.setattr(resident_monitor, "ALERT_MIN_SAMPLES", rules["min_samples"])
+        monitor = make_monitor(window=rules["window"])
+        make_monitor.state_manager.states[monitor.resident_id] = EXPECTED
+        actions = {}
+        for index, outcome in enumerate(outcomes):
+            action = monitor.evaluate("S_ABSENT" if outcome == "M" else EXPECTED)
+            if action is not None:
+                actions[index] = action
+        return monitor, actions
+    return run
+
+
+@pytest.mark.parametrize("name, rules, outcomes, expected", CASES, ids=[case[0] for case in CASES])
+def test_alert_and_recovery(run, name, rules, outcomes, expected):
+    monitor, actions = run(rules, outcomes)
+    assert actions == expected
+    assert monitor.window_count == min(len(outcomes), rules["window"])
+    assert monitor.window_failures == outcomes[-rules["window"]:].count("M")
+
+
+def test_first_observation_only_initializes(make_monitor):
+    monitor = make_monitor()
+    assert monitor.evaluate("S_ABSENT") is None
+    assert make_monitor.state_manager.states[monitor.resident_id] == "S_ABSENT"
+    assert monitor.window_count == 0
+
+
+def test_ring_wraparound():
+    table = ResidentTable(window=3)
+    other = table.add("CG0002")
+    slot = table.add("CG0001")
+    view = table.view("CG0001")
+    outcomes = [(True, 1.0), (False, None), (True, 3.0), (False, 4.0), (True, None), (False, 6.0), (False, 7.0)]
+    for index, (failed, latency) in enumerate(outcomes):
+        table.record_outcome(slot, failed, latency)
+        window = outcomes[max(0, index - 2):index + 1]
+        assert table.recent_outcomes(slot) == window
+        assert view.window_count == len(window)
+        assert view.window_failures == sum(failed for failed, _ in window)
+        latencies = [latency for _, latency in window if latency is not None]
+        if latencies:
+            assert view.window_avg_latency == pytest.approx(sum(latencies) / len(latencies))
+        else:
+            assert view.window_avg_latency is None
+    # The neighbouring slot's ring is untouched
+    assert table.recent_outcomes(other) == []
+    assert all(math.isnan(value) for value in table.latencies[:3])
+
+
+def test_readding_resets_the_ring():
+    table = ResidentTable(window=3)
+    slot = table.add("CG0001")
+    for _ in range(4):
+        table.record_outcome(slot, True, 2.0)
+    assert table.add("CG0001") == slot
+    view = table.view("CG0001")
+    assert (view.window_count, view.window_failures, view.window_avg_latency) == (0, 0, None)
+    assert table.recent_outcomes(slot) == []
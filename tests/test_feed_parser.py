@@ -0,0 +1,128 @@
+"""Selective streaming parser for the notifications feed."""
+
+import json
+
+import pytest
+
+from utils.feed_parser import FeedStreamParser, parse_feed
+from utils.json_utils import extract_resident
+
+
+def notification(status, timestamp, **extra):
+    return json.dumps({"Resident": {"Status": status, "Timestamp": timestamp}, "Timestamp": timestamp, **extra})
+
+
+FEED = {
+    # Skipped: escaped quotes, backslashes and braces inside strings
+    'CG"01': {"notification": notification("S_ABSENT", "t0", Note='say "hi" \\ {not} [an] object}')},
+    # Skipped: nested objects and arrays, scalars of every kind
+    "CG0002": {
+        "notification": notification("S_PRESENT_ROOM", "t1"),
+        "history": [[1, 2.5e-3, -7], {"a": {"b": [True, False, None]}}, [], {}],
+        "meta": {"room": "Zimmer Bär }]", "flags": [{"x": "\\\\"}]},
+        "count": 12345,
+        "ok": True,
+        "gone": None,
+    },
+    "CG0003": {"notification": notification("S_PRESENT_BED", "2026-10-18T12:00:00.000Z", Name="Jürgen \\ \"B\"")},
+    "CG0004": {"notification": notification("S_PRESENT_BATHROOM", "t4"), "tail": [{"deep": [[[{}]]]}]},
+}
+BODY = json.dumps(FEED, ensure_ascii=False, indent=1).encode("utf-8")
+WANTED = ["CG0003", "CG0004"]
+
+
+def expected(sensor_id, feed=FEED):
+    return extract_resident(feed, sensor_id)
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_whole_body():
+    result = parse_feed([BODY], WANTED)
+    assert set(result) == set(WANTED)
+    for sensor_id in WANTED:
+        assert extract_resident(result, sensor_id) == expected(sensor_id)
+
+
+def test_split_at_every_offset():
+    for offset in range(len(BODY) + 1):
+        result = parse_feed([BODY[:offset], BODY[offset:]], WANTED)
+        for sensor_id in WANTED:
+            assert extract_resident(result, sensor_id) == expected(sensor_id), offset
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_small_chunks(size):
+    result = parse_feed(chunked(BODY, size), WANTED)
+    for sensor_id in WANTED:
+        assert extract_resident(result, sensor_id) == expected(sensor_id)
+
+
+def test_escaped_key_is_matched():
+    sensor_id = 'CG"01'
+    result = parse_feed(chunked(BODY, 5), [sensor_id])
+    assert extract_resident(result, sensor_id) == expected(sensor_id)
+
+
+def test_skipped_members_are_not_decoded():
+    parser = FeedStreamParser(["CG0004"])
+    for chunk in chunked(BODY, 16):
+        parser.feed(chunk)
+    parser.close()
+    assert parser.skipped == 3
+
+
+def test_stops_reading_once_found():
+    parser = FeedStreamParser(["CG0002"])
+    chunks = iter(chunked(BODY, 32))
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    assert next(chunks, None) is not None
+    assert extract_resident(parser.close(), "CG0002") == expected("CG0002")
+
+
+def test_missing_sensor_raises_like_full_parse():
+    result = parse_feed(chunked(BODY, 9), ["CG9999"])
+    assert result == {}
+    with pytest.raises(KeyError) as streamed:
+        extract_resident(result, "CG9999")
+    with pytest.raises(KeyError) as full:
+        extract_resident(json.loads(BODY), "CG9999")
+    assert str(streamed.value) == str(full.value)
+
+
+def test_undecodable_entry_raises_like_full_parse():
+    feed = {"CG0001": {"notification": "{not json"}, "CG0002": {"other": 1}}
+    body = json.dumps(feed).encode()
+    result = parse_feed(chunked(body, 4), ["CG0001", "CG0002"])
+    for sensor_id in feed:
+        with pytest.raises(ValueError) as streamed:
+            extract_resident(result, sensor_id)
+        with pytest.raises(ValueError) as full:
+            extract_resident(feed, sensor_id)
+        assert str(streamed.value) == str(full.value)
+
+
+def test_truncated_body_raises():
+    # Every cut before the last wanted member is complete
+    end = BODY.index(b'"CG0004"')
+    end = end + BODY[end:].index(b"]\n }") + len(b"]\n }")
+    for offset in range(end):
+        with pytest.raises(ValueError):
+            parse_feed(chunked(BODY[:offset], 8), WANTED)
+
+
+def test_truncated_after_all_found_is_accepted():
+    cut = BODY.index(b'"CG0004"')
+    result = parse_feed([BODY[:cut]], ["CG0003"])
+    assert extract_resident(result, "CG0003") == expected("CG0003")
+
+
+@pytest.mark.parametrize("body", [b"[]", b'{"CG0001" 1}', b'{"CG0001": 1 "CG0002": 2}', b"{CG0001: 1}"])
+def test_malformed_body_raises(body):
+    with pytest.raises(ValueError):
+        parse_feed([body], ["CG0002"])
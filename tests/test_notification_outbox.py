@@ -0,0 +1,183 @@
+"""Durable notification outbox: persistence, replay, priority and rate limit."""
+
+import smtplib
+import threading
+import time
+
+import pytest
+
+from services.notification_service import (
+    KIND_ALERT,
+    KIND_RECOVERY,
+    Notification,
+    NotificationOutbox,
+    SmtpConnection,
+    TokenBucket,
+)
+from services.outbox_store import OutboxStore
+
+
+class RecordingConnection(SmtpConnection):
+    """SmtpConnection that records subjects instead of talking to a server."""
+
+    def __init__(self, fail: bool = False):
+        super().__init__(idle_timeout=60)
+        self.fail = fail
+        self.subjects = []
+
+    def send(self, config, msg):
+        if self.fail:
+            raise smtplib.SMTPServerDisconnected("connection unexpectedly closed")
+        self.subjects.append(msg["Subject"])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def smtp_env(monkeypatch):
+    monkeypatch.setenv("EMAIL_SENDER", "monitor@example.com")
+    monkeypatch.setenv("EMAIL_PASSWORD", "secret")
+    monkeypatch.setenv("EMAIL_RECIPIENTS", "ops@example.com")
+    monkeypatch.setenv("SMTP_SERVER", "smtp.example.com")
+
+
+def make_outbox(connection, store=None, bucket=None):
+    return NotificationOutbox(
+        connection=connection,
+        digest_window=0,
+        store=store,
+        bucket=bucket or TokenBucket(rate_per_min=0),
+    )
+
+
+def test_failed_send_stays_in_store(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = make_outbox(RecordingConnection(fail=True), store=OutboxStore(path))
+    outbox.start()
+    assert outbox.enqueue(Notification(KIND_ALERT, "CG0001", 10))
+    outbox.close(timeout=5)
+
+    assert outbox.get_stats()["failed"] == 1
+    store = OutboxStore(path)
+    rows = store.pending()
+    store.close()
+    assert len(rows) == 1
+    assert rows[0]["kind"] == KIND_ALERT
+    assert rows[0]["resident_id"] == "CG0001"
+    assert rows[0]["attempts"] == 1
+
+
+def test_unsent_rows_are_replayed_on_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    # A previous run persisted these and stopped before sending them
+    store = OutboxStore(path)
+    store.add(KIND_RECOVERY, "CG0002", priority=1)
+    store.add(KIND_ALERT, "CG0001", priority=0, mismatch_count=10)
+    store.close()
+
+    connection = RecordingConnection()
+    outbox = make_outbox(connection, store=OutboxStore(path))
+    outbox.start()
+    outbox.close(timeout=5)
+
+    stats = outbox.get_stats()
+    assert stats["replayed"] == 2
+    assert stats["sent"] == 2
+    assert "Alert" in connection.subjects[0]
+    assert "Recovery" in connection.subjects[1]
+    store = OutboxStore(path)
+    assert store.pending_count() == 0
+    store.close()
+
+
+def test_alerts_are_sent_before_recoveries():
+    connection = RecordingConnection()
+    outbox = make_outbox(connection)
+    # Queue before the worker starts so the priority order decides
+    outbox.enqueue(Notification(KIND_RECOVERY, "CG0001"))
+    outbox.enqueue(Notification(KIND_RECOVERY, "CG0002"))
+    outbox.enqueue(Notification(KIND_ALERT, "CG0003", 10))
+    outbox.start()
+    outbox.close(timeout=5)
+
+    assert len(connection.subjects) == 3
+    assert "Alert" in connection.subjects[0]
+    assert all("Recovery" in subject for subject in connection.subjects[1:])
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate_per_min=60, burst=2)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert 0 < bucket.take() <= 1.0
+    assert TokenBucket(rate_per_min=0, burst=1).take() == 0
+
+
+def test_outbox_sends_are_throttled():
+    connection = RecordingConnection()
+    # One token up front, then one every 0.1 s
+    outbox = make_outbox(connection, bucket=TokenBucket(rate_per_min=600, burst=1))
+    for i in range(3):
+        outbox.enqueue(Notification(KIND_ALERT, f"CG000{i}", 10))
+    started = time.monotonic()
+    outbox.start()
+    outbox.close(timeout=5)
+    elapsed = time.monotonic() - started
+
+    stats = outbox.get_stats()
+    assert stats["sent"] == 3
+    assert stats["throttled_seconds"] >= 0.15
+    assert elapsed >= 0.15
+
+
+class RacingStore(OutboxStore):
+    """Runs the worker's refill on another thread right after each insert commits."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.outbox = None
+        self.refills = []
+
+    def add(self, *args, **kwargs):
+        row_id = super().add(*args, **kwargs)
+        refill = threading.Thread(target=self.outbox._refill)
+        refill.start()
+        # Give the refill time to read the committed row before enqueue continues
+        refill.join(0.2)
+        self.refills.append(refill)
+        return row_id
+
+
+def test_refill_during_enqueue_does_not_queue_twice(tmp_path):
+    store = RacingStore(str(tmp_path / "outbox.db"))
+    connection = RecordingConnection()
+    outbox = make_outbox(connection, store=store)
+    store.outbox = outbox
+
+    assert outbox.enqueue(Notification(KIND_ALERT, "CG0001", 10))
+    for refill in store.refills:
+        refill.join(5)
+    assert outbox.depth() == 1
+
+    outbox.start()
+    outbox.close(timeout=5)
+    assert connection.subjects == [connection.subjects[0]]
+    assert outbox.get_stats()["sent"] == 1
+
+
+def test_already_sent_row_is_skipped(tmp_path):
+    store = OutboxStore(str(tmp_path / "outbox.db"))
+    connection = RecordingConnection()
+    outbox = make_outbox(connection, store=store)
+    notification = Notification(KIND_ALERT, "CG0001", 10)
+    assert outbox.enqueue(notification)
+    # A second queued copy of the same row, e.g. from a replay
+    outbox._put(Notification(KIND_ALERT, "CG0001", 10, outbox_id=notification.outbox_id))
+
+    outbox.start()
+    outbox.close(timeout=5)
+    stats = outbox.get_stats()
+    assert len(connection.subjects) == 1
+    assert stats["sent"] == 1
+    assert stats["duplicates"] == 1
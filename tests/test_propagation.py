@@ -0,0 +1,89 @@
+"""Poll-mode propagation checks against portal feed snapshots."""
+
+import time
+
+import pytest
+
+from services import resident_monitor
+
+UPLOADED_AT = "2026-10-18T12:00:00.250Z"
+
+
+def feed(status, timestamp, resident_id="CG0001"):
+    return {resident_id: {"Resident": {"Status": status, "Timestamp": timestamp}}}
+
+
+@pytest.fixture
+def monitor(make_monitor):
+    monitor = make_monitor()
+    monitor.uploaded_at = time.monotonic()
+    monitor.expected_status = "S_PRESENT_BED"
+    monitor.expected_timestamp = UPLOADED_AT
+    return monitor
+
+
+@pytest.mark.parametrize("timestamp", [
+    UPLOADED_AT,
+    "2026-10-18T12:00:00.25+00:00",
+    "2026-10-18T14:00:01+02:00",
+    "2026-10-18T12:00:00",
+    # Portal clock slightly behind ours, within PROPAGATION_CLOCK_SKEW
+    "2026-10-18T11:59:59.500Z",
+    # Not comparable: the uploaded status in a newer snapshot is enough
+    "18.10.2026 12:00",
+    None,
+])
+def test_upload_is_seen(monitor, timestamp):
+    assert monitor.check_propagation(feed("S_PRESENT_BED", timestamp), monitor.uploaded_at + 1.5)
+    assert monitor.last_propagation_sec == pytest.approx(1.5)
+    assert len(monitor.propagation_samples) == 1
+
+
+@pytest.mark.parametrize("status, timestamp", [
+    # The previous upload with the same status
+    ("S_PRESENT_BED", "2026-10-18T11:59:00.000Z"),
+    ("S_ABSENT", UPLOADED_AT),
+])
+def test_stale_snapshot_is_not_seen(monitor, status, timestamp):
+    assert not monitor.check_propagation(feed(status, timestamp), monitor.uploaded_at + 1)
+    assert monitor.last_propagation_sec is None
+
+
+def test_missing_resident_is_not_seen(monitor):
+    assert not monitor.check_propagation(feed("S_PRESENT_BED", UPLOADED_AT, "CG0002"), monitor.uploaded_at)
+
+
+class StaleFeedCache:
+    def __init__(self, api_data):
+        self.api_data = api_data
+        self.calls = []
+
+    def get(self, session, not_before=None):
+        self.calls.append(not_before)
+        return self.api_data
+
+
+def test_poll_times_out_at_deadline(monitor, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(resident_monitor.time, "sleep", sleeps.append)
+    monitor.propagation_mode = "poll"
+    monitor.propagation_deadline_sec = 3
+    stale = feed("S_PRESENT_BED", "2026-10-18T11:00:00Z")
+    cache = StaleFeedCache(stale)
+
+    assert monitor.wait_for_propagation(session=None, feed_cache=cache) is stale
+    assert sum(sleeps) == pytest.approx(3)
+    assert len(cache.calls) == len(sleeps) > 1
+    assert monitor.propagation_timeouts == 1
+    assert monitor.last_propagation_sec is None
+
+
+def test_poll_stops_once_seen(monitor, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(resident_monitor.time, "sleep", sleeps.append)
+    monitor.propagation_mode = "poll"
+    cache = StaleFeedCache(feed("S_PRESENT_BED", "2026-10-18T12:00:01Z"))
+
+    monitor.wait_for_propagation(session=None, feed_cache=cache)
+    assert len(cache.calls) == 1
+    assert monitor.propagation_timeouts == 0
@@ -0,0 +1,155 @@
+"""DeadlineScheduler timing with an injected clock."""
+
+import pytest
+
+from core.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def exact(clock, **kwargs):
+    return DeadlineScheduler(jitter=0, late_tolerance=1.0, clock=clock, **kwargs)
+
+
+def test_runs_on_the_interval_grid(clock):
+    scheduler = exact(clock)
+    scheduler.add("a", 10)
+    scheduler.add("b", 15, first_due=5)
+
+    assert scheduler.pop_due() == ["a"]
+    assert scheduler.next_due() == 5
+    clock.now = 5
+    assert scheduler.pop_due() == ["b"]
+    clock.now = 9.9
+    assert scheduler.pop_due() == []
+    assert scheduler.time_until_next() == pytest.approx(0.1)
+    clock.now = 10
+    assert scheduler.pop_due() == ["a"]
+    clock.now = 20
+    assert sorted(scheduler.pop_due()) == ["a", "b"]
+    assert scheduler.next_due() == 30
+
+    stats = scheduler.get_stats("a")
+    assert (stats.runs, stats.late_runs, stats.skipped_runs) == (3, 0, 0)
+
+
+def test_overrun_skips_missed_slots_and_realigns(clock):
+    scheduler = exact(clock)
+    scheduler.add("a", 10)
+    assert scheduler.pop_due() == ["a"]
+
+    # The previous run (or the whole loop) stalled until t=35
+    clock.now = 35
+    assert scheduler.pop_due() == ["a"]
+    stats = scheduler.get_stats("a")
+    assert stats.skipped_runs == 2
+    assert stats.late_runs == 1
+    assert stats.last_lateness == pytest.approx(25)
+    assert stats.max_lateness == pytest.approx(25)
+    assert stats.last_drift == pytest.approx(25)
+    # Back on the original grid, not 35 + 10
+    assert scheduler.next_due() == 40
+
+    clock.now = 40.5
+    assert scheduler.pop_due() == ["a"]
+    stats = scheduler.get_stats("a")
+    assert stats.skipped_runs == 2
+    assert stats.late_runs == 1
+    assert stats.last_lateness == pytest.approx(0.5)
+    assert stats.avg_lateness == pytest.approx(25.5 / 3)
+    assert scheduler.next_due() == 50
+
+
+def test_lateness_within_tolerance_is_not_late(clock):
+    scheduler = exact(clock)
+    scheduler.add("a", 10)
+    clock.now = 0.9
+    scheduler.pop_due()
+    clock.now = 11.5
+    scheduler.pop_due()
+    stats = scheduler.get_stats("a")
+    assert stats.runs == 2
+    assert stats.late_runs == 1
+    assert stats.skipped_runs == 0
+
+
+def test_jitter_stays_within_bounds_and_does_not_accumulate(clock):
+    interval, jitter = 10.0, 0.2
+    scheduler = DeadlineScheduler(jitter=jitter, clock=clock)
+    keys = [f"r{i}" for i in range(200)]
+    for key in keys:
+        scheduler.add(key, interval)
+
+    for slot in range(50):
+        grid = slot * interval
+        dues = sorted(entry[0] for entry in scheduler._entries.values())
+        assert all(grid <= due <= grid + interval * jitter for due in dues), slot
+        # Residents with the same interval do not fire together
+        assert len(set(dues)) == len(keys)
+        clock.now = grid + interval * jitter
+        assert sorted(scheduler.pop_due()) == sorted(keys)
+
+    assert all(scheduler.get_stats(key).skipped_runs == 0 for key in keys)
+
+
+def test_removed_resident_is_dropped_lazily(clock):
+    scheduler = exact(clock)
+    scheduler.add("a", 10)
+    scheduler.add("b", 10, first_due=2)
+    scheduler.remove("a")
+    scheduler.remove("missing")
+
+    assert len(scheduler) == 1
+    assert scheduler.get_stats("a") is None
+    assert scheduler.next_due() == 2
+    clock.now = 2
+    assert scheduler.pop_due() == ["b"]
+
+
+def test_readded_resident_only_uses_its_new_entry(clock):
+    scheduler = exact(clock)
+    scheduler.add("a", 10)
+    assert scheduler.pop_due() == ["a"]
+    old = scheduler.get_stats("a")
+
+    scheduler.remove("a")
+    clock.now = 3
+    scheduler.add("a", 4)
+    assert scheduler.get_stats("a") is not old
+    assert scheduler.get_stats("a").runs == 0
+    assert len(scheduler) == 1
+
+    assert scheduler.pop_due() == ["a"]
+    # The stale entry from the first add (due at 10) never fires
+    fired = []
+    for now in (7, 10, 11):
+        clock.now = now
+        fired += scheduler.pop_due()
+    assert fired == ["a", "a"]
+    assert scheduler.get_stats("a").runs == 3
+    assert scheduler.next_due() == 15
+
+
+def test_empty_scheduler(clock):
+    scheduler = exact(clock)
+    assert scheduler.next_due() is None
+    assert scheduler.time_until_next() is None
+    assert scheduler.pop_due() == []
+    scheduler.add("a", 10, first_due=-5)
+    assert scheduler.time_until_next() == 0
+
+
+def test_interval_must_be_positive(clock):
+    with pytest.raises(ValueError):
+        exact(clock).add("a", 0)
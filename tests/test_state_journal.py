@@ -0,0 +1,127 @@
+"""Crash recovery of the JSON snapshot plus state journal."""
+
+import os
+import threading
+
+import pytest
+
+from services import state_manager as sm
+from services.state_store import ShardedStateStore
+
+
+@pytest.fixture
+def restart(monkeypatch, tmp_path):
+    """Return a function that simulates a process start on one state file."""
+    path = str(tmp_path / "state.json")
+    monkeypatch.setattr(sm, "_journal", None)
+    monkeypatch.setattr(sm, "_journal_entries", 0)
+    monkeypatch.setattr(sm, "_dirty", set())
+
+    def start(persist_mode="immediate"):
+        sm.StateManager._close_journal()
+        monkeypatch.setattr(sm, "_state_store", ShardedStateStore())
+        monkeypatch.setattr(sm, "_loaded_file", None)
+        return sm.StateManager(path, backend="file", persist_mode=persist_mode)
+
+    start.path = path
+    yield start
+    sm.StateManager._close_journal()
+
+
+def statuses(manager):
+    return {resident_id: entry["status"] for resident_id, entry in manager.snapshot().items()}
+
+
+def test_journal_is_replayed_on_top_of_snapshot(restart):
+    manager = restart()
+    manager.save_state("CG0001", "S_ABSENT")
+    manager.save_state("CG0002", "S_PRESENT_BED")
+    assert manager.compact()
+    manager.save_state("CG0002", "S_PRESENT_ROOM")
+    manager.save_state("CG0003", "S_PRESENT_BATHROOM")
+
+    assert statuses(restart()) == {
+        "CG0001": "S_ABSENT",
+        "CG0002": "S_PRESENT_ROOM",
+        "CG0003": "S_PRESENT_BATHROOM",
+    }
+
+
+def test_torn_last_record_is_skipped_at_every_offset(restart):
+    manager = restart()
+    expected = {}
+    for i in range(5):
+        resident_id, status = f"CG000{i % 3}", f"S_{i}"
+        manager.save_state(resident_id, status)
+        expected[resident_id] = status
+    sm.StateManager._close_journal()
+    with open(manager.journal_file, "rb") as f:
+        journal = f.read()
+    lines = journal.splitlines(keepends=True)
+    complete, last = b"".join(lines[:-1]), lines[-1]
+
+    # State from every complete record; the last one is the 5th save, of CG0001
+    before_last = {"CG0000": "S_3", "CG0001": "S_1", "CG0002": "S_2"}
+    for cut in range(len(last)):
+        with open(manager.journal_file, "wb") as f:
+            f.write(complete + last[:cut])
+        # Only the newline missing: the record itself is complete
+        want = expected if cut == len(last) - 1 else before_last
+        recovered = restart()
+        assert statuses(recovered) == want, cut
+        # Loading compacted the tail away, so a new append is not joined onto it
+        recovered.save_state("CG0009", "S_NEW")
+        assert statuses(restart()) == {**want, "CG0009": "S_NEW"}, cut
+        # Start the next cut from the journal alone
+        if os.path.exists(recovered.state_file):
+            os.remove(recovered.state_file)
+
+    with open(manager.journal_file, "wb") as f:
+        f.write(journal)
+    assert statuses(restart()) == expected
+
+
+def test_crash_between_snapshot_and_truncate_replays_harmlessly(restart):
+    manager = restart()
+    for i in range(4):
+        manager.save_state(f"CG000{i % 2}", f"S_{i}")
+    sm.StateManager._close_journal()
+    with open(manager.journal_file, "rb") as f:
+        journal = f.read()
+    assert manager.compact()
+    # The snapshot was renamed into place but the journal was never truncated
+    with open(manager.journal_file, "wb") as f:
+        f.write(journal)
+
+    assert statuses(restart()) == {"CG0000": "S_2", "CG0001": "S_3"}
+
+
+def test_compaction_while_saving_loses_nothing(restart, monkeypatch):
+    monkeypatch.setattr(sm, "STATE_COMPACT_EVERY", 7)
+    manager = restart()
+    writers, saves = 4, 200
+
+    def write(worker):
+        for i in range(saves):
+            manager.save_state(f"CG{worker}{i % 5}", f"S_{i}")
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    for _ in range(20):
+        manager.compact()
+    for thread in threads:
+        thread.join()
+
+    expected = {f"CG{w}{r}": f"S_{saves - 5 + r}" for w in range(writers) for r in range(5)}
+    assert statuses(manager) == expected
+    assert statuses(restart()) == expected
+
+
+def test_deferred_saves_survive_close(restart):
+    manager = restart(persist_mode="deferred")
+    for i in range(10):
+        manager.save_state(f"CG000{i % 3}", f"S_{i}")
+    manager.close()
+
+    assert statuses(restart()) == {"CG0000": "S_9", "CG0001": "S_7", "CG0002": "S_8"}
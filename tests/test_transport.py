@@ -0,0 +1,57 @@
+"""Shared pooled transport across portal sessions."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.portal import create_authenticated_session
+from core.transport import create_session, get_pooled_adapter, get_transport_stats
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    KeepAliveHandler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_sessions_share_one_adapter():
+    first, second = create_session(), create_session()
+    assert first.get_adapter("https://portal.example/") is get_pooled_adapter()
+    assert second.get_adapter("http://webdav.example/") is get_pooled_adapter()
+
+
+def test_relogin_reuses_pooled_connection(server):
+    assert server not in get_transport_stats()
+
+    for login in range(3):
+        session = create_authenticated_session([{"name": "JSESSIONID", "value": f"login-{login}"}])
+        assert session.get(f"{server}/feed").json() == {"ok": True}
+
+    assert len(KeepAliveHandler.connections) == 1
+    stats = get_transport_stats()[server]
+    assert stats["connections"] == 1
+    assert stats["requests"] == 3
+    assert stats["reused"] == 2
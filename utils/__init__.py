@@ -2,18 +2,29 @@
 
 from .json_utils import (
     manipulate_sensor_json,
+    load_payload_template,
+    build_sensor_payload,
+    extract_resident,
     extract_resident_status,
     random_vital_signs,
     file_checksum,
-    get_resident_status_from_file
+    get_resident_status_from_file,
+    get_resident_from_file
 )
 from .time_utils import now_utc_iso
-from .webdav_utils import list_directory
+from .webdav_utils import list_directory, scan_directory, find_stale_residents
 
 __all__ = [
     "manipulate_sensor_json",
+    "load_payload_template",
+    "build_sensor_payload",
+    "extract_resident",
     "extract_resident_status",
     "random_vital_signs",
     "file_checksum",
     "get_resident_status_from_file",
+    "get_resident_from_file",
+    "list_directory",
+    "scan_directory",
+    "find_stale_residents",
 ]
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""Incremental, selective parser for the portal notifications feed."""
+
+import codecs
+import re
+from utils import json_codec
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_SCALAR = re.compile(r'[^,}\] \t\n\r]+')
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _COMMA, _DONE = range(6)
+
+
+def _value_end(buf: str, pos: int, final: bool) -> int:
+    """
+    Find the end of the JSON value starting at pos without decoding it.
+
+    Returns:
+        int: Index just past the value, or -1 if the buffer ends inside it
+    """
+    first = buf[pos]
+    if first == '"':
+        match = _STRING.match(buf, pos)
+        return match.end() if match else -1
+    if first not in "{[":
+        match = _SCALAR.match(buf, pos)
+        if match is None:
+            raise ValueError(f"Unexpected character {first!r} in feed at offset {pos}")
+        # A scalar touching the end of the buffer may continue in the next chunk
+        if match.end() == len(buf) and not final:
+            return -1
+        return match.end()
+
+    depth = 0
+    i = pos
+    while True:
+        match = _STRUCTURAL.search(buf, i)
+        if match is None:
+            return -1
+        char = match.group()
+        i = match.start()
+        if char == '"':
+            string = _STRING.match(buf, i)
+            if string is None:
+                return -1
+            i = string.end()
+            continue
+        depth += 1 if char in "{[" else -1
+        i += 1
+        if depth == 0:
+            return i
+
+
+def _slim_entry(entry):
+    """Reduce a feed entry to its decoded Resident and notification Timestamp.
+
+    Entries that cannot be decoded are returned unchanged so that
+    extract_resident() reports the problem as it does for a full feed.
+    """
+    if not isinstance(entry, dict):
+        return entry
+    raw = entry.get("notification")
+    if not raw or not isinstance(raw, str):
+        return entry
+    try:
+        notification = json_codec.loads(raw)
+    except json_codec.DecodeError:
+        return entry
+    resident = notification.get("Resident") if isinstance(notification, dict) else None
+    if not isinstance(resident, dict) or "Status" not in resident:
+        return entry
+    return {"Resident": resident, "Timestamp": notification.get("Timestamp")}
+
+
+class FeedStreamParser:
+    """Pulls selected sensors out of a feed body fed in chunks.
+
+    The feed is one JSON object keyed by sensor id. Members whose key is
+    not wanted are skipped by scanning for their end, without building any
+    objects. Only wanted members are decoded, together with their embedded
+    notification string. Memory use is bounded by the chunk size plus one
+    feed entry, whatever the size of the feed.
+    """
+
+    def __init__(self, sensor_ids):
+        """
+        Initialize parser.
+
+        Args:
+            sensor_ids: Sensor ids to extract
+        """
+        self.wanted = set(sensor_ids)
+        self.result = {}
+        self.skipped = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._state = _START
+        self._key = None
+
+    @property
+    def done(self) -> bool:
+        """True once every wanted sensor was found or the feed ended."""
+        return self._state == _DONE or len(self.result) == len(self.wanted)
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume one chunk of the response body."""
+        if self._state == _DONE:
+            return
+        self._buf += self._decoder.decode(chunk)
+        self._parse(final=False)
+
+    def close(self) -> dict:
+        """
+        Finish parsing.
+
+        Returns:
+            dict: {sensor_id: {"Resident": {...}, "Timestamp": ...}} for found sensors
+
+        Raises:
+            ValueError: If the feed is truncated before all wanted sensors were read
+        """
+        self._buf += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if not self.done:
+            raise ValueError("Notifications feed ended unexpectedly")
+        return self.result
+
+    def _parse(self, final: bool) -> None:
+        buf = self._buf
+        pos = 0
+        while not self.done:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            char = buf[pos]
+
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError("Notifications feed is not a JSON object")
+                pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}":
+                    self._state = _DONE
+                    pos += 1
+                    break
+                match = _STRING.match(buf, pos)
+                if match is None:
+                    if char != '"':
+                        raise ValueError(f"Expected sensor id in feed at offset {pos}")
+                    break
+                self._key = json_codec.loads(match.group())
+                pos = match.end()
+                self._state = _COLON
+            elif self._state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' in feed at offset {pos}")
+                pos += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                end = _value_end(buf, pos, final)
+                if end < 0:
+                    break
+                if self._key in self.wanted:
+                    self.result[self._key] = _slim_entry(json_codec.loads(buf[pos:end]))
+                else:
+                    self.skipped += 1
+                pos = end
+                self._state = _COMMA
+            elif self._state == _COMMA:
+                if char == ",":
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+                else:
+                    raise ValueError(f"Expected ',' or '}}' in feed at offset {pos}")
+                pos += 1
+        # Keep only the unconsumed tail
+        self._buf = buf[pos:]
+
+
+def parse_feed(chunks, sensor_ids) -> dict:
+    """
+    Parse selected sensors from an iterable of feed body chunks.
+
+    Stops reading as soon as every wanted sensor has been found.
+
+    Args:
+        chunks: Iterable of bytes (e.g. response.iter_content())
+        sensor_ids: Sensor ids to extract
+
+    Returns:
+        dict: {sensor_id: {"Resident": {...}, "Timestamp": ...}}
+    """
+    parser = FeedStreamParser(sensor_ids)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    return parser.close()
@@ -0,0 +1,123 @@
+"""JSON codec selection: orjson or ujson when installed, stdlib json otherwise."""
+
+import json
+import logging
+import os
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional speedup
+    ujson = None
+
+
+logger = logging.getLogger(__name__)
+
+# "auto" picks the fastest installed codec; or force "orjson", "ujson" or "json"
+JSON_CODEC = os.getenv("JSON_CODEC", "auto").lower()
+
+# Raised by every codec on malformed input (orjson and ujson errors subclass it)
+DecodeError = ValueError
+
+
+class JSONCodec:
+    """One JSON implementation behind a common interface.
+
+    Output is compact (no whitespace) unless pretty=True, which indents by
+    two spaces. Serialized text is always UTF-8 without ASCII escaping.
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        """Parse str or bytes."""
+        return json.loads(data)
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        """Serialize to UTF-8 bytes."""
+        return self.dumps_str(obj, pretty).encode("utf-8")
+
+    def dumps_str(self, obj, pretty: bool = False) -> str:
+        """Serialize to str."""
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def load(self, file_path: str):
+        """Read and parse a file."""
+        with open(file_path, "rb") as f:
+            return self.loads(f.read())
+
+    def dump(self, obj, file_path: str, pretty: bool = False) -> None:
+        """Serialize to a file, replacing its content."""
+        data = self.dumps(obj, pretty)
+        with open(file_path, "wb") as f:
+            f.write(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    def dumps_str(self, obj, pretty: bool = False) -> str:
+        return self.dumps(obj, pretty).decode("utf-8")
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps_str(self, obj, pretty: bool = False) -> str:
+        return ujson.dumps(obj, indent=2 if pretty else 0, ensure_ascii=False, escape_forward_slashes=False)
+
+
+_CODECS = {"json": JSONCodec}
+if orjson is not None:
+    _CODECS["orjson"] = OrjsonCodec
+if ujson is not None:
+    _CODECS["ujson"] = UjsonCodec
+
+
+def available_codecs() -> list:
+    """Names of the codecs importable in this environment."""
+    return list(_CODECS)
+
+
+def get_codec(name: str = JSON_CODEC) -> JSONCodec:
+    """
+    Return a codec by name.
+
+    Args:
+        name: "auto", "orjson", "ujson" or "json"
+
+    Returns:
+        JSONCodec: Requested codec; stdlib json if it is not installed
+    """
+    if name == "auto":
+        for candidate in ("orjson", "ujson", "json"):
+            if candidate in _CODECS:
+                return _CODECS[candidate]()
+    if name not in _CODECS:
+        logger.warning(f"JSON codec {name!r} not available, using stdlib json")
+        name = "json"
+    return _CODECS[name]()
+
+
+codec = get_codec()
+
+loads = codec.loads
+dumps = codec.dumps
+dumps_str = codec.dumps_str
+load = codec.load
+dump = codec.dump
@@ -1,24 +1,48 @@
 """JSON utilities for sensor data manipulation."""
 
-import json
 import random
 import hashlib
 import logging
+import os
 from models.enums import HUMAN_RANGES, STATE_LIST
 from utils.time_utils import now_utc_iso
+from utils import json_codec
+from utils.payload_encoder import compile_payload_template
 
 
 logger = logging.getLogger(__name__)
 
-# Store latest random state globally
-latest_state = None
+# Encode uploads through the precompiled template layout: "1", "0" (build a dict and
+# dump it) or "auto" (template unless orjson is active, whose dump is already faster)
+PAYLOAD_TEMPLATE_ENCODER = os.getenv("PAYLOAD_TEMPLATE_ENCODER", "auto").lower()
+
+_STATES = tuple(STATE_LIST)
 
 
 def random_state():
     """Return random state from STATE_LIST."""
-    global latest_state
-    latest_state = random.choice(tuple(STATE_LIST))
-    return latest_state
+    return random.choice(_STATES)
+
+
+def _fill_sensor_payload(data: dict) -> str:
+    """Set random status, vitals and fresh timestamps on a payload dict; return the status."""
+    # ---- Resident state ----
+    status = random_state()
+    data["Resident"] = {"Status": status, "Timestamp": now_utc_iso()}
+
+    # ---- Vital signs ----
+    if status == "S_PRESENT_BED":
+        data["VitalSigns"] = random_vital_signs()
+    else:
+        data["VitalSigns"] = {
+            "Heart": {"Value": 0, "Limit": 0},
+            "Breath": {"Value": 0, "Limit": 0},
+            "Temperature": {"Value": 0, "Limit": 0}
+        }
+
+    # ---- Root timestamp ----
+    data["Timestamp"] = now_utc_iso()
+    return status
 
 
 def manipulate_sensor_json(file_path: str) -> None:
@@ -28,36 +52,74 @@ def manipulate_sensor_json(file_path: str) -> None:
     - Updated Resident.Timestamp
     - Random human-factor VitalSigns values (only if status is S_PRESENT_BED)
     """
-    global latest_state
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = json_codec.load(file_path)
 
-        # ---- Resident state ----
-        data["Resident"]["Status"] = random_state()
-        data["Resident"]["Timestamp"] = now_utc_iso()
+        _fill_sensor_payload(data)
 
-        # ---- Vital signs ----
-        if latest_state == "S_PRESENT_BED":
-            data["VitalSigns"] = random_vital_signs()
-        else:
-            data["VitalSigns"] = {
-                "Heart": {"Value": 0, "Limit": 0},
-                "Breath": {"Value": 0, "Limit": 0},
-                "Temperature": {"Value": 0, "Limit": 0}
-            }
-
-        # ---- Root timestamp ----
-        data["Timestamp"] = now_utc_iso()
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        json_codec.dump(data, file_path, pretty=True)
 
     except Exception:
         logger.exception(f"Failed to manipulate JSON file {file_path}")
         raise
 
 
+_payload_templates = {}
+
+
+def load_payload_template(file_path: str) -> dict:
+    """Load an upload template once per process and cache it (treat as read-only)."""
+    template = _payload_templates.get(file_path)
+    if template is None:
+        template = json_codec.load(file_path)
+        _payload_templates[file_path] = template
+    return template
+
+
+def _use_template_encoder() -> bool:
+    if PAYLOAD_TEMPLATE_ENCODER == "auto":
+        return json_codec.codec.name != "orjson"
+    return PAYLOAD_TEMPLATE_ENCODER == "1"
+
+
+def build_sensor_payload(template: dict, sensor_id: str | None = None) -> tuple[bytes, dict]:
+    """
+    Build an upload payload in memory from a template.
+
+    Same changes as manipulate_sensor_json, without touching the disk.
+    With the template encoder the template is compiled once into a byte
+    layout and only the changing fields are encoded (see
+    utils.payload_encoder); the bytes are identical to dumping the
+    filled-in dict.
+
+    Args:
+        template: Parsed upload.json template
+        sensor_id: Value for the top-level "ID" field (template value if None)
+
+    Returns:
+        tuple: (compact serialized payload bytes, Resident object with Status and Timestamp)
+    """
+    if not _use_template_encoder():
+        data = dict(template)
+        if sensor_id is not None:
+            data["ID"] = sensor_id
+        _fill_sensor_payload(data)
+        return json_codec.dumps(data), data["Resident"]
+
+    compiled = compile_payload_template(template)
+    status = random_state()
+    resident = {"Status": status, "Timestamp": now_utc_iso()}
+    vitals = random_vital_signs() if status == "S_PRESENT_BED" else None
+    payload = compiled.render(
+        sensor_id,
+        status,
+        now_utc_iso(),
+        vitals,
+        resident_timestamp=resident["Timestamp"],
+    )
+    return payload, resident
+
+
 def random_vital_signs():
     """Generate random vital signs within human ranges."""
     return {
@@ -85,16 +147,16 @@ def file_checksum(path: str) -> str:
     return hasher.hexdigest()
 
 
-def extract_resident_status(api_response: dict, sensor_id: str) -> str:
+def extract_resident(api_response: dict, sensor_id: str) -> dict:
     """
-    Extract resident status from API response.
+    Extract the Resident object from API response.
     
     Args:
         api_response: API response dictionary
         sensor_id: Sensor/resident identifier
     
     Returns:
-        str: Resident status
+        dict: Resident object with at least "Status" (and usually "Timestamp")
     
     Raises:
         KeyError: If sensor not found
@@ -106,6 +168,10 @@ def extract_resident_status(api_response: dict, sensor_id: str) -> str:
 
     sensor_entry = api_response[sensor_id]
 
+    # Entries from the streaming feed parser are already decoded
+    if "Resident" in sensor_entry:
+        return sensor_entry["Resident"]
+
     # Check notification exists
     notification_raw = sensor_entry.get("notification")
     if not notification_raw:
@@ -113,8 +179,8 @@ def extract_resident_status(api_response: dict, sensor_id: str) -> str:
 
     # Parse inner JSON
     try:
-        notification = json.loads(notification_raw)
-    except json.JSONDecodeError as e:
+        notification = json_codec.loads(notification_raw)
+    except (json_codec.DecodeError, TypeError) as e:
         raise ValueError(
             f"Invalid notification JSON for sensor '{sensor_id}'"
         ) from e
@@ -126,14 +192,41 @@ def extract_resident_status(api_response: dict, sensor_id: str) -> str:
             f"Resident status missing for sensor '{sensor_id}'"
         )
 
-    return resident["Status"]
+    return resident
+
+
+def extract_resident_status(api_response: dict, sensor_id: str) -> str:
+    """
+    Extract resident status from API response.
+    
+    Args:
+        api_response: API response dictionary
+        sensor_id: Sensor/resident identifier
+    
+    Returns:
+        str: Resident status
+    
+    Raises:
+        KeyError: If sensor not found
+        ValueError: If status data missing or invalid
+    """
+    return extract_resident(api_response, sensor_id)["Status"]
 
 def get_resident_status_from_file(file_path: str) -> str:
     """Extract resident status from local JSON file."""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            return data.get("Resident", {}).get("Status", "UNKNOWN")
+        data = json_codec.load(file_path)
+        return data.get("Resident", {}).get("Status", "UNKNOWN")
     except Exception as e:
         logger.error(f"Error reading resident status from file: {e}")
-        return "ERROR"
\ No newline at end of file
+        return "ERROR"
+
+
+def get_resident_from_file(file_path: str) -> dict:
+    """Extract the Resident object (Status, Timestamp) from local JSON file."""
+    try:
+        data = json_codec.load(file_path)
+        return data.get("Resident", {})
+    except Exception as e:
+        logger.error(f"Error reading resident from file: {e}")
+        return {}
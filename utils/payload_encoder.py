@@ -0,0 +1,160 @@
+"""Precompiled upload payloads: serialize the template once, patch fields per cycle."""
+
+import threading
+from utils import json_codec
+
+
+# Fields patched on every upload, in the order render() encodes them
+SLOT_NAMES = (
+    "id",
+    "timestamp",
+    "resident_status",
+    "resident_timestamp",
+    "heart",
+    "breath",
+    "temperature",
+)
+
+
+def _placeholder(name: str) -> str:
+    return f"\x00slot:{name}\x00"
+
+
+class CompiledPayload:
+    """Byte layout of an upload template with holes for the changing fields.
+
+    The template is serialized once, with placeholders where the ID,
+    timestamps, resident status and vital-sign values go. render() only
+    encodes those values and joins them with the fixed segments. Key
+    order and formatting match json_codec.dumps() of the same dict, so
+    the output is byte-identical to the load/mutate/dump path.
+    """
+
+    def __init__(self, template: dict):
+        """
+        Compile a template.
+
+        Args:
+            template: Parsed upload.json template (not modified)
+        """
+        skeleton = dict(template)
+        skeleton["ID"] = _placeholder("id")
+        skeleton["Resident"] = {
+            "Status": _placeholder("resident_status"),
+            "Timestamp": _placeholder("resident_timestamp"),
+        }
+        skeleton["VitalSigns"] = {
+            "Heart": {"Value": _placeholder("heart"), "Limit": 0},
+            "Breath": {"Value": _placeholder("breath"), "Limit": 0},
+            "Temperature": {"Value": _placeholder("temperature"), "Limit": 0},
+        }
+        skeleton["Timestamp"] = _placeholder("timestamp")
+        serialized = json_codec.dumps(skeleton)
+
+        found = []
+        for name in SLOT_NAMES:
+            marker = json_codec.dumps(_placeholder(name))
+            start = serialized.find(marker)
+            if start < 0 or serialized.find(marker, start + 1) >= 0:
+                raise ValueError(f"Payload slot {name!r} must appear exactly once")
+            found.append((start, start + len(marker), name))
+        found.sort()
+
+        self.segments = []
+        self.order = []
+        pos = 0
+        for start, end, name in found:
+            self.segments.append(serialized[pos:start])
+            self.order.append(name)
+            pos = end
+        self.tail = serialized[pos:]
+
+        # One bytes %-format per layout: segments (with % escaped) around %s holes
+        self._format = b"%s".join(seg.replace(b"%", b"%%") for seg in self.segments + [self.tail])
+        # Templates that do not list the slots in SLOT_NAMES order need a reorder per render
+        permutation = tuple(SLOT_NAMES.index(name) for name in self.order)
+        self._permutation = None if permutation == tuple(range(len(SLOT_NAMES))) else permutation
+        self.default_id = template.get("ID")
+        self._strings = {}
+
+    def _encode_string(self, value: str) -> bytes:
+        """Encode a short string, caching values that repeat (ids, statuses)."""
+        encoded = self._strings.get(value)
+        if encoded is None:
+            encoded = _encode_value(value)
+            if len(self._strings) < 4096:
+                self._strings[value] = encoded
+        return encoded
+
+    def render(
+        self,
+        sensor_id: str | None,
+        status: str,
+        timestamp: str,
+        vitals: dict | None = None,
+        resident_timestamp: str | None = None,
+    ) -> bytes:
+        """
+        Serialize one upload.
+
+        Args:
+            sensor_id: Top-level "ID" (template value if None)
+            status: Resident.Status
+            timestamp: Root "Timestamp" (and Resident.Timestamp unless given)
+            vitals: Output of random_vital_signs(), or None for all-zero values
+            resident_timestamp: Resident.Timestamp if it differs from timestamp
+
+        Returns:
+            bytes: Payload identical to json_codec.dumps() of the filled template
+        """
+        if sensor_id is None:
+            sensor_id = self.default_id
+        encoded_timestamp = _encode_value(timestamp)
+        if vitals is None:
+            heart = breath = temperature = b"0"
+        else:
+            heart = _encode_value(vitals["Heart"]["Value"])
+            breath = _encode_value(vitals["Breath"]["Value"])
+            temperature = _encode_value(vitals["Temperature"]["Value"])
+        values = (
+            self._encode_string(sensor_id),
+            encoded_timestamp,
+            self._encode_string(status),
+            encoded_timestamp if resident_timestamp is None else _encode_value(resident_timestamp),
+            heart,
+            breath,
+            temperature,
+        )
+        if self._permutation is not None:
+            values = tuple([values[i] for i in self._permutation])
+        return self._format % values
+
+
+def _encode_value(value) -> bytes:
+    """JSON-encode one scalar; ints and plain ASCII strings skip the codec."""
+    kind = type(value)
+    if kind is int:
+        return str(value).encode()
+    if kind is str and value.isascii() and value.isprintable():
+        if '"' not in value and "\\" not in value:
+            return f'"{value}"'.encode()
+    return json_codec.dumps(value)
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_payload_template(template: dict) -> CompiledPayload:
+    """Return the compiled layout of a template, compiling it once per template object."""
+    key = id(template)
+    entry = _compiled.get(key)
+    if entry is not None and entry[0] is template:
+        return entry[1]
+    with _compiled_lock:
+        entry = _compiled.get(key)
+        # Keep the template referenced so its id cannot be reused
+        if entry is None or entry[0] is not template:
+            entry = (template, CompiledPayload(template))
+            _compiled[key] = entry
+        return entry[1]
@@ -12,3 +12,43 @@ def now_utc_iso():
     """
     return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
 
+
+def backoff_delays(initial: float, factor: float, maximum: float, budget: float):
+    """Yield exponentially growing sleep durations until budget is spent.
+    
+    Args:
+        initial: First delay in seconds
+        factor: Multiplier applied after each delay
+        maximum: Upper bound for a single delay
+        budget: Total seconds the delays may add up to
+    
+    Yields:
+        float: Next delay in seconds (the last one is trimmed to fit the budget)
+    """
+    delay = initial
+    spent = 0.0
+    while spent < budget:
+        step = min(delay, maximum, budget - spent)
+        spent += step
+        yield step
+        delay *= factor
+
+
+def parse_iso_timestamp(value) -> datetime | None:
+    """Parse an ISO 8601 timestamp as an aware UTC datetime.
+
+    Args:
+        value: Timestamp string such as now_utc_iso() output; naive values are taken as UTC
+
+    Returns:
+        datetime | None: Parsed time, or None if value is empty or not ISO 8601
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
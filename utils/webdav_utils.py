@@ -1,22 +1,135 @@
 """WebDAV utility functions."""
 
 import logging
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from webdav3.client import WebDavXmlUtils
+from webdav3.urn import Urn
 
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATIONS_DIR = "json_notifications/"
+
+
+@dataclass
+class RemoteFileRecord:
+    """Metadata of one remote file from a PROPFIND listing."""
+    name: str
+    path: str
+    size: int | None
+    mtime: float | None
+    etag: str | None
+
+    @property
+    def resident_id(self) -> str:
+        return self.name.rsplit(".", 1)[0]
+
+
+def _parse_size(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_mtime(value) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def scan_directory(client, remote_path=NOTIFICATIONS_DIR) -> list:
+    """
+    List the files of a WebDAV directory with one depth-1 PROPFIND.
+
+    Unlike client.list(), no existence check is sent first and the response
+    is closed so the connection goes back to the pool.
+
+    Args:
+        client: WebDAV client instance
+        remote_path: Remote directory path to scan
+
+    Returns:
+        list[RemoteFileRecord]: One record per file (sub-directories are skipped)
+    """
+    directory_urn = Urn(remote_path, directory=True)
+    response = client.execute_request(
+        action="list", path=directory_urn.quote(), headers_ext=["Depth: 1"]
+    )
+    try:
+        infos = WebDavXmlUtils.parse_get_list_info_response(response.content)
+    finally:
+        response.close()
+
+    records = []
+    for info in infos:
+        if info.get("isdir"):
+            continue
+        path = info.get("path") or ""
+        name = path.rstrip("/").rsplit("/", 1)[-1]
+        if not name:
+            continue
+        records.append(RemoteFileRecord(
+            name=name,
+            path=path,
+            size=_parse_size(info.get("size")),
+            mtime=_parse_mtime(info.get("modified")),
+            etag=info.get("etag"),
+        ))
+    return records
+
+
+def find_stale_residents(records: list, max_age: dict, now: float | None = None) -> dict:
+    """
+    Find residents whose remote file has stopped updating.
+
+    Args:
+        records: Records from scan_directory()
+        max_age: Maximum allowed file age in seconds per resident id
+        now: Reference wall-clock time (defaults to time.time())
+
+    Returns:
+        dict: {resident_id: age in seconds, or None if the file is missing}
+    """
+    if now is None:
+        now = time.time()
+    by_resident = {record.resident_id: record for record in records}
+
+    stale = {}
+    for resident_id, limit in max_age.items():
+        record = by_resident.get(resident_id)
+        if record is None:
+            stale[resident_id] = None
+            continue
+        if record.mtime is None:
+            continue
+        age = now - record.mtime
+        if age > limit:
+            stale[resident_id] = age
+    return stale
+
 
 def list_directory(client, remote_path="/"):
-    """List items in WebDAV directory.
-    
+    """List files in WebDAV directory.
+
     Args:
         client: WebDAV client instance
         remote_path: Remote directory path to list
+
+    Returns:
+        list[RemoteFileRecord]: Files found (empty on error)
     """
     logger.info(f"Listing directory: {remote_path}")
     try:
-        items = client.list(remote_path)
-        for item in items:
-            logger.info(item)
+        records = scan_directory(client, remote_path)
     except Exception:
         logger.exception(f"Failed to list directory: {remote_path}")
+        return []
+    for record in records:
+        logger.info(f"{record.name} size={record.size} mtime={record.mtime} etag={record.etag}")
+    return records